@@ -1,48 +1,100 @@
+import os
 from flask import Flask
-from app.config import Config
-from app.extensions import db, jwt
+from app.config import config_por_nombre
+from app.extensions import db, jwt, mainframe, mainframe_async, core_cache, registro_negativo, revoked_tokens, catalogo_mcc, password_hasher, metricas, guardia_consultas, compresion, dashboard_pool
 from flask_migrate import Migrate
-from flasgger import Swagger
 
 # Inicializamos Migrate globalmente
 migrate = Migrate()
 
-def create_app(config_class=Config):
+def create_app(config_class=None):
     """
     Factory function para crear la aplicación Flask.
     Permite crear múltiples instancias con diferentes configuraciones (ej. testing).
+    Sin argumento, la configuración se elige con APP_CONFIG (development / production).
     """
+    if config_class is None:
+        config_class = config_por_nombre[os.environ.get('APP_CONFIG', 'development')]
+
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Proveedor JSON (jsonify, retornos dict y request.get_json)
+    from app.services.json_provider import PROVEEDORES_JSON
+    app.json = PROVEEDORES_JSON[app.config.get('JSON_PROVIDER', 'orjson')](app)
+
     # Inicializar extensiones con la app
     db.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
+    mainframe.init_app(app)
+    mainframe_async.init_app(app)
+    core_cache.init_app(app)
+    registro_negativo.init_app(app)
+    revoked_tokens.init_app(app)
+    catalogo_mcc.init_app(app)
+    password_hasher.init_app(app)
+    metricas.init_app(app)
+    guardia_consultas.init_app(app)
+    compresion.init_app(app)
+    dashboard_pool.init_app(app)
     
     # Inicializar Swagger para documentación automática
-    swagger = Swagger(app)
+    swagger_mode = app.config.get('SWAGGER_MODE', 'eager')
+    if swagger_mode == 'eager':
+        from flasgger import Swagger
+        Swagger(app)
+    elif swagger_mode == 'lazy':
+        from app.routes.docs import docs_bp
+        app.register_blueprint(docs_bp)
 
     # Configurar callback para verificar si un token está revocado (Logout)
-    from app.models.mobile_app import TokenBlocklist
-    
+    # Se responde desde memoria; TOKEN_BLOCKLIST se sincroniza cada JWT_BLOCKLIST_SYNC_SECONDS
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
-        jti = jwt_payload["jti"]
-        token = db.session.query(TokenBlocklist.id).filter_by(jti=jti).scalar()
-        return token is not None
+        return revoked_tokens.esta_revocado(jwt_payload["jti"])
 
     # Registrar Blueprints (Rutas)
     from app.routes.auth import auth_bp
-    from app.routes.products import products_bp
+    if app.config.get('PRODUCTS_VIEWS_MODE', 'sync') == 'async':
+        from app.routes.products_async import products_bp
+    else:
+        from app.routes.products import products_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(products_bp)
 
-    # Crear tablas si no existen (Solo para desarrollo rápido, idealmente usar Flask-Migrate)
-    with app.app_context():
-        # Importar modelos para que SQLAlchemy los reconozca al crear tablas
-        from app.models import core_banking, mobile_app
-        db.create_all()
+    # Mantener el rollup mensual de gastos al registrar movimientos
+    from app.services.resumen_gasto_service import ResumenGastoService
+    ResumenGastoService.registrar_eventos()
+
+    # Comandos CLI de mantenimiento (flask blocklist ...)
+    from app.commands import register_commands
+    register_commands(app)
+
+    if app.config.get('MONITORING_ENABLED', True):
+        from app.routes.monitoring import monitoring_bp
+        app.register_blueprint(monitoring_bp)
+
+    if app.config.get('PERF_METRICS_ENABLED', True):
+        from app.routes.monitoring import metrics_bp
+        app.register_blueprint(metrics_bp)
+
+    # Crear tablas si no existen (Solo para desarrollo rápido; en producción: `flask db upgrade`)
+    if app.config.get('DB_CREATE_ALL', True):
+        with app.app_context():
+            # Importar modelos para que SQLAlchemy los reconozca al crear tablas
+            from app.models import core_banking, mobile_app
+            db.create_all()
+
+    # Precargar el catálogo MCC -> categoría (si falla o está desactivado, se carga en el primer uso)
+    if app.config.get('MCC_CATALOG_PRELOAD', True):
+        with app.app_context():
+            try:
+                catalogo_mcc.refrescar()
+            except Exception as e:
+                app.logger.warning(f"No se pudo precargar el catálogo MCC: {e}")
+            finally:
+                db.session.remove()
 
     return app
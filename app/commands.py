@@ -0,0 +1,167 @@
+import click
+from flask.cli import AppGroup
+
+# Comandos de mantenimiento: `flask <grupo> <comando>`
+
+blocklist_cli = AppGroup('blocklist', help='Mantenimiento de TOKEN_BLOCKLIST (tokens revocados).')
+
+@blocklist_cli.command('purge')
+@click.option('--batch-size', default=1000, show_default=True, help='Filas eliminadas por lote (un COMMIT por lote).')
+@click.option('--max-batches', default=None, type=int, help='Máximo de lotes por ejecución (por defecto, hasta terminar).')
+@click.option('--pause', default=0.0, show_default=True, help='Segundos de pausa entre lotes.')
+def blocklist_purge(batch_size, max_batches, pause):
+    """Elimina las filas de tokens ya expirados."""
+    from app.services.token_blocklist_service import TokenBlocklistService
+
+    eliminadas = TokenBlocklistService.purgar_expirados(batch_size=batch_size, max_batches=max_batches, pausa=pause)
+    click.echo(f"Filas eliminadas: {eliminadas}")
+
+@blocklist_cli.command('stats')
+def blocklist_stats():
+    """Muestra el tamaño de TOKEN_BLOCKLIST y cuántas filas se pueden compactar."""
+    from app.services.token_blocklist_service import TokenBlocklistService
+
+    for clave, valor in TokenBlocklistService.estadisticas().items():
+        click.echo(f"{clave}: {valor}")
+
+analytics_cli = AppGroup('analytics', help='Mantenimiento de tablas analíticas (rollups).')
+
+@analytics_cli.command('rebuild-rollup')
+@click.option('--cliente', 'cod_cliente', default=None, type=int, help='Reconstruir solo este COD_CLIENTE.')
+def analytics_rebuild_rollup(cod_cliente):
+    """Recalcula CORE_RESUMEN_GASTO_MENSUAL desde CORE_MOVIMIENTOS (backfill)."""
+    from app.services.resumen_gasto_service import ResumenGastoService
+
+    filas = ResumenGastoService.reconstruir(cod_cliente)
+    click.echo(f"Filas del rollup generadas: {filas}")
+
+plans_cli = AppGroup('plans', help='Verificación de planes de ejecución (EXPLAIN) de las consultas del Core.')
+
+@plans_cli.command('check')
+@click.option('--verbose', '-v', is_flag=True, help='Mostrar el SQL y el plan de cada sentencia.')
+def plans_check(verbose):
+    """
+    Ejecuta EXPLAIN sobre cada consulta de CoreBankingService con un dataset sembrado
+    (y descartado con ROLLBACK). Termina con código 1 si alguna hace un recorrido
+    secuencial sobre una tabla grande.
+    """
+    from app.services.plan_check_service import PlanCheckService
+
+    resultados = PlanCheckService.verificar()
+    fallos = 0
+    for r in resultados:
+        estado = 'SEQ SCAN ' + ', '.join(r['recorridos']) if r['recorridos'] else 'OK'
+        click.echo(f"[{estado}] {r['caso']}")
+        if verbose or r['recorridos']:
+            click.echo(f"  SQL: {' '.join(r['sql'].split())}")
+            click.echo('  ' + r['plan'].replace('\n', '\n  '))
+        fallos += bool(r['recorridos'])
+
+    click.echo(f"Sentencias verificadas: {len(resultados)}, con recorrido secuencial: {fallos}")
+    if fallos:
+        raise SystemExit(1)
+
+core_cli = AppGroup('core', help='Carga masiva de las tablas CORE_* (staging y pruebas de carga).')
+
+def _opciones_carga(func):
+    """Opciones comunes de `flask core load` y `flask core generate`."""
+    opciones = [
+        click.option('--batch-size', default=10000, show_default=True, help='Filas por lote (un COMMIT por lote).'),
+        click.option('--method', 'metodo', type=click.Choice(['auto', 'copy', 'executemany']), default='auto',
+                     show_default=True, help='auto = COPY en PostgreSQL, executemany en otros motores.'),
+        click.option('--defer-indexes/--keep-indexes', 'diferir_indices', default=True, show_default=True,
+                     help='Eliminar los índices secundarios durante la carga y reconstruirlos al final.'),
+        click.option('--skip-rollup', is_flag=True, help='No reconstruir CORE_RESUMEN_GASTO_MENSUAL al terminar.'),
+    ]
+    for opcion in reversed(opciones):
+        func = opcion(func)
+    return func
+
+def _cargar_tabla(tabla, filas, batch_size, metodo, diferir_indices, total_estimado=None):
+    """Carga una tabla reportando avance y throughput (a lo sumo cada 2 segundos)."""
+    from app.services.bulk_load_service import BulkLoadService
+
+    ultimo_reporte = [0.0]
+
+    def progreso(total, segundos):
+        if segundos - ultimo_reporte[0] < 2:
+            return
+        ultimo_reporte[0] = segundos
+        avance = f"/{total_estimado:,}" if total_estimado else ""
+        click.echo(f"  {tabla}: {total:,}{avance} filas · {total / segundos:,.0f} filas/s")
+
+    r = BulkLoadService.cargar(tabla, filas, batch_size=batch_size, metodo=metodo,
+                               diferir_indices=diferir_indices, progreso=progreso)
+    tasa = r['filas'] / r['segundos'] if r['segundos'] else 0
+    click.echo(f"{tabla}: {r['filas']:,} filas en {r['segundos']:.1f}s ({tasa:,.0f} filas/s, {r['metodo']}; "
+               f"índices reconstruidos en {r['segundos_indices']:.1f}s)")
+    return r
+
+def _finalizar_carga(tablas, skip_rollup):
+    from app.services.bulk_load_service import BulkLoadService
+
+    filas_rollup = BulkLoadService.despues_de_cargar(tablas, reconstruir_rollup=not skip_rollup)
+    if filas_rollup is not None:
+        click.echo(f"Filas del rollup generadas: {filas_rollup}")
+
+@core_cli.command('load')
+@click.argument('tabla', type=click.Choice(['CORE_CATEGORIA', 'CORE_MCC', 'CORE_CLIENTES', 'CORE_TARJETAS',
+                                            'CORE_CUENTAS', 'CORE_MOVIMIENTOS'], case_sensitive=False))
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@_opciones_carga
+def core_load(tabla, archivo, batch_size, metodo, diferir_indices, skip_rollup):
+    """
+    Carga un CSV (cabecera con los nombres de columna, ej. NUM_CUENTA,FECHA_PROCESO,...) en TABLA.
+    """
+    from app.services.bulk_load_service import BulkLoadService, IndicesNoReconstruidosError
+
+    try:
+        filas = BulkLoadService.leer_csv(tabla, archivo)
+        _cargar_tabla(tabla.upper(), filas, batch_size, metodo, diferir_indices)
+    except (ValueError, IndicesNoReconstruidosError) as e:
+        raise click.ClickException(str(e))
+    _finalizar_carga([tabla], skip_rollup)
+
+@core_cli.command('generate')
+@click.option('--clients', default=1000, show_default=True, help='Clientes a generar.')
+@click.option('--accounts-per-client', default=2, show_default=True, help='Máximo de cuentas por cliente.')
+@click.option('--movements-per-account', default=200, show_default=True, help='Movimientos promedio por cuenta.')
+@click.option('--months', default=12, show_default=True, help='Meses de historial.')
+@click.option('--seed', default=42, show_default=True, help='Semilla (mismos parámetros y semilla = mismos datos).')
+@click.option('--first-client', default=1, show_default=True, help='COD_CLIENTE inicial (para cargas incrementales).')
+@click.option('--heavy-share', default=0.1, show_default=True, help='Proporción de usuarios intensivos.')
+@click.option('--heavy-factor', default=5.0, show_default=True, help='Movimientos de un usuario intensivo respecto al promedio.')
+@_opciones_carga
+def core_generate(clients, accounts_per_client, movements_per_account, months, seed, first_client,
+                  heavy_share, heavy_factor, batch_size, metodo, diferir_indices, skip_rollup):
+    """Genera datos sintéticos reproducibles y los carga en todas las tablas CORE_*."""
+    from app.extensions import db
+    from app.services.bulk_load_service import BulkLoadService, IndicesNoReconstruidosError, TABLAS_CORE
+    from app.services.generador_datos import GeneradorDatosCore
+
+    try:
+        generador = GeneradorDatosCore(clientes=clients, cuentas_por_cliente=accounts_per_client,
+                                       movimientos_por_cuenta=movements_per_account, semilla=seed,
+                                       primer_cliente=first_client, meses=months,
+                                       proporcion_intensivos=heavy_share, factor_intensivos=heavy_factor)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for tabla in TABLAS_CORE:
+        # El maestro de categorías / MCC se carga una sola vez
+        if tabla in ('CORE_CATEGORIA', 'CORE_MCC') and \
+                db.session.query(BulkLoadService.tabla(tabla)).limit(1).first() is not None:
+            click.echo(f"{tabla}: ya tiene datos, se omite")
+            continue
+        try:
+            _cargar_tabla(tabla, generador.filas(tabla), batch_size, metodo, diferir_indices,
+                          total_estimado=generador.total_estimado(tabla))
+        except (ValueError, IndicesNoReconstruidosError) as e:
+            raise click.ClickException(str(e))
+    db.session.remove()
+    _finalizar_carga(TABLAS_CORE, skip_rollup)
+
+def register_commands(app):
+    app.cli.add_command(blocklist_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(plans_cli)
+    app.cli.add_command(core_cli)
@@ -26,13 +26,204 @@ class Config:
     # Configuración de JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'super-secret-jwt-key'
     JWT_ACCESS_TOKEN_EXPIRES = 3600 * 24 # 1 día de validez por defecto
+    # Cada cuántos segundos cada worker sincroniza los tokens revocados desde TOKEN_BLOCKLIST
+    # (retraso máximo para que un logout tenga efecto en los demás workers)
+    JWT_BLOCKLIST_SYNC_SECONDS = int(os.environ.get('JWT_BLOCKLIST_SYNC_SECONDS', 5))
+    # Margen hacia atrás sobre el watermark en cada sincronización, para no perder revocaciones
+    # confirmadas con retraso (created_at anterior al COMMIT) o con relojes desfasados entre servidores
+    JWT_BLOCKLIST_SYNC_OVERLAP_SECONDS = int(os.environ.get('JWT_BLOCKLIST_SYNC_OVERLAP_SECONDS', 30))
 
     # Configuración de Mainframe (CICS / zOS Connect)
     MAINFRAME_CICS_URL = os.environ.get('MAINFRAME_CICS_URL')
+    # URL base del gateway. Si no se define, se deriva de MAINFRAME_CICS_URL (quitando /trx001)
+    MAINFRAME_BASE_URL = os.environ.get('MAINFRAME_BASE_URL')
+    # Path de cada transacción relativo a la URL base
+    MAINFRAME_TRX_PATHS = {
+        'TRX001': 'trx001',
+        'TRX002': 'trx002',
+        'TRX003': 'trx003',
+        'TRX004': 'trx004',
+        'CLIENTE': 'cliente',
+    }
+    # Pool de conexiones keep-alive por worker y timeouts (segundos) de conexión / lectura
+    MAINFRAME_POOL_SIZE = int(os.environ.get('MAINFRAME_POOL_SIZE', 10))
+    MAINFRAME_CONNECT_TIMEOUT = float(os.environ.get('MAINFRAME_CONNECT_TIMEOUT', 2))
+    MAINFRAME_READ_TIMEOUT = float(os.environ.get('MAINFRAME_READ_TIMEOUT', 5))
+    # Reintentos con backoff solo para consultas idempotentes
+    MAINFRAME_MAX_RETRIES = int(os.environ.get('MAINFRAME_MAX_RETRIES', 2))
+    MAINFRAME_BACKOFF_FACTOR = float(os.environ.get('MAINFRAME_BACKOFF_FACTOR', 0.3))
+    MAINFRAME_IDEMPOTENT_TRX = ('TRX001', 'TRX002', 'TRX003', 'TRX004', 'CLIENTE')
+
+    # Circuit breaker por transacción: se abre por tasa de error o de llamadas lentas
+    MAINFRAME_BREAKER_TRX = ('TRX001', 'TRX002', 'TRX003', 'TRX004', 'CLIENTE')
+    MAINFRAME_BREAKER_WINDOW = int(os.environ.get('MAINFRAME_BREAKER_WINDOW', 20))
+    MAINFRAME_BREAKER_MIN_CALLS = int(os.environ.get('MAINFRAME_BREAKER_MIN_CALLS', 10))
+    MAINFRAME_BREAKER_FAILURE_RATE = float(os.environ.get('MAINFRAME_BREAKER_FAILURE_RATE', 0.5))
+    MAINFRAME_BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('MAINFRAME_BREAKER_SLOW_CALL_SECONDS', 2.5))
+    MAINFRAME_BREAKER_SLOW_CALL_RATE = float(os.environ.get('MAINFRAME_BREAKER_SLOW_CALL_RATE', 0.5))
+    MAINFRAME_BREAKER_OPEN_SECONDS = float(os.environ.get('MAINFRAME_BREAKER_OPEN_SECONDS', 30))
+    # Bulkhead: máximo de llamadas en vuelo por transacción y espera máxima por un cupo
+    MAINFRAME_MAX_CONCURRENT = int(os.environ.get('MAINFRAME_MAX_CONCURRENT', 5))
+    MAINFRAME_BULKHEAD_TIMEOUT = float(os.environ.get('MAINFRAME_BULKHEAD_TIMEOUT', 0.1))
+    # Con el breaker abierto, servir la última respuesta buena (marcada STALE) en vez de fallar
+    MAINFRAME_SERVE_STALE = os.environ.get('MAINFRAME_SERVE_STALE', 'True').lower() == 'true'
+    MAINFRAME_STALE_MAX_AGE = int(os.environ.get('MAINFRAME_STALE_MAX_AGE', 600))
+    MAINFRAME_STALE_MAX_ENTRIES = int(os.environ.get('MAINFRAME_STALE_MAX_ENTRIES', 5000))
     
     # Flag para usar simulación local en lugar de conectar al Mainframe real
     # Si es True, usa la BD local. Si es False, intenta conectar a MAINFRAME_CICS_URL.
     USE_MOCK_MAINFRAME = os.environ.get('USE_MOCK_MAINFRAME', 'True').lower() == 'true'
 
+    # Caché de respuestas TRX001 (posición global) y TRX002 (detalle de cuenta)
+    CORE_CACHE_ENABLED = os.environ.get('CORE_CACHE_ENABLED', 'True').lower() == 'true'
+    CORE_CACHE_TTL = int(os.environ.get('CORE_CACHE_TTL', 60))  # segundos
+    CORE_CACHE_MAX_ENTRIES = int(os.environ.get('CORE_CACHE_MAX_ENTRIES', 10000))
+    CORE_CACHE_MAX_BYTES = int(os.environ.get('CORE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+    # TRX004 lee del rollup CORE_RESUMEN_GASTO_MENSUAL en lugar de agregar CORE_MOVIMIENTOS.
+    # El rollup se mantiene al insertar movimientos; tras cargas masivas: `flask analytics rebuild-rollup`.
+    # Hasta su primera reconstrucción completa (marca en CORE_ROLLUP_ESTADO) se agrega CORE_MOVIMIENTOS
+    ANALYTICS_USE_ROLLUP = os.environ.get('ANALYTICS_USE_ROLLUP', 'True').lower() == 'true'
+
+    # Hash de contraseñas (werkzeug): al cambiar el método, los hashes se regeneran en el siguiente login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_SALT_LENGTH = int(os.environ.get('PASSWORD_HASH_SALT_LENGTH', 16))
+    # Pool acotado para el cálculo del hash: hilos (por defecto, nº de CPUs), tareas en vuelo y espera máxima
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0)) or None
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 0)) or None
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 5))
+
+    # Login: el vínculo usuario -> COD_CLIENTE se guarda en USUARIOS y solo se revalida
+    # contra el Core Bancario pasado este intervalo (o con POST /auth/resync)
+    AUTH_VINCULO_REVALIDAR_SECONDS = int(os.environ.get('AUTH_VINCULO_REVALIDAR_SECONDS', 3600 * 24))
+    # Registro: segundos que se recuerda que un DNI no es cliente del banco (caché negativa)
+    AUTH_REGISTRO_NEGATIVO_TTL = int(os.environ.get('AUTH_REGISTRO_NEGATIVO_TTL', 60))
+    AUTH_REGISTRO_NEGATIVO_MAX_ENTRIES = int(os.environ.get('AUTH_REGISTRO_NEGATIVO_MAX_ENTRIES', 10000))
+
+    # Catálogo MCC -> categoría en memoria: segundos entre recargas desde CORE_MCC / CORE_CATEGORIA
+    MCC_CATALOG_TTL_SECONDS = int(os.environ.get('MCC_CATALOG_TTL_SECONDS', 300))
+    # POST /monitoring/mcc-catalog/refresh: intervalo mínimo (segundos) entre recargas forzadas por worker
+    MCC_CATALOG_REFRESH_MIN_SECONDS = int(os.environ.get('MCC_CATALOG_REFRESH_MIN_SECONDS', 10))
+
+    # TRX003 (scroll infinito): tamaño de página por defecto y máximo aceptado en ?page_size=
+    TRX003_DEFAULT_PAGE_SIZE = int(os.environ.get('TRX003_DEFAULT_PAGE_SIZE', 15))
+    TRX003_MAX_PAGE_SIZE = int(os.environ.get('TRX003_MAX_PAGE_SIZE', 50))
+
+    # Vistas de productos (/api/v1): 'sync' (un hilo por request durante toda la llamada al Mainframe)
+    # o 'async' (httpx.AsyncClient; las transacciones en vuelo no retienen el hilo)
+    PRODUCTS_VIEWS_MODE = os.environ.get('PRODUCTS_VIEWS_MODE', 'sync').lower()
+
+    # Dashboard (/api/v1/dashboard): plazo de cada sub-llamada TRX001 / TRX002 / TRX004 (segundos)
+    # e hilos compartidos por worker para ejecutarlas en paralelo (vistas síncronas). Cada hilo usa
+    # su propia conexión de BD: se acota a (pool_size + max_overflow del engine) - DB_REQUEST_THREADS
+    DASHBOARD_SUBCALL_TIMEOUT = float(os.environ.get('DASHBOARD_SUBCALL_TIMEOUT', 3))
+    DASHBOARD_MAX_WORKERS = int(os.environ.get('DASHBOARD_MAX_WORKERS', 4))
+    # Hilos por worker que atienden requests (cada uno puede retener una conexión); igual que gunicorn.conf.py
+    DB_REQUEST_THREADS = int(os.environ.get('GUNICORN_THREADS', 8))
+
+    # GET condicional en /products, /accounts/<num_cuenta>/summary y /financial-personality:
+    # ETag débil por marcador de versión (If-None-Match -> 304 sin ejecutar la TRX). Con
+    # CORE_CACHE_ENABLED, TRX001 / TRX002 salen de la caché con un ETag derivado del contenido
+    ETAGS_ENABLED = os.environ.get('ETAGS_ENABLED', 'True').lower() == 'true'
+
+    # Exportación del historial (/accounts/<num_cuenta>/export): filas por lote del cursor del servidor
+    EXPORT_YIELD_PER = int(os.environ.get('EXPORT_YIELD_PER', 1000))
+
+    # Serialización JSON de las respuestas: 'orjson' (rápido; Decimal exacto como número JSON)
+    # o 'stdlib' (json estándar de Flask; Decimal vía float)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson').lower()
+
+    # Compresión de respuestas (opt-in; normalmente la hace el proxy): gzip / brotli según Accept-Encoding,
+    # solo para los tipos indicados y cuerpos de al menos COMPRESSION_MIN_SIZE bytes.
+    # La exportación en streaming se comprime por partes (sin umbral: su tamaño no se conoce de antemano)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'False').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    # Orden de preferencia ante empate de calidad (q); 'br' requiere el paquete brotli
+    COMPRESSION_ALGORITHMS = tuple(
+        a.strip() for a in os.environ.get('COMPRESSION_ALGORITHMS', 'br,gzip').lower().split(',') if a.strip()
+    )
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+    COMPRESSION_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/csv')
+
+    # Métricas de rendimiento por request: histogramas Prometheus en /metrics (por worker)
+    # y cabecera Server-Timing (tiempo total, SQL, Mainframe por TRX y mapeo COBOL -> JSON)
+    PERF_METRICS_ENABLED = os.environ.get('PERF_METRICS_ENABLED', 'True').lower() == 'true'
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'True').lower() == 'true'
+    # Máximo de series (combinaciones de etiquetas) por métrica; el exceso se agrupa en 'otro'
+    PERF_METRICS_MAX_SERIES = int(os.environ.get('PERF_METRICS_MAX_SERIES', 500))
+
+    # Guardia de consultas SQL por request (presupuesto por endpoint y detección de N+1):
+    # 'off', 'log' (staging) o 'raise' (pruebas)
+    QUERY_GUARD_MODE = os.environ.get('QUERY_GUARD_MODE', 'off').lower()
+    # Máximo de consultas de los endpoints sin presupuesto propio (vacío = sin límite)
+    QUERY_BUDGET_DEFAULT = int(os.environ.get('QUERY_BUDGET_DEFAULT', 0)) or None
+    # Presupuesto por endpoint (nombre del endpoint Flask -> máximo de consultas por request).
+    # Los que usan el catálogo MCC incluyen 2 consultas para su recarga (una vez por MCC_CATALOG_TTL_SECONDS)
+    QUERY_BUDGETS = {
+        'auth.register': 10,
+        'auth.login': 6,
+        'auth.logout': 2,
+        'products.get_global_position': 4,
+        'products.get_account_summary': 6,
+        'products.get_account_details_paginated': 6,
+        'products.get_financial_personality': 6,
+        'products.get_dashboard': 14,
+        'products.export_account_movements': 6,
+    }
+    # Veces que puede repetirse una misma sentencia (distintos parámetros) antes de tratarla como N+1
+    QUERY_GUARD_REPEAT_THRESHOLD = int(os.environ.get('QUERY_GUARD_REPEAT_THRESHOLD', 5))
+
+    # Endpoints internos de monitoreo (/monitoring/...)
+    MONITORING_ENABLED = os.environ.get('MONITORING_ENABLED', 'True').lower() == 'true'
+    # Token compartido para /monitoring y /metrics (`Authorization: Bearer <token>`, ej. bearer_token
+    # del scrape de Prometheus). Sin token configurado solo se aceptan peticiones desde localhost
+    MONITORING_TOKEN = os.environ.get('MONITORING_TOKEN') or None
+
+    # Arranque: crear tablas con db.create_all() (solo desarrollo; en producción se usa `flask db upgrade`.
+    # Una BD ya creada con create_all se marca una vez con `flask db stamp head`)
+    DB_CREATE_ALL = os.environ.get('DB_CREATE_ALL', 'True').lower() == 'true'
+    # Precargar el catálogo MCC al arrancar (si no, se carga en el primer uso)
+    MCC_CATALOG_PRELOAD = os.environ.get('MCC_CATALOG_PRELOAD', 'True').lower() == 'true'
+    # Documentación: 'eager' (UI /apidocs/ + spec, flasgger se inicializa al arrancar),
+    # 'lazy' (solo /apispec_1.json, generado en la primera petición) u 'off'
+    SWAGGER_MODE = os.environ.get('SWAGGER_MODE', 'eager').lower()
+
     # Aquí podrías agregar configuraciones para DB2 en el futuro
     # DB2_DATABASE_URI = os.environ.get('DB2_DATABASE_URI')
+
+
+class ProductionConfig(Config):
+    """
+    Arranque rápido de workers: sin db.create_all() (el esquema lo gestionan las migraciones),
+    sin precarga del catálogo MCC y con la especificación Swagger generada bajo demanda.
+    """
+    DB_CREATE_ALL = os.environ.get('DB_CREATE_ALL', 'False').lower() == 'true'
+    MCC_CATALOG_PRELOAD = os.environ.get('MCC_CATALOG_PRELOAD', 'False').lower() == 'true'
+    SWAGGER_MODE = os.environ.get('SWAGGER_MODE', 'lazy').lower()
+    # Monitoreo interno (estado de breakers, caché, blocklist...): solo si se habilita explícitamente
+    MONITORING_ENABLED = os.environ.get('MONITORING_ENABLED', 'False').lower() == 'true'
+    # Server-Timing expone tiempos internos al cliente: solo si se habilita explícitamente
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'False').lower() == 'true'
+
+
+class TestingConfig(Config):
+    """
+    Pruebas automatizadas (`pytest`, tests/conftest.py): BD SQLite en memoria (o TEST_DATABASE_URL), Mainframe simulado y
+    guardia de consultas en modo 'raise' (un endpoint que excede su presupuesto o hace N+1 falla la prueba).
+    """
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+    USE_MOCK_MAINFRAME = True
+    CORE_CACHE_ENABLED = False
+    MCC_CATALOG_PRELOAD = False
+    SWAGGER_MODE = 'off'
+    QUERY_GUARD_MODE = os.environ.get('QUERY_GUARD_MODE', 'raise').lower()
+
+
+# Selección por variable de entorno APP_CONFIG (create_app sin argumentos)
+config_por_nombre = {
+    'development': Config,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
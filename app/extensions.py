@@ -1,7 +1,51 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
+from app.services.mainframe_client import MainframeClient
+from app.services.mainframe_async_client import AsyncMainframeClient
+from app.services.response_cache import ResponseCache
+from app.services.registro_negativo import RegistroNegativo
+from app.services.token_revocation import RevokedTokenFilter
+from app.services.catalogo_mcc import CatalogoMcc
+from app.services.password_hasher import PasswordHasher
+from app.services.metricas_rendimiento import MetricasRendimiento
+from app.services.guardia_consultas import GuardiaConsultas
+from app.services.compresion import CompresionRespuestas
+from app.services.pool_dashboard import PoolDashboard
 
 # Inicializamos la instancia de SQLAlchemy
 # Se usará en los modelos y en la creación de la app
 db = SQLAlchemy()
 jwt = JWTManager()
+
+# Cliente HTTP compartido (pool keep-alive) para el gateway CICS / z/OS Connect
+mainframe = MainframeClient()
+
+# Variante asyncio (vistas async): comparte configuración, circuit breakers y respuestas STALE con `mainframe`
+mainframe_async = AsyncMainframeClient(mainframe)
+
+# Caché TTL/LRU (por worker) de respuestas TRX001 / TRX002
+core_cache = ResponseCache()
+
+# DNIs que no son clientes del banco (caché negativa del registro, por worker)
+registro_negativo = RegistroNegativo()
+
+# JTIs revocados en memoria (por worker), sincronizados periódicamente desde TOKEN_BLOCKLIST
+revoked_tokens = RevokedTokenFilter()
+
+# Catálogo MCC -> categoría en memoria (por worker), versionado y recargado cada MCC_CATALOG_TTL_SECONDS
+catalogo_mcc = CatalogoMcc()
+
+# Pool acotado (por worker) para generar / verificar hashes de contraseñas
+password_hasher = PasswordHasher()
+
+# Server-Timing por request e histogramas Prometheus (por worker) expuestos en /metrics
+metricas = MetricasRendimiento()
+
+# Presupuesto de consultas SQL por endpoint y detección de N+1 (QUERY_GUARD_MODE: pruebas / staging)
+guardia_consultas = GuardiaConsultas()
+
+# Compresión gzip / brotli de respuestas grandes y de la exportación en streaming (COMPRESSION_ENABLED)
+compresion = CompresionRespuestas()
+
+# Pool de hilos (por worker) para las sub-llamadas del dashboard síncrono, acotado al pool de BD
+dashboard_pool = PoolDashboard()
@@ -6,6 +6,10 @@ class Cliente(db.Model):
     Tabla CORE_CLIENTES: Información principal del cliente.
     """
     __tablename__ = 'CORE_CLIENTES'
+    __table_args__ = (
+        # Búsqueda del cliente por documento en cada login / registro (obtener_cliente)
+        db.Index('ix_CORE_CLIENTES_DNI_RUC', 'DNI_RUC'),
+    )
 
     cod_cliente = db.Column('COD_CLIENTE', db.Integer, primary_key=True, autoincrement=True, comment='ID único interno (Auto-incremental)')
     dni_ruc = db.Column('DNI_RUC', db.String(11), nullable=False)
@@ -51,6 +55,10 @@ class MccCore(db.Model):
     Relaciona códigos de comercio con categorías.
     """
     __tablename__ = 'CORE_MCC'
+    __table_args__ = (
+        # MCCs de una categoría (carga del catálogo, reconstrucción del rollup)
+        db.Index('ix_CORE_MCC_ID_CATEGORIA', 'ID_CATEGORIA'),
+    )
     
     cod_mcc = db.Column('COD_MCC', db.String(15), primary_key=True, comment='Código estándar de comercio o rubro')
     descripcion = db.Column('DESCRIPCION', db.String(100))
@@ -61,6 +69,10 @@ class Cuenta(db.Model):
     Tabla CORE_CUENTAS: Cuentas bancarias del cliente.
     """
     __tablename__ = 'CORE_CUENTAS'
+    __table_args__ = (
+        # Cuentas de un cliente (TRX001) y join cliente -> cuentas -> movimientos (TRX004)
+        db.Index('ix_CORE_CUENTAS_COD_CLIENTE_NUM_CUENTA', 'COD_CLIENTE', 'NUM_CUENTA'),
+    )
 
     num_cuenta = db.Column('NUM_CUENTA', db.String(20), primary_key=True, comment='CCI o interna')
     cod_cliente = db.Column('COD_CLIENTE', db.Integer, db.ForeignKey('CORE_CLIENTES.COD_CLIENTE'), nullable=False)
@@ -80,6 +92,12 @@ class Movimiento(db.Model):
     Tabla CORE_MOVIMIENTOS: Transacciones históricas.
     """
     __tablename__ = 'CORE_MOVIMIENTOS'
+    __table_args__ = (
+        # Movimientos de una cuenta en un rango de fechas (TRX002 / TRX004)
+        db.Index('ix_CORE_MOVIMIENTOS_NUM_CUENTA_FECHA_PROCESO', 'NUM_CUENTA', 'FECHA_PROCESO'),
+        # Paginación keyset de TRX003: búsqueda por (cuenta, MCC) ordenada por ID_TRX
+        db.Index('ix_CORE_MOVIMIENTOS_NUM_CUENTA_COD_COMERCIO_ID_TRX', 'NUM_CUENTA', 'COD_COMERCIO', 'ID_TRX'),
+    )
 
     id_trx = db.Column('ID_TRX', db.String(26), primary_key=True, comment='Timestamp + Secuencia única')
     num_cuenta = db.Column('NUM_CUENTA', db.String(20), db.ForeignKey('CORE_CUENTAS.NUM_CUENTA'), nullable=False)
@@ -94,3 +112,35 @@ class Movimiento(db.Model):
     ubicacion_trx = db.Column('UBICACION_TRX', db.String(50))
     saldo_post_trx = db.Column('SALDO_POST_TRX', db.Numeric(15, 2), comment='Saldo remanente')
 
+class ResumenGastoMensual(db.Model):
+    """
+    Tabla CORE_RESUMEN_GASTO_MENSUAL: Acumulado mensual por cuenta y categoría (rollup).
+    Se mantiene incrementalmente al registrar movimientos y se puede reconstruir
+    con `flask analytics rebuild-rollup`. Alimenta la analítica de TRX004.
+    """
+    __tablename__ = 'CORE_RESUMEN_GASTO_MENSUAL'
+    __table_args__ = (
+        db.Index('ix_CORE_RESUMEN_GASTO_MENSUAL_COD_CLIENTE_PERIODO', 'COD_CLIENTE', 'PERIODO'),
+    )
+
+    num_cuenta = db.Column('NUM_CUENTA', db.String(20), primary_key=True)
+    periodo = db.Column('PERIODO', db.Date, primary_key=True, comment='Primer día del mes')
+    id_categoria = db.Column('ID_CATEGORIA', db.Integer, primary_key=True, autoincrement=False, comment='0 = Sin categoría (movimiento sin MCC)')
+    cod_cliente = db.Column('COD_CLIENTE', db.Integer, nullable=False)
+    total_debito = db.Column('TOTAL_DEBITO', db.Numeric(15, 2), nullable=False, default=0)
+    qty_pequeno = db.Column('QTY_PEQUENO', db.Integer, nullable=False, default=0, comment='Débitos < 50')
+    qty_mediano = db.Column('QTY_MEDIANO', db.Integer, nullable=False, default=0, comment='Débitos entre 50 y 200')
+    qty_grande = db.Column('QTY_GRANDE', db.Integer, nullable=False, default=0, comment='Débitos > 200')
+    qty_movimientos = db.Column('QTY_MOVIMIENTOS', db.Integer, nullable=False, default=0, comment='Débitos y créditos del mes')
+    updated_at = db.Column('UPDATED_AT', db.DateTime, default=datetime.utcnow)
+
+class EstadoRollup(db.Model):
+    """
+    Tabla CORE_ROLLUP_ESTADO: marca de construcción de cada rollup.
+    Mientras un rollup no tiene su fila (nunca se reconstruyó por completo) no se mantiene
+    incrementalmente ni se lee: TRX004 agrega CORE_MOVIMIENTOS.
+    """
+    __tablename__ = 'CORE_ROLLUP_ESTADO'
+
+    tabla = db.Column('TABLA', db.String(60), primary_key=True)
+    construido_at = db.Column('CONSTRUIDO_AT', db.DateTime, nullable=False, default=datetime.utcnow)
@@ -1,6 +1,5 @@
 from app.extensions import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 
 class TokenBlocklist(db.Model):
     """
@@ -10,7 +9,9 @@ class TokenBlocklist(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     jti = db.Column(db.String(36), nullable=False, index=True, comment='ID único del token (JWT ID)')
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Indexada: la sincronización del filtro en memoria lee las revocaciones desde un watermark
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True, comment='Expiración del token (claim exp). Pasada esta fecha la fila se puede eliminar')
 
 class GamificacionAnimal(db.Model):
     __tablename__ = 'GAMIFICACION_ANIMALES'
@@ -36,16 +37,31 @@ class Usuario(db.Model):
     nivel_financiero = db.Column('NIVEL_FINANCIERO', db.Integer, db.ForeignKey('GAMIFICACION_ANIMALES.NIVEL_ID'), default=1, comment='Nivel actual del usuario')
     animal_actual = db.Column('ANIMAL_ACTUAL', db.String(20), default='Perezoso', comment='Nombre del arquetipo actual')
     created_at = db.Column('CREATED_AT', db.DateTime, default=datetime.utcnow)
+    cod_cliente_core = db.Column('COD_CLIENTE_CORE', db.String(20), nullable=True, comment='COD_CLIENTE vinculado en el Core Bancario')
+    vinculo_validado_at = db.Column('VINCULO_VALIDADO_AT', db.DateTime, nullable=True, comment='Última validación del vínculo contra el Core Bancario')
 
     # Relaciones
     metas = db.relationship('Meta', backref='usuario', lazy=True)
     gastos_manuales = db.relationship('GastoManual', backref='usuario', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.extensions import password_hasher
+        self.password_hash = password_hasher.generar(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """
+        Verifica la contraseña en el pool de hashing. Si es válida y el hash usa
+        parámetros distintos a los configurados, lo regenera (el commit queda a cargo del llamador).
+        """
+        from app.extensions import password_hasher
+        from app.services.password_hasher import HashQueueFullError
+        valida, necesita_rehash = password_hasher.verificar(self.password_hash, password)
+        if necesita_rehash:
+            try:
+                self.password_hash = password_hasher.generar(password)
+            except HashQueueFullError:
+                pass  # Se reintenta en el próximo login
+        return valida
     presupuestos = db.relationship('Presupuesto', backref='usuario', lazy=True)
     desgloses = db.relationship('DesgloseMovimiento', backref='usuario', lazy=True)
 
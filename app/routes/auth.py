@@ -1,13 +1,26 @@
 from flask import Blueprint, request, jsonify
 from app.models.mobile_app import Usuario, TokenBlocklist
-from app.services.core_banking_service import CoreBankingService
-from app.extensions import db
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt
+from app.services.vinculo_cliente_service import VinculoClienteService
+from app.extensions import db, revoked_tokens
+from app.services.password_hasher import HashQueueFullError
+from app.services.mainframe_client import MainframeNoDisponibleError
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
+from datetime import datetime
 import uuid
 import random
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
+def _servicio_saturado():
+    respuesta = jsonify({"msg": "Servicio de autenticación saturado, reintente en unos segundos"})
+    respuesta.headers['Retry-After'] = '1'
+    return respuesta, 503
+
+def _core_no_disponible():
+    respuesta = jsonify({"msg": "Core Bancario no disponible, reintente en unos segundos"})
+    respuesta.headers['Retry-After'] = '5'
+    return respuesta, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
@@ -42,6 +55,8 @@ def register():
         description: Usuario creado exitosamente
       400:
         description: Faltan datos o usuario ya existe
+      503:
+        description: Core Bancario no disponible (no se pudo validar el DNI)
     """
     data = request.get_json()
     
@@ -57,7 +72,10 @@ def register():
         
     # Validar que el DNI exista en el Core Bancario (Mainframe)
     # Solo clientes del banco pueden registrarse en la App
-    cliente_core = CoreBankingService.obtener_cliente(dni)
+    try:
+        cliente_core = VinculoClienteService.buscar_cliente_para_registro(dni)
+    except MainframeNoDisponibleError:
+        return _core_no_disponible()
     if not cliente_core:
         return jsonify({"msg": "El DNI no corresponde a un cliente activo del banco"}), 400
 
@@ -70,7 +88,11 @@ def register():
         dni_vinculado=dni,
         nickname=nickname
     )
-    new_user.set_password(password)
+    try:
+        new_user.set_password(password)
+    except HashQueueFullError:
+        return _servicio_saturado()
+    VinculoClienteService.vincular(new_user, cliente_core)
     
     db.session.add(new_user)
     db.session.commit()
@@ -136,6 +158,8 @@ def login():
                   example: "Perezoso"
       401:
         description: Credenciales inválidas o Cliente no encontrado en Core Bancario
+      503:
+        description: Core Bancario no disponible y el usuario no tiene vínculo guardado
     """
     data = request.get_json()
     
@@ -147,15 +171,25 @@ def login():
         
     user = Usuario.query.filter_by(dni_vinculado=dni).first()
     
-    if not user or not user.check_password(password):
+    try:
+        credenciales_validas = user is not None and user.check_password(password)
+    except HashQueueFullError:
+        return _servicio_saturado()
+
+    if not credenciales_validas:
         return jsonify({"msg": "Credenciales inválidas"}), 401
+
+    # Hash regenerado con los parámetros actuales (PASSWORD_HASH_METHOD cambió)
+    if user in db.session.dirty:
+        db.session.commit()
         
-    # 2. Validar contra Mainframe y obtener Código de Cliente
-    cliente_core = CoreBankingService.obtener_cliente(dni)
-    if not cliente_core:
+    # 2. Obtener Código de Cliente (vínculo guardado; se revalida contra el Mainframe al vencer)
+    try:
+        cod_cliente = VinculoClienteService.obtener_cod_cliente(user)
+    except MainframeNoDisponibleError:
+        return _core_no_disponible()
+    if cod_cliente is None:
         return jsonify({"msg": "Cliente no encontrado en Core Bancario"}), 401
-        
-    cod_cliente = cliente_core.get('cod_cliente')
 
     # Crear token de acceso
     # Podemos incluir el cod_cliente en el token si es útil para futuras peticiones
@@ -174,6 +208,44 @@ def login():
         }
     }), 200
 
+@auth_bp.route('/resync', methods=['POST'])
+@jwt_required()
+def resync():
+    """
+    Re-sincronizar el vínculo con el Core Bancario.
+    Vuelve a consultar el cliente en el Mainframe (sin esperar la ventana de revalidación)
+    y retorna un token nuevo con el cod_cliente actualizado.
+    ---
+    tags:
+      - Autenticación
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Vínculo actualizado. Retorna un nuevo token.
+      401:
+        description: Cliente no encontrado en Core Bancario
+      503:
+        description: Core Bancario no disponible
+    """
+    user = db.session.get(Usuario, get_jwt_identity())
+    if not user:
+        return jsonify({"msg": "Usuario no encontrado"}), 401
+
+    try:
+        cod_cliente = VinculoClienteService.obtener_cod_cliente(user, forzar=True)
+    except MainframeNoDisponibleError:
+        return _core_no_disponible()
+    if cod_cliente is None:
+        return jsonify({"msg": "Cliente no encontrado en Core Bancario"}), 401
+
+    access_token = create_access_token(identity=user.user_uuid, additional_claims={"cod_cliente": cod_cliente})
+    return jsonify({
+        "msg": "Vínculo re-sincronizado",
+        "access_token": access_token,
+        "cod_cliente": cod_cliente
+    }), 200
+
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
@@ -189,10 +261,16 @@ def logout():
       200:
         description: Logout exitoso
     """
-    jti = get_jwt()["jti"]
+    token = get_jwt()
+    jti = token["jti"]
     
-    # Guardar JTI en la base de datos (Blocklist)
-    db.session.add(TokenBlocklist(jti=jti))
+    # Guardar JTI en la base de datos (Blocklist) junto con su expiración,
+    # para poder compactar la tabla cuando el token ya no sea válido
+    expires_at = datetime.utcfromtimestamp(token["exp"]) if token.get("exp") else None
+    db.session.add(TokenBlocklist(jti=jti, expires_at=expires_at))
     db.session.commit()
+
+    # Revocación inmediata en este worker; los demás la verán en su próxima sincronización
+    revoked_tokens.registrar(jti, token.get("exp"))
     
     return jsonify({"msg": "Logout exitoso. Token revocado."}), 200
@@ -0,0 +1,23 @@
+from flask import Blueprint, jsonify, current_app
+import threading
+
+# Especificación OpenAPI generada bajo demanda (SWAGGER_MODE = 'lazy'):
+# flasgger se importa y recorre las rutas en la primera petición, no al arrancar el worker.
+docs_bp = Blueprint('docs', __name__)
+
+_spec = None
+_lock = threading.Lock()
+
+@docs_bp.route('/apispec_1.json', methods=['GET'])
+def get_apispec():
+    global _spec
+    if _spec is None:
+        with _lock:
+            if _spec is None:
+                from flasgger import Swagger
+
+                swagger = Swagger()
+                swagger.app = current_app._get_current_object()
+                swagger.load_config(swagger.app)
+                _spec = swagger.get_apispecs('apispec_1')
+    return jsonify(_spec), 200
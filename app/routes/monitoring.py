@@ -0,0 +1,174 @@
+import hmac
+import math
+from flask import Blueprint, Response, current_app, jsonify, request
+from app.extensions import mainframe, core_cache, revoked_tokens, catalogo_mcc, metricas, guardia_consultas, compresion
+
+monitoring_bp = Blueprint('monitoring', __name__, url_prefix='/monitoring')
+
+# /metrics va en la raíz (ruta por defecto de Prometheus)
+metrics_bp = Blueprint('metrics', __name__)
+
+LOCALHOST = ('127.0.0.1', '::1')
+
+
+def _verificar_acceso():
+    """
+    Acceso a los endpoints internos: `Authorization: Bearer <MONITORING_TOKEN>`.
+    Sin MONITORING_TOKEN configurado solo se atienden peticiones desde localhost.
+    """
+    token = current_app.config.get('MONITORING_TOKEN')
+    if token is None:
+        if request.remote_addr in LOCALHOST:
+            return None
+        return jsonify({"msg": "Monitoreo disponible solo desde localhost (MONITORING_TOKEN no configurado)"}), 403
+    esquema, _, recibido = request.headers.get('Authorization', '').partition(' ')
+    if esquema.lower() != 'bearer' or not hmac.compare_digest(recibido.encode(), token.encode()):
+        return jsonify({"msg": "Token de monitoreo inválido"}), 401
+    return None
+
+
+monitoring_bp.before_request(_verificar_acceso)
+metrics_bp.before_request(_verificar_acceso)
+
+@monitoring_bp.route('/circuit-breakers', methods=['GET'])
+def get_circuit_breakers():
+    """
+    Estado de los Circuit Breakers del Mainframe.
+
+    Devuelve, por transacción (TRX001..TRX004, CLIENTE), el estado del breaker
+    (CLOSED / OPEN / HALF_OPEN), las llamadas en vuelo del bulkhead y los contadores acumulados.
+    Los valores son por worker (proceso).
+    ---
+    tags:
+      - Monitoreo
+    responses:
+      200:
+        description: Estado y contadores de cada breaker.
+    """
+    return jsonify({
+        "data": {
+            "breakers": mainframe.estado_breakers()
+        }
+    }), 200
+
+@monitoring_bp.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """
+    Estadísticas de la caché de respuestas TRX001 / TRX002.
+    Valores por worker (proceso).
+    ---
+    tags:
+      - Monitoreo
+    responses:
+      200:
+        description: Entradas, bytes estimados, hits, misses y evictions.
+    """
+    return jsonify({"data": core_cache.stats()}), 200
+
+@monitoring_bp.route('/token-blocklist', methods=['GET'])
+def get_token_blocklist_stats():
+    """
+    Estado del filtro en memoria de tokens revocados y tamaño de TOKEN_BLOCKLIST.
+    Los valores del filtro son por worker (proceso).
+    ---
+    tags:
+      - Monitoreo
+    responses:
+      200:
+        description: JTIs en memoria, estado de la sincronización y métricas de la tabla.
+    """
+    from app.services.token_blocklist_service import TokenBlocklistService
+
+    return jsonify({
+        "data": {
+            "filtro": revoked_tokens.stats(),
+            "tabla": TokenBlocklistService.estadisticas()
+        }
+    }), 200
+
+@monitoring_bp.route('/mcc-catalog', methods=['GET'])
+def get_mcc_catalog_stats():
+    """
+    Estado del catálogo MCC -> categoría en memoria (versión, tamaño y recargas).
+    Valores por worker (proceso).
+    ---
+    tags:
+      - Monitoreo
+    responses:
+      200:
+        description: Versión vigente, huella del contenido y contadores de recarga.
+    """
+    return jsonify({"data": catalogo_mcc.stats()}), 200
+
+@monitoring_bp.route('/mcc-catalog/refresh', methods=['POST'])
+def refresh_mcc_catalog():
+    """
+    Recarga bajo demanda el catálogo MCC -> categoría desde CORE_MCC / CORE_CATEGORIA.
+    Solo afecta al worker (proceso) que atiende la petición; el resto recarga al vencer su TTL.
+    Como máximo una recarga forzada cada MCC_CATALOG_REFRESH_MIN_SECONDS por worker.
+    ---
+    tags:
+      - Monitoreo
+    responses:
+      200:
+        description: Catálogo recargado.
+      429:
+        description: Se recargó hace menos de MCC_CATALOG_REFRESH_MIN_SECONDS (ver Retry-After).
+    """
+    minimo = current_app.config.get('MCC_CATALOG_REFRESH_MIN_SECONDS', 10)
+    transcurrido = catalogo_mcc.segundos_desde_recarga()
+    if transcurrido is not None and transcurrido < minimo:
+        espera = math.ceil(minimo - transcurrido)
+        respuesta = jsonify({"msg": f"El catálogo se recargó hace {transcurrido:.0f}s; reintente en {espera}s",
+                             "data": catalogo_mcc.stats()})
+        return respuesta, 429, {"Retry-After": str(espera)}
+    catalogo_mcc.refrescar()
+    return jsonify({"data": catalogo_mcc.stats()}), 200
+
+
+@monitoring_bp.route('/query-guard', methods=['GET'])
+def get_query_guard_stats():
+    """
+    Estado de la guardia de consultas SQL (modo, presupuesto por defecto y últimas violaciones).
+    Valores por worker (proceso).
+    ---
+    tags:
+      - Monitoreo
+    responses:
+      200:
+        description: Requests revisados, violaciones de presupuesto / N+1 y los últimos mensajes.
+    """
+    return jsonify({"data": guardia_consultas.stats()}), 200
+
+@monitoring_bp.route('/compression', methods=['GET'])
+def get_compression_stats():
+    """
+    Estado de la compresión de respuestas (algoritmos disponibles, umbral y bytes ahorrados).
+    Valores por worker (proceso).
+    ---
+    tags:
+      - Monitoreo
+    responses:
+      200:
+        description: Respuestas comprimidas por algoritmo y bytes antes / después (sin contar streaming).
+    """
+    return jsonify({"data": compresion.stats()}), 200
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Métricas de rendimiento en formato de exposición Prometheus.
+
+    Histogramas de duración de requests (por regla de URL, método y clase de status),
+    sentencias SQL y tiempo de BD por request, y latencia de cada transacción al Mainframe.
+    Los valores son por worker (proceso).
+    ---
+    tags:
+      - Monitoreo
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Texto en formato Prometheus (version=0.0.4).
+    """
+    return Response(metricas.exponer(), mimetype='text/plain; version=0.0.4')
@@ -1,9 +1,328 @@
-from flask import Blueprint, jsonify
+import csv
+import hashlib
+import io
+from datetime import datetime
+from flask import Blueprint, jsonify, current_app, make_response, request, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt
+from app.extensions import core_cache
 from app.services.core_banking_service import CoreBankingService
+from app.services.dashboard_service import DashboardService
+from app.services.metricas_rendimiento import tramo
+from app.models.core_banking import Cuenta
 
 products_bp = Blueprint('products', __name__, url_prefix='/api/v1')
 
+def _marcar_stale(respuesta, data_mainframe):
+    """
+    Si el Mainframe no respondió y se sirvió la última respuesta conocida (circuit breaker abierto),
+    lo indicamos al cliente con `stale: true`.
+    """
+    if data_mainframe.get('STALE'):
+        respuesta["stale"] = True
+    return respuesta
+
+# --- Mapeo COBOL -> JSON App (compartido por las vistas síncronas, las async de products_async y el dashboard) ---
+# Retornan (cuerpo, status); Flask serializa el dict igual que jsonify.
+# Su duración se reporta como el tramo `mapeo` del Server-Timing.
+
+@tramo('mapeo')
+def _respuesta_posicion_global(data_mainframe):
+    if not data_mainframe:
+        # Caso: Cliente sin productos o error en Mainframe
+        return {"data": {"cuentas": []}}, 200
+        
+    # Lógica de Middleware: Cruce de Información (Match)
+    # Recibimos listas planas del "Mainframe" y las cruzamos aquí.
+    
+    cuentas_raw = data_mainframe.get('TABLA-CUENTAS', [])
+    tarjetas_raw = data_mainframe.get('TABLA-TARJETAS', [])
+    
+    lista_cuentas_final = []
+    
+    for cuenta in cuentas_raw:
+        num_cuenta = cuenta['CTA-NUMERO']
+        
+        # Buscar si hay tarjeta asociada a esta cuenta en la lista de tarjetas
+        # Usamos TRJ-CTA-LINK para hacer el match
+        tarjeta_asociada = next((t for t in tarjetas_raw if t['TRJ-CTA-LINK'] == num_cuenta), None)
+        
+        tarjeta_visual = None
+        if tarjeta_asociada:
+            # Enmascarar tarjeta: 4557 **** **** 1234
+            pan = tarjeta_asociada['TRJ-NUMERO']
+            if len(pan) == 16:
+                tarjeta_visual = f"{pan[:4]} **** **** {pan[-4:]}"
+            else:
+                tarjeta_visual = pan
+        
+        item_cuenta = {
+            "nro_cuenta": num_cuenta,
+            "moneda": cuenta['CTA-MONEDA'],
+            "saldo": cuenta['CTA-SALDO'],
+            "tarjeta_visual": tarjeta_visual
+        }
+        lista_cuentas_final.append(item_cuenta)
+        
+    return _marcar_stale({
+        "data": {
+            "cuentas": lista_cuentas_final
+        }
+    }, data_mainframe), 200
+
+@tramo('mapeo')
+def _respuesta_detalle_cuenta(data_mainframe):
+    if not data_mainframe:
+        return {"msg": "Cuenta no encontrada o error en Mainframe"}, 404
+        
+    # Transformación de Middleware (Mapping COBOL -> JSON App)
+    
+    # Cabecera
+    # Nota: Asumimos moneda PEN por defecto o la sacamos de otra consulta si fuera necesario.
+    # En TRX002 simplificado solo viene saldo.
+    cabecera = {
+        "saldo": data_mainframe.get('SALDO-ACTUAL'),
+        "moneda": "PEN" # Podría venir del COBOL si se agrega al copybook
+    }
+    
+    # Resumen Categorías (Viene listo del COBOL)
+    resumen_categorias = []
+    for item in data_mainframe.get('TABLA-RESUMEN', []):
+        resumen_categorias.append({
+            "categoria": item['CAT-NOMBRE'],
+            "total": item['CAT-TOTAL']
+        })
+        
+    # Movimientos
+    movimientos = []
+    for mov in data_mainframe.get('TABLA-MOVS', []):
+        movimientos.append({
+            "fecha": mov['MOV-FECHA'],
+            "glosa": mov['MOV-GLOSA'],
+            "monto": mov['MOV-MONTO'],
+            "categoria": mov['MOV-CAT-DESC']
+        })
+        
+    return _marcar_stale({
+        "data": {
+            "cabecera": cabecera,
+            "resumen_categorias": resumen_categorias,
+            "movimientos": movimientos
+        }
+    }, data_mainframe), 200
+
+def _parametros_movimientos(num_cuenta, cod_cliente):
+    """
+    Lee los parámetros de TRX003 del query string y valida que la cuenta sea del cliente.
+    Retorna (kwargs para obtener_movimientos_paginados, None) o (None, respuesta de error).
+    """
+    category = request.args.get('category')
+    category_id = request.args.get('category_id', type=int)
+    cursor = request.args.get('cursor')
+    last_id = request.args.get('last_id')
+    page_size = request.args.get('page_size', current_app.config.get('TRX003_DEFAULT_PAGE_SIZE', 15), type=int)
+    page_size = max(1, min(page_size, current_app.config.get('TRX003_MAX_PAGE_SIZE', 50)))
+    
+    if not category and category_id is None:
+        return None, ({"msg": "El parámetro 'category' o 'category_id' es obligatorio"}, 400)
+        
+    # El servicio TRX003 solo recibe num_cuenta: la propiedad de la cuenta se valida aquí antes de llamar.
+    cuenta_propia = Cuenta.query.filter_by(num_cuenta=num_cuenta, cod_cliente=cod_cliente).first()
+    if not cuenta_propia:
+        return None, ({"msg": "Cuenta no encontrada o no autorizada"}, 404)
+
+    return {
+        "categoria": category,
+        "last_id": last_id,
+        "limit": page_size,
+        "id_categoria": category_id,
+        "cursor": cursor,
+    }, None
+
+@tramo('mapeo')
+def _respuesta_movimientos(resultado):
+    if resultado is None:
+        return {"msg": "Core Bancario no disponible"}, 503
+
+    if resultado.get('STALE'):
+        resultado = {k: v for k, v in resultado.items() if k != 'STALE'}
+        resultado["stale"] = True
+    
+    return resultado, 200
+
+@tramo('mapeo')
+def _respuesta_metricas(data_mainframe):
+    if not data_mainframe:
+        return {"msg": "Core Bancario no disponible"}, 503
+    
+    metricas = data_mainframe.get('METRICAS-GASTO', {})
+    top_categoria = metricas.get('TOP-CATEGORIA', 'Ninguna')
+    qty_peq = metricas.get('QTY-PEQUENO', 0)
+    qty_med = metricas.get('QTY-MEDIANO', 0)
+    qty_gra = metricas.get('QTY-GRANDE', 0)
+    
+    # Lógica Middleware: Cálculo de Porcentajes
+    total_tx = qty_peq + qty_med + qty_gra
+    
+    if total_tx > 0:
+        pct_pequeno = round((qty_peq / total_tx) * 100, 1)
+        pct_mediano = round((qty_med / total_tx) * 100, 1)
+        pct_grande = round((qty_gra / total_tx) * 100, 1)
+    else:
+        pct_pequeno = pct_mediano = pct_grande = 0
+
+    # Lógica Middleware: Asignación de Animal (Gamificación)
+    # Mapa de Arquetipos
+    animal_map = {
+        "Ahorro e Inversión": "Hormiga", # Trabajadora
+        "Transporte y Viajes": "Águila", # Exploradora
+        "Alimentación": "Oso",           # Disfruta la vida
+        "Tecnología": "Búho",            # Sabio/Tech
+        "Entretenimiento": "Delfín",     # Juguetón (Extra)
+        "Ninguna": "Perezoso"            # Default
+    }
+    
+    # Búsqueda aproximada o directa
+    # Si la categoría exacta no está, usamos un default o lógica difusa
+    # Aquí usamos coincidencia parcial simple o default a Perezoso
+    animal = animal_map.get(top_categoria, "Perezoso")
+    
+    # Si no está en el mapa exacto, intentamos buscar palabras clave
+    if animal == "Perezoso" and top_categoria != "Ninguna":
+        if "Viajes" in top_categoria: animal = "Águila"
+        elif "Tecnología" in top_categoria or "Servicios" in top_categoria: animal = "Búho"
+        elif "Restaurantes" in top_categoria or "Comida" in top_categoria: animal = "Oso"
+    
+    return _marcar_stale({
+        "data": {
+            "top_categoria": top_categoria,
+            "animal_financiero": animal,
+            "distribucion_gastos": {
+                "pequeno": {"qty": qty_peq, "percentage": pct_pequeno},
+                "mediano": {"qty": qty_med, "percentage": pct_mediano},
+                "grande": {"qty": qty_gra, "percentage": pct_grande}
+            },
+            "total_transacciones_mes": total_tx
+        }
+    }, data_mainframe), 200
+
+def _respuesta_dashboard(resultado):
+    """
+    Combina TRX001 + TRX002 (por cuenta) + TRX004 con el mismo mapeo de los endpoints individuales.
+    Si falla alguna sub-llamada se entrega el resto (`errores` indica cuáles); 503 solo si fallan todas.
+    """
+    posicion, _ = _respuesta_posicion_global(resultado["TRX001"])
+    stale = bool(posicion.get("stale"))
+
+    cuentas = posicion["data"]["cuentas"]
+    for cuenta in cuentas:
+        detalle = resultado["TRX002"].get(cuenta["nro_cuenta"])
+        cuerpo, status = _respuesta_detalle_cuenta(detalle)
+        cuenta["resumen"] = cuerpo["data"] if status == 200 else None
+        stale = stale or bool(cuerpo.get("stale"))
+
+    personalidad = None
+    if resultado["TRX004"]:
+        cuerpo, _ = _respuesta_metricas(resultado["TRX004"])
+        personalidad = cuerpo["data"]
+        stale = stale or bool(cuerpo.get("stale"))
+
+    if resultado["TRX001"] is None and personalidad is None:
+        return {"msg": "Core Bancario no disponible", "errores": resultado["errores"]}, 503
+
+    respuesta = {
+        "data": {
+            "cuentas": cuentas,
+            "personalidad_financiera": personalidad
+        },
+        "errores": resultado["errores"]
+    }
+    if stale:
+        respuesta["stale"] = True
+    return respuesta, 200
+
+# --- GET condicional (ETags débiles) ---
+# El ETag se deriva de un marcador de versión barato (CoreBankingService.version_*): si coincide con
+# If-None-Match se responde 304 sin ejecutar la TRX. Sin marcador (Mainframe real) se usa un hash del cuerpo,
+# que solo ahorra ancho de banda.
+
+def _etags_activos():
+    return current_app.config.get('ETAGS_ENABLED', True)
+
+
+def _marcador_de_version():
+    """
+    TRX001 / TRX002: el ETag por marcador de versión (304 sin ejecutar la TRX) solo se usa sin
+    caché de respuestas. Con la caché activa la respuesta cacheada no cuesta consultas: se sirve
+    desde la caché y el ETag se deriva de su contenido (`_condicional`).
+    """
+    return _etags_activos() and not core_cache.enabled
+
+
+def _etag_de(trx, cod_cliente, version):
+    """ETag del recurso para el cliente a partir de su marcador de versión (None si no hay marcador)."""
+    if version is None:
+        return None
+    return hashlib.sha1(repr((trx, str(cod_cliente), version)).encode('utf-8')).hexdigest()
+
+
+def _no_modificado(etag):
+    """Respuesta 304 si el cliente ya tiene esta versión (If-None-Match); si no, None."""
+    if not etag or not request.if_none_match.contains_weak(etag):
+        return None
+    respuesta = current_app.response_class(status=304)
+    respuesta.set_etag(etag, weak=True)
+    respuesta.headers['Cache-Control'] = 'private, no-cache'
+    return respuesta
+
+
+def _condicional(cuerpo_status, etag):
+    """Agrega el ETag a una respuesta 200 (el del marcador o, sin él, uno derivado del contenido)."""
+    respuesta = make_response(cuerpo_status)
+    if respuesta.status_code != 200 or not _etags_activos():
+        return respuesta
+    # El cliente puede guardarla pero debe revalidar siempre (la revalidación cuesta un 304)
+    respuesta.headers['Cache-Control'] = 'private, no-cache'
+    if etag:
+        respuesta.set_etag(etag, weak=True)
+    else:
+        respuesta.add_etag(weak=True)
+    return respuesta.make_conditional(request)
+
+# --- Exportación del historial (streaming) ---
+
+COLUMNAS_EXPORTACION = ("id_transaccion", "fecha", "tipo", "monto", "moneda", "glosa", "categoria")
+
+
+def _lineas_ndjson(lotes):
+    for lote in lotes:
+        # Proveedor JSON de la app: el monto (Decimal) se escribe exacto
+        yield "".join(current_app.json.dumps(mov) + "\n" for mov in lote)
+
+
+def _lineas_csv(lotes):
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=COLUMNAS_EXPORTACION)
+    escritor.writeheader()
+    for lote in lotes:
+        escritor.writerows(lote)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _fecha_param(nombre):
+    """Fecha YYYY-MM-DD del query string (None si no viene). Lanza ValueError si no es válida."""
+    valor = request.args.get(nombre)
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"El parámetro '{nombre}' debe tener formato YYYY-MM-DD")
+
+
 @products_bp.route('/products', methods=['GET'])
 @jwt_required()
 def get_global_position():
@@ -48,6 +367,8 @@ def get_global_position():
                         type: string
                         example: "4557 **** **** 1234"
                         description: Número de tarjeta enmascarado (o null si no tiene tarjeta asociada)
+      304:
+        description: Sin cambios respecto al ETag enviado en If-None-Match.
       400:
         description: Token inválido o sin cod_cliente.
       401:
@@ -60,51 +381,20 @@ def get_global_position():
     if not cod_cliente:
         return jsonify({"msg": "Token inválido: No contiene cod_cliente"}), 400
     
-    # 2. Invocar al Servicio del Core Banking (Simulación TRX001)
+    # 2. GET condicional: si las cuentas no cambiaron desde el ETag del cliente, 304 sin ejecutar TRX001
+    etag = None
+    if _marcador_de_version():
+        etag = _etag_de('TRX001', cod_cliente, CoreBankingService.version_posicion_global(cod_cliente))
+        no_modificado = _no_modificado(etag)
+        if no_modificado:
+            return no_modificado
+
+    # 3. Invocar al Servicio del Core Banking (Simulación TRX001)
     # Ahora usamos directamente el Código de Cliente, mucho más eficiente.
-    data_mainframe = CoreBankingService.obtener_posicion_global(cod_cliente)
+    # Con ETag por marcador (caché deshabilitada) la respuesta debe corresponder a la versión leída.
+    data_mainframe = CoreBankingService.obtener_posicion_global(cod_cliente, usar_cache=etag is None)
     
-    if not data_mainframe:
-        # Caso: Cliente sin productos o error en Mainframe
-        return jsonify({"data": {"cuentas": []}}), 200
-        
-    # 4. Lógica de Middleware: Cruce de Información (Match)
-    # Recibimos listas planas del "Mainframe" y las cruzamos aquí.
-    
-    cuentas_raw = data_mainframe.get('TABLA-CUENTAS', [])
-    tarjetas_raw = data_mainframe.get('TABLA-TARJETAS', [])
-    
-    lista_cuentas_final = []
-    
-    for cuenta in cuentas_raw:
-        num_cuenta = cuenta['CTA-NUMERO']
-        
-        # Buscar si hay tarjeta asociada a esta cuenta en la lista de tarjetas
-        # Usamos TRJ-CTA-LINK para hacer el match
-        tarjeta_asociada = next((t for t in tarjetas_raw if t['TRJ-CTA-LINK'] == num_cuenta), None)
-        
-        tarjeta_visual = None
-        if tarjeta_asociada:
-            # Enmascarar tarjeta: 4557 **** **** 1234
-            pan = tarjeta_asociada['TRJ-NUMERO']
-            if len(pan) == 16:
-                tarjeta_visual = f"{pan[:4]} **** **** {pan[-4:]}"
-            else:
-                tarjeta_visual = pan
-        
-        item_cuenta = {
-            "nro_cuenta": num_cuenta,
-            "moneda": cuenta['CTA-MONEDA'],
-            "saldo": cuenta['CTA-SALDO'],
-            "tarjeta_visual": tarjeta_visual
-        }
-        lista_cuentas_final.append(item_cuenta)
-        
-    return jsonify({
-        "data": {
-            "cuentas": lista_cuentas_final
-        }
-    }), 200
+    return _condicional(_respuesta_posicion_global(data_mainframe), etag)
 
 @products_bp.route('/accounts/<path:num_cuenta>/summary', methods=['GET'])
 @jwt_required()
@@ -161,6 +451,8 @@ def get_account_summary(num_cuenta):
                         type: number
                       categoria:
                         type: string
+      304:
+        description: Sin cambios respecto al ETag enviado en If-None-Match.
       404:
         description: Cuenta no encontrada.
     """
@@ -171,48 +463,19 @@ def get_account_summary(num_cuenta):
     if not cod_cliente:
         return jsonify({"msg": "Token inválido: No contiene cod_cliente"}), 400
 
-    # 2. Invocar al Servicio del Core Banking (Simulación TRX002)
+    # 2. GET condicional: saldo y último movimiento sin cambios -> 304 sin ejecutar TRX002
+    etag = None
+    if _marcador_de_version():
+        etag = _etag_de('TRX002', cod_cliente, CoreBankingService.version_detalle_cuenta(num_cuenta, cod_cliente))
+        no_modificado = _no_modificado(etag)
+        if no_modificado:
+            return no_modificado
+
+    # 3. Invocar al Servicio del Core Banking (Simulación TRX002)
     # Pasamos cod_cliente para validar propiedad
-    data_mainframe = CoreBankingService.obtener_detalle_cuenta(num_cuenta, cod_cliente)
-    
-    if not data_mainframe:
-        return jsonify({"msg": "Cuenta no encontrada o error en Mainframe"}), 404
-        
-    # 2. Transformación de Middleware (Mapping COBOL -> JSON App)
+    data_mainframe = CoreBankingService.obtener_detalle_cuenta(num_cuenta, cod_cliente, usar_cache=etag is None)
     
-    # Cabecera
-    # Nota: Asumimos moneda PEN por defecto o la sacamos de otra consulta si fuera necesario.
-    # En TRX002 simplificado solo viene saldo.
-    cabecera = {
-        "saldo": data_mainframe.get('SALDO-ACTUAL'),
-        "moneda": "PEN" # Podría venir del COBOL si se agrega al copybook
-    }
-    
-    # Resumen Categorías (Viene listo del COBOL)
-    resumen_categorias = []
-    for item in data_mainframe.get('TABLA-RESUMEN', []):
-        resumen_categorias.append({
-            "categoria": item['CAT-NOMBRE'],
-            "total": item['CAT-TOTAL']
-        })
-        
-    # Movimientos
-    movimientos = []
-    for mov in data_mainframe.get('TABLA-MOVS', []):
-        movimientos.append({
-            "fecha": mov['MOV-FECHA'],
-            "glosa": mov['MOV-GLOSA'],
-            "monto": mov['MOV-MONTO'],
-            "categoria": mov['MOV-CAT-DESC']
-        })
-        
-    return jsonify({
-        "data": {
-            "cabecera": cabecera,
-            "resumen_categorias": resumen_categorias,
-            "movimientos": movimientos
-        }
-    }), 200
+    return _condicional(_respuesta_detalle_cuenta(data_mainframe), etag)
 
 @products_bp.route('/accounts/<string:num_cuenta>/details', methods=['GET'])
 @jwt_required()
@@ -231,14 +494,29 @@ def get_account_details_paginated(num_cuenta):
         type: string
       - in: query
         name: category
-        required: true
+        required: false
+        type: string
+        description: Nombre exacto de la categoría (Ej. Alimentación). Obligatorio si no se envía category_id
+      - in: query
+        name: category_id
+        required: false
+        type: integer
+        description: ID de la categoría (alternativa a category)
+      - in: query
+        name: cursor
+        required: false
         type: string
-        description: Nombre exacto de la categoría (Ej. Alimentación)
+        description: Valor meta.next_cursor de la página anterior (para paginación)
       - in: query
         name: last_id
         required: false
         type: string
-        description: ID de la última transacción recibida (para paginación)
+        description: ID de la última transacción recibida (obsoleto, usar cursor)
+      - in: query
+        name: page_size
+        required: false
+        type: integer
+        description: Movimientos por página (el servidor aplica un máximo)
     responses:
       200:
         description: Lista de movimientos paginada.
@@ -258,31 +536,18 @@ def get_account_details_paginated(num_cuenta):
     # Para ser estrictos como en TRX002:
     # (Podríamos agregar un método simple de validación en el servicio o hacerlo aquí)
     
-    # 2. Obtener parámetros
-    from flask import request
-    category = request.args.get('category')
-    last_id = request.args.get('last_id')
-    
-    if not category:
-        return jsonify({"msg": "El parámetro 'category' es obligatorio"}), 400
-        
+    # 2. Obtener parámetros y validar propiedad de la cuenta
+    parametros, error = _parametros_movimientos(num_cuenta, cod_cliente)
+    if error:
+        return error
+
     # 3. Invocar Servicio (TRX003)
-    # Nota: El servicio debería validar internamente que la cuenta sea del cliente si queremos seguridad total,
-    # o pasamos el cod_cliente para que filtre.
-    # En este caso, pasaremos solo num_cuenta y confiamos en que el atacante no adivine cuentas ajenas
-    # O MEJOR: Modificamos el servicio para aceptar cod_cliente y validar.
-    # Vamos a asumir que el servicio hace el filtro base.
-    
-    # Corrección: El servicio TRX003 implementado arriba solo recibe num_cuenta.
-    # Deberíamos validar propiedad aquí antes de llamar.
-    from app.models.core_banking import Cuenta
-    cuenta_propia = Cuenta.query.filter_by(num_cuenta=num_cuenta, cod_cliente=cod_cliente).first()
-    if not cuenta_propia:
-         return jsonify({"msg": "Cuenta no encontrada o no autorizada"}), 404
+    try:
+        resultado = CoreBankingService.obtener_movimientos_paginados(num_cuenta, **parametros)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
 
-    resultado = CoreBankingService.obtener_movimientos_paginados(num_cuenta, category, last_id)
-    
-    return jsonify(resultado), 200
+    return _respuesta_movimientos(resultado)
 
 @products_bp.route('/financial-personality', methods=['GET'])
 @jwt_required()
@@ -298,6 +563,8 @@ def get_financial_personality():
     responses:
       200:
         description: Métricas y arquetipo financiero.
+      304:
+        description: Sin cambios respecto al ETag enviado en If-None-Match.
     """
     # 1. Obtener cod_cliente del token
     claims = get_jwt()
@@ -306,58 +573,158 @@ def get_financial_personality():
     if not cod_cliente:
         return jsonify({"msg": "Token inválido"}), 400
 
-    # 2. Invocar Servicio (TRX004)
+    # 2. GET condicional: rollup del cliente sin cambios en el mes -> 304 sin ejecutar TRX004
+    etag = None
+    if _etags_activos():
+        etag = _etag_de('TRX004', cod_cliente, CoreBankingService.version_metricas(cod_cliente))
+        no_modificado = _no_modificado(etag)
+        if no_modificado:
+            return no_modificado
+
+    # 3. Invocar Servicio (TRX004)
     # Pasamos cod_cliente para análisis global
     data_mainframe = CoreBankingService.obtener_metricas_financieras(cod_cliente)
-    
-    metricas = data_mainframe.get('METRICAS-GASTO', {})
-    top_categoria = metricas.get('TOP-CATEGORIA', 'Ninguna')
-    qty_peq = metricas.get('QTY-PEQUENO', 0)
-    qty_med = metricas.get('QTY-MEDIANO', 0)
-    qty_gra = metricas.get('QTY-GRANDE', 0)
-    
-    # 3. Lógica Middleware: Cálculo de Porcentajes
-    total_tx = qty_peq + qty_med + qty_gra
-    
-    if total_tx > 0:
-        pct_pequeno = round((qty_peq / total_tx) * 100, 1)
-        pct_mediano = round((qty_med / total_tx) * 100, 1)
-        pct_grande = round((qty_gra / total_tx) * 100, 1)
-    else:
-        pct_pequeno = pct_mediano = pct_grande = 0
 
-    # 4. Lógica Middleware: Asignación de Animal (Gamificación)
-    # Mapa de Arquetipos
-    animal_map = {
-        "Ahorro e Inversión": "Hormiga", # Trabajadora
-        "Transporte y Viajes": "Águila", # Exploradora
-        "Alimentación": "Oso",           # Disfruta la vida
-        "Tecnología": "Búho",            # Sabio/Tech
-        "Entretenimiento": "Delfín",     # Juguetón (Extra)
-        "Ninguna": "Perezoso"            # Default
-    }
-    
-    # Búsqueda aproximada o directa
-    # Si la categoría exacta no está, usamos un default o lógica difusa
-    # Aquí usamos coincidencia parcial simple o default a Perezoso
-    animal = animal_map.get(top_categoria, "Perezoso")
-    
-    # Si no está en el mapa exacto, intentamos buscar palabras clave
-    if animal == "Perezoso" and top_categoria != "Ninguna":
-        if "Viajes" in top_categoria: animal = "Águila"
-        elif "Tecnología" in top_categoria or "Servicios" in top_categoria: animal = "Búho"
-        elif "Restaurantes" in top_categoria or "Comida" in top_categoria: animal = "Oso"
-    
-    return jsonify({
-        "data": {
-            "top_categoria": top_categoria,
-            "animal_financiero": animal,
-            "distribucion_gastos": {
-                "pequeno": {"qty": qty_peq, "percentage": pct_pequeno},
-                "mediano": {"qty": qty_med, "percentage": pct_mediano},
-                "grande": {"qty": qty_gra, "percentage": pct_grande}
-            },
-            "total_transacciones_mes": total_tx
-        }
-    }), 200
+    return _condicional(_respuesta_metricas(data_mainframe), etag)
+
+@products_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    """
+    Dashboard de apertura de la App (TRX001 + TRX002 por cuenta + TRX004).
+
+    Reemplaza la secuencia /products -> /accounts/<num_cuenta>/summary (por cuenta) -> /financial-personality
+    por un solo request: las transacciones se ejecutan en paralelo, cada una con su propio plazo
+    (DASHBOARD_SUBCALL_TIMEOUT). Si alguna falla o vence, se devuelve el resto y se detalla en `errores`.
+    ---
+    tags:
+      - Productos Financieros
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Dashboard completo o parcial (ver `errores`).
+        schema:
+          type: object
+          properties:
+            data:
+              type: object
+              properties:
+                cuentas:
+                  type: array
+                  description: Cuentas de /products; cada una con `resumen` (datos de /summary) o null si falló
+                  items:
+                    type: object
+                personalidad_financiera:
+                  type: object
+                  description: Datos de /financial-personality (o null si falló)
+            errores:
+              type: array
+              items:
+                type: object
+                properties:
+                  seccion:
+                    type: string
+                    example: "TRX002"
+                  nro_cuenta:
+                    type: string
+                  motivo:
+                    type: string
+                    example: "timeout"
+                    description: timeout, error o no_disponible
+      400:
+        description: Token inválido o sin cod_cliente.
+      503:
+        description: No respondió ninguna de las transacciones.
+    """
+    cod_cliente = get_jwt().get("cod_cliente")
+    if not cod_cliente:
+        return jsonify({"msg": "Token inválido: No contiene cod_cliente"}), 400
+
+    return _respuesta_dashboard(DashboardService.obtener(cod_cliente))
+
+@products_bp.route('/accounts/<string:num_cuenta>/export', methods=['GET'])
+@jwt_required()
+def export_account_movements(num_cuenta):
+    """
+    Exportar el historial completo de movimientos de una cuenta (NDJSON o CSV).
+
+    La respuesta se transmite por partes mientras se lee CORE_MOVIMIENTOS con un cursor del
+    servidor: no hay límite de filas y la memoria del servidor no depende del tamaño del historial.
+    ---
+    tags:
+      - Productos Financieros
+    produces:
+      - application/x-ndjson
+      - text/csv
+    parameters:
+      - in: path
+        name: num_cuenta
+        required: true
+        type: string
+      - in: query
+        name: format
+        required: false
+        type: string
+        enum: [ndjson, csv]
+        default: ndjson
+      - in: query
+        name: from
+        required: false
+        type: string
+        format: date
+        description: Fecha inicial inclusive (YYYY-MM-DD)
+      - in: query
+        name: to
+        required: false
+        type: string
+        format: date
+        description: Fecha final inclusive (YYYY-MM-DD)
+      - in: query
+        name: category
+        required: false
+        type: string
+        description: Nombre de la categoría
+      - in: query
+        name: category_id
+        required: false
+        type: integer
+        description: ID de la categoría (alternativa a category)
+    responses:
+      200:
+        description: Un movimiento por línea (id_transaccion, fecha, tipo, monto, moneda, glosa, categoria).
+      400:
+        description: Parámetros inválidos.
+      404:
+        description: Cuenta no encontrada o no autorizada.
+    """
+    cod_cliente = get_jwt().get("cod_cliente")
+    if not cod_cliente:
+        return jsonify({"msg": "Token inválido"}), 400
+
+    formato = request.args.get('format', 'ndjson').lower()
+    if formato not in ('ndjson', 'csv'):
+        return jsonify({"msg": "El parámetro 'format' debe ser 'ndjson' o 'csv'"}), 400
+    try:
+        desde, hasta = _fecha_param('from'), _fecha_param('to')
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    cuenta_propia = Cuenta.query.filter_by(num_cuenta=num_cuenta, cod_cliente=cod_cliente).first()
+    if not cuenta_propia:
+        return jsonify({"msg": "Cuenta no encontrada o no autorizada"}), 404
+
+    lotes = CoreBankingService.exportar_movimientos(
+        num_cuenta, desde, hasta,
+        categoria=request.args.get('category'), id_categoria=request.args.get('category_id', type=int)
+    )
+    if formato == 'csv':
+        cuerpo, mimetype = _lineas_csv(lotes), 'text/csv'
+    else:
+        cuerpo, mimetype = _lineas_ndjson(lotes), 'application/x-ndjson'
 
+    # stream_with_context: la sesión de BD (y el cursor) siguen disponibles mientras se transmite
+    return Response(stream_with_context(cuerpo), mimetype=mimetype, headers={
+        "Content-Disposition": f'attachment; filename="movimientos_{num_cuenta}.{formato}"',
+        "X-Accel-Buffering": "no",  # nginx: no acumular la respuesta antes de enviarla
+    })
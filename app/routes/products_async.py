@@ -0,0 +1,128 @@
+"""
+Versión async de las vistas de productos (PRODUCTS_VIEWS_MODE=async).
+
+Mismas URLs, nombre de blueprint y respuestas que app.routes.products: solo cambia que las
+transacciones al Mainframe se esperan con CoreBankingAsyncService (httpx) en lugar de
+bloquear el hilo. El mapeo COBOL -> JSON y la documentación Swagger son los de las vistas síncronas.
+"""
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from app.extensions import mainframe_async
+from app.routes import products as vistas_sync
+from app.routes.products import (
+    _respuesta_posicion_global, _respuesta_detalle_cuenta, _parametros_movimientos,
+    _respuesta_movimientos, _respuesta_metricas, _respuesta_dashboard,
+    _etags_activos, _marcador_de_version, _etag_de, _no_modificado, _condicional,
+)
+from app.services.core_banking_async_service import CoreBankingAsyncService
+from app.services.dashboard_service import DashboardService
+
+products_bp = Blueprint('products', __name__, url_prefix='/api/v1')
+
+
+def _documentada_como(vista_sync):
+    """Reutiliza el docstring (spec de flasgger) de la vista síncrona equivalente."""
+    def decorador(vista):
+        vista.__doc__ = vista_sync.__doc__
+        return vista
+    return decorador
+
+
+@products_bp.route('/products', methods=['GET'])
+@jwt_required()
+@_documentada_como(vistas_sync.get_global_position)
+async def get_global_position():
+    cod_cliente = get_jwt().get("cod_cliente")
+    if not cod_cliente:
+        return jsonify({"msg": "Token inválido: No contiene cod_cliente"}), 400
+
+    etag = None
+    if _marcador_de_version():
+        etag = _etag_de('TRX001', cod_cliente, await CoreBankingAsyncService.version_posicion_global(cod_cliente))
+        no_modificado = _no_modificado(etag)
+        if no_modificado:
+            return no_modificado
+
+    async with mainframe_async.sesion():
+        data_mainframe = await CoreBankingAsyncService.obtener_posicion_global(cod_cliente, usar_cache=etag is None)
+    return _condicional(_respuesta_posicion_global(data_mainframe), etag)
+
+
+@products_bp.route('/accounts/<path:num_cuenta>/summary', methods=['GET'])
+@jwt_required()
+@_documentada_como(vistas_sync.get_account_summary)
+async def get_account_summary(num_cuenta):
+    cod_cliente = get_jwt().get("cod_cliente")
+    if not cod_cliente:
+        return jsonify({"msg": "Token inválido: No contiene cod_cliente"}), 400
+
+    etag = None
+    if _marcador_de_version():
+        version = await CoreBankingAsyncService.version_detalle_cuenta(num_cuenta, cod_cliente)
+        etag = _etag_de('TRX002', cod_cliente, version)
+        no_modificado = _no_modificado(etag)
+        if no_modificado:
+            return no_modificado
+
+    async with mainframe_async.sesion():
+        data_mainframe = await CoreBankingAsyncService.obtener_detalle_cuenta(
+            num_cuenta, cod_cliente, usar_cache=etag is None
+        )
+    return _condicional(_respuesta_detalle_cuenta(data_mainframe), etag)
+
+
+@products_bp.route('/accounts/<string:num_cuenta>/details', methods=['GET'])
+@jwt_required()
+@_documentada_como(vistas_sync.get_account_details_paginated)
+async def get_account_details_paginated(num_cuenta):
+    cod_cliente = get_jwt().get("cod_cliente")
+    if not cod_cliente:
+        return jsonify({"msg": "Token inválido"}), 400
+
+    parametros, error = _parametros_movimientos(num_cuenta, cod_cliente)
+    if error:
+        return error
+
+    try:
+        async with mainframe_async.sesion():
+            resultado = await CoreBankingAsyncService.obtener_movimientos_paginados(num_cuenta, **parametros)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return _respuesta_movimientos(resultado)
+
+
+@products_bp.route('/financial-personality', methods=['GET'])
+@jwt_required()
+@_documentada_como(vistas_sync.get_financial_personality)
+async def get_financial_personality():
+    cod_cliente = get_jwt().get("cod_cliente")
+    if not cod_cliente:
+        return jsonify({"msg": "Token inválido"}), 400
+
+    etag = None
+    if _etags_activos():
+        etag = _etag_de('TRX004', cod_cliente, await CoreBankingAsyncService.version_metricas(cod_cliente))
+        no_modificado = _no_modificado(etag)
+        if no_modificado:
+            return no_modificado
+
+    async with mainframe_async.sesion():
+        data_mainframe = await CoreBankingAsyncService.obtener_metricas_financieras(cod_cliente)
+    return _condicional(_respuesta_metricas(data_mainframe), etag)
+
+
+@products_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+@_documentada_como(vistas_sync.get_dashboard)
+async def get_dashboard():
+    cod_cliente = get_jwt().get("cod_cliente")
+    if not cod_cliente:
+        return jsonify({"msg": "Token inválido: No contiene cod_cliente"}), 400
+
+    async with mainframe_async.sesion():
+        resultado = await DashboardService.obtener_async(cod_cliente)
+    return _respuesta_dashboard(resultado)
+
+
+# La exportación es un generador síncrono sobre la BD local (sin llamadas al Mainframe): se reutiliza la vista
+products_bp.add_url_rule('/accounts/<string:num_cuenta>/export', view_func=vistas_sync.export_account_movements)
@@ -0,0 +1,217 @@
+import csv
+import io
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from sqlalchemy import Date, DateTime, Integer, Numeric, text
+from flask import current_app
+from app.extensions import db, catalogo_mcc, core_cache
+
+# Orden de carga (respeta las FKs): categorías -> MCC -> clientes -> tarjetas -> cuentas -> movimientos
+TABLAS_CORE = ('CORE_CATEGORIA', 'CORE_MCC', 'CORE_CLIENTES', 'CORE_TARJETAS', 'CORE_CUENTAS', 'CORE_MOVIMIENTOS')
+
+
+class IndicesNoReconstruidosError(Exception):
+    """La carga terminó pero algunos índices diferidos no se pudieron volver a crear (ej. duplicados en un índice único)."""
+
+    def __init__(self, tabla, indices):
+        self.tabla = tabla
+        self.indices = indices
+        super().__init__(f"Índices sin reconstruir en {tabla}: " + '; '.join(f"{n} ({e})" for n, e in indices))
+
+
+class BulkLoadService:
+    """
+    Carga masiva de las tablas CORE_* (entornos de staging y pruebas de carga).
+
+    Inserta por lotes con Core (sin ORM ni eventos de mapper): en PostgreSQL con COPY FROM STDIN,
+    en otros motores con executemany. Opcionalmente elimina los índices secundarios de la tabla
+    antes de cargar y los reconstruye al final (un CREATE INDEX es mucho más barato que
+    mantener el índice fila a fila). Cada lote se confirma por separado.
+
+    Como no pasan por el ORM, las cargas no actualizan el rollup ni invalidan el catálogo MCC:
+    `despues_de_cargar` se encarga de ambos.
+    """
+
+    @staticmethod
+    def tabla(nombre: str):
+        # Importar modelos para que sus tablas estén en el metadata
+        from app.models import core_banking  # noqa: F401
+        nombre = nombre.upper()
+        if nombre not in TABLAS_CORE:
+            raise ValueError(f"Tabla no soportada para carga masiva: {nombre}")
+        return db.metadata.tables[nombre]
+
+    @staticmethod
+    def es_postgresql():
+        return db.engine.dialect.name == 'postgresql'
+
+    @staticmethod
+    def _convertidor(columna):
+        """Texto del CSV -> tipo Python de la columna ('' = NULL)."""
+        tipo = columna.type
+        if isinstance(tipo, DateTime):
+            return datetime.fromisoformat
+        if isinstance(tipo, Date):
+            return date.fromisoformat
+        if isinstance(tipo, Numeric):
+            return Decimal
+        if isinstance(tipo, Integer):
+            return int
+        return str
+
+    @staticmethod
+    def leer_csv(nombre_tabla: str, ruta: str):
+        """
+        Filas (dicts por nombre de columna) de un CSV con cabecera; las columnas de la cabecera
+        deben ser las de la tabla (ej. NUM_CUENTA, FECHA_PROCESO). Lanza ValueError si no coinciden.
+        """
+        tabla = BulkLoadService.tabla(nombre_tabla)
+        with open(ruta, newline='', encoding='utf-8') as archivo:
+            lector = csv.reader(archivo)
+            cabecera = [c.strip().upper() for c in next(lector)]
+            desconocidas = [c for c in cabecera if c not in tabla.c]
+            if desconocidas:
+                raise ValueError(f"Columnas desconocidas en {tabla.name}: {', '.join(desconocidas)}")
+            convertidores = [BulkLoadService._convertidor(tabla.c[c]) for c in cabecera]
+            for valores in lector:
+                yield {
+                    columna: convertir(valor) if valor != '' else None
+                    for columna, convertir, valor in zip(cabecera, convertidores, valores)
+                }
+
+    @staticmethod
+    def _campo_csv(valor):
+        # NULL = vacío sin comillas; cualquier otro valor va entre comillas ('' queda como "")
+        if valor is None:
+            return ''
+        return '"' + str(valor).replace('"', '""') + '"'
+
+    @staticmethod
+    def _copy(conexion, tabla, lote):
+        """COPY ... FROM STDIN (formato CSV) de un lote; solo un valor vacío sin comillas es NULL."""
+        columnas = list(lote[0].keys())
+        buffer = io.StringIO()
+        for fila in lote:
+            buffer.write(','.join(BulkLoadService._campo_csv(fila[c]) for c in columnas))
+            buffer.write('\n')
+        buffer.seek(0)
+        sql = 'COPY "{}" ({}) FROM STDIN WITH (FORMAT csv)'.format(
+            tabla.name, ', '.join(f'"{c}"' for c in columnas)
+        )
+        conexion.connection.driver_connection.cursor().copy_expert(sql, buffer)
+
+    @staticmethod
+    def _sincronizar_secuencia(conexion, tabla):
+        """Tras cargar PKs explícitas, la secuencia SERIAL de PostgreSQL debe continuar desde el máximo."""
+        columna = tabla.autoincrement_column
+        if columna is None:
+            return
+        conexion.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{tabla.name}\"', '{columna.name}'), "
+            f"COALESCE(MAX(\"{columna.name}\"), 1)) FROM \"{tabla.name}\""
+        ))
+
+    @staticmethod
+    def _reconstruir_indices(conexion, indices):
+        """Crea cada índice por separado; retorna [(nombre, error)] de los que no se pudieron crear."""
+        fallidos = []
+        for indice in indices:
+            try:
+                indice.create(conexion, checkfirst=True)
+                conexion.commit()
+            except Exception as e:
+                conexion.rollback()
+                fallidos.append((indice.name, str(e).splitlines()[0]))
+        return fallidos
+
+    @staticmethod
+    def cargar(nombre_tabla: str, filas, batch_size: int = 10000, metodo: str = 'auto',
+               diferir_indices: bool = True, progreso=None):
+        """
+        Inserta `filas` (iterable de dicts por nombre de columna) en lotes de `batch_size`.
+        `metodo`: 'copy' (solo PostgreSQL), 'executemany' o 'auto'.
+        `progreso(filas, segundos)` se invoca tras cada lote confirmado.
+        Retorna {"filas", "segundos", "segundos_indices", "metodo"}.
+
+        Los índices diferidos se reconstruyen aunque la carga falle (se re-lanza el error original
+        y se registran los que quedaron sin crear). Si la carga termina pero algún índice no se
+        puede crear (ej. filas duplicadas para un índice único) lanza IndicesNoReconstruidosError.
+        """
+        tabla = BulkLoadService.tabla(nombre_tabla)
+        postgresql = BulkLoadService.es_postgresql()
+        if metodo == 'auto':
+            metodo = 'copy' if postgresql else 'executemany'
+        if metodo == 'copy' and not postgresql:
+            raise ValueError("COPY solo está disponible con PostgreSQL")
+
+        indices = sorted(tabla.indexes, key=lambda i: i.name) if diferir_indices else []
+        filas = iter(filas)
+        total = 0
+        segundos_indices = 0.0
+        inicio = time.monotonic()
+
+        with db.engine.connect() as conexion:
+            for indice in indices:
+                indice.drop(conexion, checkfirst=True)
+            conexion.commit()
+            error_carga = None
+            try:
+                while True:
+                    lote = list(islice(filas, batch_size))
+                    if not lote:
+                        break
+                    if postgresql:
+                        # Durabilidad relajada solo para esta carga (se puede repetir si el servidor cae)
+                        conexion.execute(text("SET LOCAL synchronous_commit = off"))
+                    if metodo == 'copy':
+                        BulkLoadService._copy(conexion, tabla, lote)
+                    else:
+                        conexion.execute(tabla.insert(), lote)
+                    conexion.commit()
+                    total += len(lote)
+                    if progreso:
+                        progreso(total, time.monotonic() - inicio)
+            except BaseException as e:
+                error_carga = e
+                raise
+            finally:
+                conexion.rollback()
+                inicio_indices = time.monotonic()
+                fallidos = BulkLoadService._reconstruir_indices(conexion, indices)
+                segundos_indices = time.monotonic() - inicio_indices
+                if fallidos:
+                    error_indices = IndicesNoReconstruidosError(tabla.name, fallidos)
+                    if error_carga is not None:
+                        # El error de la carga es el que se propaga; los índices faltantes quedan en el log
+                        current_app.logger.error(str(error_indices))
+                    else:
+                        raise error_indices
+
+            if postgresql:
+                BulkLoadService._sincronizar_secuencia(conexion, tabla)
+                conexion.execute(text(f'ANALYZE "{tabla.name}"'))
+                conexion.commit()
+
+        return {
+            "filas": total,
+            "segundos": time.monotonic() - inicio,
+            "segundos_indices": segundos_indices,
+            "metodo": metodo,
+        }
+
+    @staticmethod
+    def despues_de_cargar(tablas, reconstruir_rollup: bool = True):
+        """
+        Deja la app consistente tras una carga: reconstruye CORE_RESUMEN_GASTO_MENSUAL si cambiaron
+        movimientos, cuentas o MCCs, y descarta el catálogo MCC y la caché de respuestas.
+        Retorna las filas del rollup generadas (o None si no se reconstruyó).
+        """
+        tablas = {t.upper() for t in tablas}
+        catalogo_mcc.invalidar()
+        core_cache.limpiar()
+        if reconstruir_rollup and tablas & {'CORE_MOVIMIENTOS', 'CORE_CUENTAS', 'CORE_MCC'}:
+            from app.services.resumen_gasto_service import ResumenGastoService
+            return ResumenGastoService.reconstruir()
+        return None
@@ -0,0 +1,191 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+
+class _Snapshot:
+    """Copia inmutable del catálogo; se reemplaza completa en cada recarga."""
+
+    def __init__(self, mcc_a_categoria, categorias, version, huella):
+        self.mcc_a_categoria = mcc_a_categoria    # cod_mcc -> id_categoria
+        self.categorias = categorias              # id_categoria -> nombre_categoria
+        self.id_por_nombre = {nombre: id_cat for id_cat, nombre in categorias.items()}
+        mccs = {}
+        for cod_mcc, id_cat in mcc_a_categoria.items():
+            mccs.setdefault(id_cat, []).append(cod_mcc)
+        self.mccs_por_categoria = {id_cat: tuple(sorted(codigos)) for id_cat, codigos in mccs.items()}
+        self.version = version
+        self.huella = huella
+        self.cargado_en = datetime.utcnow()
+
+
+class CatalogoMcc:
+    """
+    Diccionario en memoria (por worker) MCC -> categoría, cargado desde CORE_MCC y CORE_CATEGORIA.
+
+    Son tablas maestras pequeñas que casi no cambian: en lugar de unirlas en cada consulta
+    de movimientos, la categoría se resuelve en Python o se filtra por el conjunto de MCCs
+    precalculado. Se carga en el primer uso (o al arrancar) y se recarga cada `ttl` segundos
+    o bajo demanda con `refrescar()`; una sola recarga a la vez (los demás hilos la esperan).
+    Los cambios hechos vía ORM en este proceso marcan el catálogo como vencido al confirmarse
+    la transacción (se recarga en el siguiente uso); una recarga que leyó las filas anteriores
+    al COMMIT no cuenta como vigente.
+
+    `version` se incrementa solo cuando el contenido cambia (se compara una huella SHA-1).
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 300
+        self._snapshot = None
+        self._proxima_recarga = 0.0
+        self._ultima_recarga = None
+        self._generacion = 0  # se incrementa en cada invalidación
+        self._lock = threading.Lock()
+        self._lock_recarga = threading.Lock()
+        self.recargas = 0
+        self.errores_recarga = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('MCC_CATALOG_TTL_SECONDS', 300)
+        self.reset()
+        self._registrar_eventos()
+        app.extensions['catalogo_mcc'] = self
+
+    def _registrar_eventos(self):
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+        from app.models.core_banking import CategoriaCore, MccCore
+
+        for modelo in (CategoriaCore, MccCore):
+            for evento in ('after_insert', 'after_update', 'after_delete'):
+                if not event.contains(modelo, evento, self._al_modificar_maestro):
+                    event.listen(modelo, evento, self._al_modificar_maestro)
+        for evento, funcion in (('after_commit', self._al_confirmar), ('after_rollback', self._al_descartar)):
+            if not event.contains(Session, evento, funcion):
+                event.listen(Session, evento, funcion)
+
+    def _al_modificar_maestro(self, mapper, connection, target):
+        # En el flush las filas nuevas aún no son visibles para otros requests: se invalida en el COMMIT
+        from sqlalchemy.orm import object_session
+
+        sesion = object_session(target)
+        if sesion is None:
+            self.invalidar()
+        else:
+            sesion.info['catalogo_mcc_modificado'] = True
+
+    def _al_confirmar(self, sesion):
+        if sesion.info.pop('catalogo_mcc_modificado', False):
+            self.invalidar()
+
+    @staticmethod
+    def _al_descartar(sesion):
+        sesion.info.pop('catalogo_mcc_modificado', None)
+
+    def invalidar(self):
+        """Marca el catálogo como vencido: se recarga en el siguiente uso."""
+        with self._lock:
+            self._generacion += 1
+            self._proxima_recarga = 0.0
+
+    def reset(self):
+        with self._lock:
+            self._snapshot = None
+            self._proxima_recarga = 0.0
+
+    def refrescar(self):
+        """Recarga el catálogo desde la BD. Retorna la versión vigente."""
+        from app.extensions import db
+        from app.models.core_banking import CategoriaCore, MccCore
+
+        generacion = self._generacion
+        try:
+            categorias = dict(db.session.query(CategoriaCore.id_categoria, CategoriaCore.nombre_categoria).all())
+            mcc_a_categoria = dict(db.session.query(MccCore.cod_mcc, MccCore.id_categoria).all())
+        except Exception:
+            with self._lock:
+                self.errores_recarga += 1
+                # Se sigue usando la copia anterior (si existe) y se reintenta en unos segundos
+                self._proxima_recarga = time.monotonic() + min(self.ttl, 30) if self._snapshot else 0.0
+            raise
+
+        contenido = repr((sorted(categorias.items()), sorted(mcc_a_categoria.items())))
+        huella = hashlib.sha1(contenido.encode('utf-8')).hexdigest()
+
+        with self._lock:
+            anterior = self._snapshot
+            if anterior is None or anterior.huella != huella:
+                version = anterior.version + 1 if anterior else 1
+                self._snapshot = _Snapshot(mcc_a_categoria, categorias, version, huella)
+            else:
+                anterior.cargado_en = datetime.utcnow()
+            self._ultima_recarga = time.monotonic()
+            # Invalidado durante la lectura (COMMIT concurrente): la copia puede no incluir el cambio
+            self._proxima_recarga = self._ultima_recarga + self.ttl if generacion == self._generacion else 0.0
+            self.recargas += 1
+            return self._snapshot.version
+
+    def segundos_desde_recarga(self):
+        """Segundos desde la última recarga exitosa (None si nunca se cargó)."""
+        ultima = self._ultima_recarga
+        return time.monotonic() - ultima if ultima is not None else None
+
+    def _vencido(self):
+        return self._snapshot is None or time.monotonic() >= self._proxima_recarga
+
+    def _actual(self):
+        if self._vencido():
+            # Una sola recarga a la vez (ej. las sub-llamadas paralelas del dashboard)
+            with self._lock_recarga:
+                if self._vencido():
+                    try:
+                        self.refrescar()
+                    except Exception:
+                        if self._snapshot is None:
+                            raise
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._actual().version
+
+    def categoria_de(self, cod_mcc):
+        """Nombre de la categoría de un código de comercio (None si no tiene o no existe)."""
+        snapshot = self._actual()
+        id_cat = snapshot.mcc_a_categoria.get(cod_mcc) if cod_mcc else None
+        return snapshot.categorias.get(id_cat) if id_cat is not None else None
+
+    def id_categoria_de(self, cod_mcc):
+        if not cod_mcc:
+            return None
+        return self._actual().mcc_a_categoria.get(cod_mcc)
+
+    def id_categoria(self, nombre):
+        """ID de una categoría por su nombre exacto (None si no existe)."""
+        return self._actual().id_por_nombre.get(nombre)
+
+    def nombre_categoria(self, id_categoria):
+        return self._actual().categorias.get(id_categoria)
+
+    def mccs_de_categoria(self, id_categoria=None, nombre=None):
+        """Tupla de códigos MCC de una categoría, por id o por nombre."""
+        snapshot = self._actual()
+        if id_categoria is None:
+            id_categoria = snapshot.id_por_nombre.get(nombre)
+        return snapshot.mccs_por_categoria.get(id_categoria, ())
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "huella": snapshot.huella if snapshot else None,
+            "categorias": len(snapshot.categorias) if snapshot else 0,
+            "mccs": len(snapshot.mcc_a_categoria) if snapshot else 0,
+            "cargado_en_utc": snapshot.cargado_en.isoformat() if snapshot else None,
+            "ttl_segundos": self.ttl,
+            "recargas": self.recargas,
+            "errores_recarga": self.errores_recarga,
+        }
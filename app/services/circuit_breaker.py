@@ -0,0 +1,230 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """El breaker de la transacción está abierto: se falla rápido sin llamar al Mainframe."""
+
+
+class BulkheadFullError(Exception):
+    """Se alcanzó el máximo de llamadas concurrentes permitidas para la transacción."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por transacción (TRX001, TRX002, ...).
+
+    Mantiene una ventana deslizante con el resultado de las últimas llamadas.
+    Se abre cuando la tasa de error o la tasa de llamadas lentas supera el umbral;
+    tras `open_seconds` pasa a HALF_OPEN y deja pasar una llamada de prueba.
+    Además actúa como bulkhead: limita las llamadas simultáneas en vuelo.
+    """
+
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+    def __init__(self, nombre, window_size=20, min_calls=10, failure_rate=0.5,
+                 slow_call_seconds=2.5, slow_call_rate=0.5, open_seconds=30,
+                 max_concurrent=5, bulkhead_timeout=0.1):
+        self.nombre = nombre
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.max_concurrent = max_concurrent
+        self.bulkhead_timeout = bulkhead_timeout
+
+        self._estado = self.CLOSED
+        self._abierto_desde = None
+        self._prueba_en_curso = False
+        self._ventana = deque(maxlen=window_size)  # tuplas (fallo, lenta)
+        self._lock = threading.Lock()
+        self._semaforo = threading.BoundedSemaphore(max_concurrent)
+        self._en_vuelo = 0
+
+        # Contadores acumulados (para introspección)
+        self.total_llamadas = 0
+        self.total_fallos = 0
+        self.total_lentas = 0
+        self.total_rechazadas = 0
+        self.total_bulkhead_llenos = 0
+        self.total_aperturas = 0
+        self.total_canceladas = 0
+
+    @property
+    def estado(self):
+        with self._lock:
+            self._actualizar_estado()
+            return self._estado
+
+    def _actualizar_estado(self):
+        if self._estado == self.OPEN and time.monotonic() - self._abierto_desde >= self.open_seconds:
+            self._estado = self.HALF_OPEN
+            self._prueba_en_curso = False
+
+    def _permitir(self):
+        with self._lock:
+            self._actualizar_estado()
+            if self._estado == self.CLOSED:
+                return True
+            if self._estado == self.HALF_OPEN and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return True
+            self.total_rechazadas += 1
+            return False
+
+    def _abrir(self):
+        self._estado = self.OPEN
+        self._abierto_desde = time.monotonic()
+        self._prueba_en_curso = False
+        self.total_aperturas += 1
+
+    def _registrar(self, fallo, duracion):
+        lenta = duracion >= self.slow_call_seconds
+        with self._lock:
+            self.total_llamadas += 1
+            self.total_fallos += int(fallo)
+            self.total_lentas += int(lenta)
+
+            if self._estado == self.HALF_OPEN:
+                # La llamada de prueba decide si cerramos o volvemos a abrir
+                if fallo or lenta:
+                    self._abrir()
+                else:
+                    self._estado = self.CLOSED
+                    self._ventana.clear()
+                self._prueba_en_curso = False
+                return
+
+            self._ventana.append((fallo, lenta))
+            n = len(self._ventana)
+            if self._estado == self.CLOSED and n >= self.min_calls:
+                fallos = sum(1 for f, _ in self._ventana if f)
+                lentas = sum(1 for _, l in self._ventana if l)
+                if fallos / n >= self.failure_rate or lentas / n >= self.slow_call_rate:
+                    self._abrir()
+                    self._ventana.clear()
+
+    def _bulkhead_lleno(self):
+        with self._lock:
+            self.total_bulkhead_llenos += 1
+            if self._estado == self.HALF_OPEN:
+                self._prueba_en_curso = False
+        return BulkheadFullError(self.nombre)
+
+    def _cancelada(self):
+        """
+        La llamada se interrumpió sin resultado (asyncio.CancelledError, ej. wait_for del dashboard;
+        o el Timeout de gevent): no cuenta en la ventana, pero si era la llamada de prueba de
+        HALF_OPEN se libera para que la siguiente llamada vuelva a probar.
+        """
+        with self._lock:
+            self.total_canceladas += 1
+            if self._estado == self.HALF_OPEN:
+                self._prueba_en_curso = False
+
+    def _entrar(self):
+        with self._lock:
+            self._en_vuelo += 1
+        return time.monotonic()
+
+    def _salir(self):
+        with self._lock:
+            self._en_vuelo -= 1
+        self._semaforo.release()
+
+    def llamar(self, func, es_fallo=None):
+        """
+        Ejecuta `func()` protegido por el breaker y el bulkhead.
+        `es_fallo(resultado)` permite marcar como fallo respuestas que no lanzan excepción
+        (ej. HTTP 5xx). Lanza CircuitOpenError o BulkheadFullError si no se puede ejecutar.
+        """
+        if not self._permitir():
+            raise CircuitOpenError(self.nombre)
+
+        if not self._semaforo.acquire(timeout=self.bulkhead_timeout):
+            raise self._bulkhead_lleno()
+
+        inicio = self._entrar()
+        try:
+            resultado = func()
+        except Exception:
+            self._registrar(True, time.monotonic() - inicio)
+            raise
+        except BaseException:
+            self._cancelada()
+            raise
+        finally:
+            self._salir()
+
+        self._registrar(bool(es_fallo and es_fallo(resultado)), time.monotonic() - inicio)
+        return resultado
+
+    async def llamar_async(self, corutina, es_fallo=None):
+        """
+        Variante de `llamar` para el cliente asyncio: `corutina()` retorna un awaitable.
+        Comparte ventana, estado y cupos del bulkhead con las llamadas síncronas; la espera
+        por un cupo se hace con asyncio.sleep para no bloquear el event loop.
+        """
+        if not self._permitir():
+            raise CircuitOpenError(self.nombre)
+
+        limite = time.monotonic() + self.bulkhead_timeout
+        try:
+            while not self._semaforo.acquire(blocking=False):
+                if time.monotonic() >= limite:
+                    raise self._bulkhead_lleno()
+                await asyncio.sleep(0.005)
+        except asyncio.CancelledError:
+            self._cancelada()
+            raise
+
+        inicio = self._entrar()
+        try:
+            resultado = await corutina()
+        except Exception:
+            self._registrar(True, time.monotonic() - inicio)
+            raise
+        except BaseException:
+            # CancelledError (wait_for / cancelación de la tarea) no es Exception
+            self._cancelada()
+            raise
+        finally:
+            self._salir()
+
+        self._registrar(bool(es_fallo and es_fallo(resultado)), time.monotonic() - inicio)
+        return resultado
+
+    def snapshot(self):
+        """Estado y contadores del breaker, para el endpoint de monitoreo."""
+        with self._lock:
+            self._actualizar_estado()
+            n = len(self._ventana)
+            return {
+                "estado": self._estado,
+                "en_vuelo": self._en_vuelo,
+                "max_concurrentes": self.max_concurrent,
+                "ventana": {
+                    "llamadas": n,
+                    "fallos": sum(1 for f, _ in self._ventana if f),
+                    "lentas": sum(1 for _, l in self._ventana if l),
+                },
+                "totales": {
+                    "llamadas": self.total_llamadas,
+                    "fallos": self.total_fallos,
+                    "lentas": self.total_lentas,
+                    "rechazadas": self.total_rechazadas,
+                    "bulkhead_lleno": self.total_bulkhead_llenos,
+                    "aperturas": self.total_aperturas,
+                    "canceladas": self.total_canceladas,
+                },
+                "segundos_para_reintento": (
+                    max(0.0, round(self.open_seconds - (time.monotonic() - self._abierto_desde), 1))
+                    if self._estado == self.OPEN else None
+                ),
+            }
@@ -0,0 +1,149 @@
+import gzip
+import threading
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin el paquete solo se ofrece gzip
+    brotli = None
+
+ALGORITMOS = ('br', 'gzip')
+
+
+class CompresionRespuestas:
+    """
+    Compresión gzip / brotli de las respuestas (opt-in con COMPRESSION_ENABLED).
+
+    - Negociación por Accept-Encoding: entre los algoritmos de COMPRESSION_ALGORITHMS (en ese
+      orden de preferencia) se usa el de mayor calidad q aceptado por el cliente.
+    - Solo para los tipos de COMPRESSION_MIMETYPES (JSON, NDJSON, CSV) y respuestas 200 con cuerpo
+      de al menos COMPRESSION_MIN_SIZE bytes: en payloads chicos el costo de CPU no compensa.
+    - Respuestas en streaming (exportación): se comprimen por partes con un compresor incremental
+      que vacía su buffer en cada parte, así el cliente sigue recibiendo las filas a medida que se
+      generan. Como el tamaño no se conoce de antemano, no se aplica el umbral.
+    - Agrega `Vary: Accept-Encoding`; un ETag fuerte pasa a débil (el cuerpo cambia de bytes, no de contenido).
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.min_size = 1024
+        self.algoritmos = ('gzip',)
+        self.mimetypes = frozenset()
+        self.nivel_gzip = 6
+        self.nivel_brotli = 4
+        self._lock = threading.Lock()
+        self._reset_contadores()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESSION_ENABLED', False)
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+        self.algoritmos = tuple(
+            a for a in app.config.get('COMPRESSION_ALGORITHMS', ALGORITMOS)
+            if a in ALGORITMOS and (a != 'br' or brotli is not None)
+        )
+        self.mimetypes = frozenset(app.config.get('COMPRESSION_MIMETYPES', ()))
+        self.nivel_gzip = app.config.get('COMPRESSION_GZIP_LEVEL', 6)
+        self.nivel_brotli = app.config.get('COMPRESSION_BROTLI_QUALITY', 4)
+        self._reset_contadores()
+        if self.enabled and self.algoritmos:
+            app.after_request(self._comprimir_respuesta)
+        app.extensions['compresion_respuestas'] = self
+
+    def _reset_contadores(self):
+        self.respuestas = {algoritmo: 0 for algoritmo in ALGORITMOS}
+        self.bytes_originales = 0
+        self.bytes_comprimidos = 0
+
+    def negociar(self, accept_encodings):
+        """Algoritmo a usar según Accept-Encoding (None si el cliente no acepta ninguno)."""
+        mejor, mejor_q = None, 0
+        for algoritmo in self.algoritmos:
+            q = accept_encodings[algoritmo]
+            if q > mejor_q:
+                mejor, mejor_q = algoritmo, q
+        return mejor
+
+    # --- Compresores ---
+
+    def comprimir(self, algoritmo, datos: bytes) -> bytes:
+        if algoritmo == 'br':
+            return brotli.compress(datos, quality=self.nivel_brotli)
+        return gzip.compress(datos, compresslevel=self.nivel_gzip, mtime=0)
+
+    def _partes_comprimidas(self, algoritmo, partes):
+        """Comprime un iterable de partes (str o bytes) vaciando el buffer del compresor en cada una."""
+        if algoritmo == 'br':
+            compresor = brotli.Compressor(quality=self.nivel_brotli)
+            procesar, vaciar, terminar = compresor.process, compresor.flush, compresor.finish
+        else:
+            compresor = zlib.compressobj(self.nivel_gzip, zlib.DEFLATED, 31)  # wbits 31 = formato gzip
+            procesar, terminar = compresor.compress, compresor.flush
+            vaciar = lambda: compresor.flush(zlib.Z_SYNC_FLUSH)  # noqa: E731
+        try:
+            for parte in partes:
+                if isinstance(parte, str):
+                    parte = parte.encode('utf-8')
+                if not parte:
+                    continue
+                salida = procesar(parte) + vaciar()
+                if salida:
+                    yield salida
+            yield terminar()
+        finally:
+            # Cierra el generador original (ej. libera el cursor de la exportación si el cliente corta)
+            if hasattr(partes, 'close'):
+                partes.close()
+
+    # --- Hook ---
+
+    def _comprimir_respuesta(self, response):
+        if response.status_code == 304:
+            # Mismo Vary que la respuesta 200 que reemplaza (caches intermedios)
+            response.vary.add('Accept-Encoding')
+            return response
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.mimetypes
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+        response.vary.add('Accept-Encoding')
+        algoritmo = self.negociar(request.accept_encodings)
+        if algoritmo is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._partes_comprimidas(algoritmo, response.response)
+            response.headers.pop('Content-Length', None)
+            with self._lock:
+                self.respuestas[algoritmo] += 1
+        else:
+            datos = response.get_data()
+            if len(datos) < self.min_size:
+                return response
+            comprimido = self.comprimir(algoritmo, datos)
+            response.set_data(comprimido)
+            with self._lock:
+                self.respuestas[algoritmo] += 1
+                self.bytes_originales += len(datos)
+                self.bytes_comprimidos += len(comprimido)
+
+        response.headers['Content-Encoding'] = algoritmo
+        etag, debil = response.get_etag()
+        if etag and not debil:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                "habilitada": self.enabled,
+                "algoritmos": list(self.algoritmos),
+                "umbral_bytes": self.min_size,
+                "respuestas_comprimidas": dict(self.respuestas),
+                # Solo respuestas no streaming (en streaming el tamaño no se conoce)
+                "bytes_originales": self.bytes_originales,
+                "bytes_comprimidos": self.bytes_comprimidos,
+            }
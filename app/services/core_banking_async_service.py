@@ -0,0 +1,120 @@
+from app.extensions import mainframe_async, core_cache, dashboard_pool
+from app.services.core_banking_service import CoreBankingService
+from flask import current_app
+
+
+class CoreBankingAsyncService:
+    """
+    Variante asyncio de CoreBankingService para las vistas async (PRODUCTS_VIEWS_MODE=async).
+
+    En modo real las transacciones TRX001-TRX004 se envían al gateway CICS con
+    AsyncMainframeClient: mientras esperan la respuesta no retienen el hilo, y varias
+    transacciones del mismo request pueden estar en vuelo a la vez.
+    En modo simulación (BD local) delega en el servicio síncrono dentro de un hilo de
+    `dashboard_pool`, para no bloquear el event loop (ej. las sub-llamadas paralelas del
+    dashboard) sin superar el límite de conexiones de BD del worker.
+    Usa la misma caché de respuestas y el mismo formato de cursor que el servicio síncrono.
+    """
+
+    @staticmethod
+    def _modo_real():
+        return not current_app.config.get('USE_MOCK_MAINFRAME', True) and mainframe_async.configurado
+
+    @staticmethod
+    async def _en_hilo(func, *args):
+        app = current_app._get_current_object()
+        return await dashboard_pool.ejecutar_async(CoreBankingService.en_contexto, app, func, *args)
+
+    @staticmethod
+    async def _cacheado(clave, consulta):
+        """Retorna la respuesta cacheada o espera `consulta()` y la guarda (salvo STALE o None)."""
+        resultado = core_cache.get(clave)
+        if resultado is not None:
+            return resultado
+        resultado = await consulta()
+        if resultado and not resultado.get('STALE'):
+            core_cache.set(clave, resultado)
+        return resultado
+
+    @staticmethod
+    async def _consultar(trx: str, payload: dict):
+        try:
+            current_app.logger.info(f"Consultando {trx} en Mainframe (async): {mainframe_async.url_para(trx)}")
+            return await mainframe_async.consultar(trx, payload)
+        except Exception as e:
+            current_app.logger.error(f"Error {trx} Mainframe: {e}")
+            return None
+
+    # --- Marcadores de versión (ETags): solo en modo simulación, como en el servicio síncrono ---
+
+    @staticmethod
+    async def version_posicion_global(cod_cliente):
+        if CoreBankingAsyncService._modo_real():
+            return None
+        return await CoreBankingAsyncService._en_hilo(CoreBankingService.version_posicion_global, cod_cliente)
+
+    @staticmethod
+    async def version_detalle_cuenta(num_cuenta: str, cod_cliente):
+        if CoreBankingAsyncService._modo_real():
+            return None
+        return await CoreBankingAsyncService._en_hilo(CoreBankingService.version_detalle_cuenta, num_cuenta, cod_cliente)
+
+    @staticmethod
+    async def version_metricas(cod_cliente):
+        if CoreBankingAsyncService._modo_real():
+            return None
+        return await CoreBankingAsyncService._en_hilo(CoreBankingService.version_metricas, cod_cliente)
+
+    @staticmethod
+    async def obtener_posicion_global(cod_cliente: str, usar_cache: bool = True):
+        """TRX001 (Posición Global)."""
+        if not CoreBankingAsyncService._modo_real():
+            return await CoreBankingAsyncService._en_hilo(
+                CoreBankingService.obtener_posicion_global, cod_cliente, usar_cache
+            )
+        return await CoreBankingAsyncService._cacheado(
+            ('TRX001', str(cod_cliente)),
+            lambda: CoreBankingAsyncService._consultar('TRX001', {"cod_cliente": cod_cliente})
+        )
+
+    @staticmethod
+    async def obtener_detalle_cuenta(num_cuenta: str, cod_cliente: int, usar_cache: bool = True):
+        """TRX002 (Detalle de Cuenta y Categorización)."""
+        if not CoreBankingAsyncService._modo_real():
+            return await CoreBankingAsyncService._en_hilo(
+                CoreBankingService.obtener_detalle_cuenta, num_cuenta, cod_cliente, usar_cache
+            )
+        return await CoreBankingAsyncService._cacheado(
+            ('TRX002', str(cod_cliente), num_cuenta),
+            lambda: CoreBankingAsyncService._consultar('TRX002', {"num_cuenta": num_cuenta, "cod_cliente": cod_cliente})
+        )
+
+    @staticmethod
+    async def obtener_movimientos_paginados(num_cuenta: str, categoria: str = None, last_id: str = None, limit: int = 15,
+                                            id_categoria: int = None, cursor: str = None):
+        """TRX003 (Consulta Detallada Paginada). Lanza ValueError si el cursor no es válido."""
+        if not CoreBankingAsyncService._modo_real():
+            return await CoreBankingAsyncService._en_hilo(
+                lambda: CoreBankingService.obtener_movimientos_paginados(
+                    num_cuenta, categoria, last_id, limit=limit, id_categoria=id_categoria, cursor=cursor
+                )
+            )
+
+        filtro_categoria = f"id:{id_categoria}" if id_categoria is not None else f"nombre:{categoria}"
+        if cursor:
+            last_id = CoreBankingService.decodificar_cursor(cursor, num_cuenta, filtro_categoria)
+        resultado = await CoreBankingAsyncService._consultar('TRX003', {
+            "num_cuenta": num_cuenta,
+            "categoria": categoria,
+            "id_categoria": id_categoria,
+            "last_id": last_id,
+            "limit": limit
+        })
+        return CoreBankingService._agregar_next_cursor(resultado, num_cuenta, filtro_categoria)
+
+    @staticmethod
+    async def obtener_metricas_financieras(cod_cliente: int):
+        """TRX004 (Análisis de Comportamiento Financiero)."""
+        if not CoreBankingAsyncService._modo_real():
+            return await CoreBankingAsyncService._en_hilo(CoreBankingService.obtener_metricas_financieras, cod_cliente)
+        return await CoreBankingAsyncService._consultar('TRX004', {"cod_cliente": cod_cliente})
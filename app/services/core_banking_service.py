@@ -1,9 +1,12 @@
-from app.models.core_banking import Cliente, Cuenta, Tarjeta, Movimiento, CategoriaCore, MccCore
-from app.extensions import db
+from app.models.core_banking import Cliente, Cuenta, Tarjeta, Movimiento, ResumenGastoMensual
+from app.services.resumen_gasto_service import ResumenGastoService, SIN_CATEGORIA
+from app.extensions import db, mainframe, core_cache, catalogo_mcc
+from app.services.mainframe_client import MainframeNoDisponibleError
 from flask import current_app
-from sqlalchemy import func, case, extract
-from datetime import datetime
-import requests
+from sqlalchemy import func, case, and_, union_all, literal, literal_column, true, Date, DateTime
+from itsdangerous import URLSafeSerializer, BadSignature
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
 class CoreBankingService:
     """
@@ -13,27 +16,112 @@ class CoreBankingService:
     """
 
     @staticmethod
-    def obtener_detalle_cuenta(num_cuenta: str, cod_cliente: int):
+    def invalidar_cache(cod_cliente, num_cuenta: str = None):
+        """
+        Invalida las respuestas cacheadas de TRX001/TRX002 del cliente
+        (ej. tras registrar un movimiento o cambiar el saldo de una cuenta).
+        """
+        return core_cache.invalidar(cod_cliente, num_cuenta)
+
+    @staticmethod
+    def en_contexto(app, func, *args):
+        """Ejecuta `func(*args)` en un app context propio (hilos auxiliares: sesión de BD independiente)."""
+        with app.app_context():
+            return func(*args)
+
+    @staticmethod
+    def _cacheado(clave, consulta, usar_cache=True):
+        """
+        Retorna la respuesta cacheada o ejecuta `consulta()` y la guarda (salvo STALE o None).
+        Con usar_cache=False siempre consulta (la respuesta debe corresponder a un marcador de versión recién leído).
+        """
+        resultado = core_cache.get(clave) if usar_cache else None
+        if resultado is not None:
+            return resultado
+        resultado = consulta()
+        if resultado and not resultado.get('STALE'):
+            core_cache.set(clave, resultado)
+        return resultado
+
+    # --- Marcadores de versión (ETags) ---
+    # Consultas baratas (un índice) cuyo resultado cambia cuando cambiaría la respuesta de la TRX.
+    # Solo en modo simulación: con el Mainframe real retornan None (no hay marcador barato).
+
+    @staticmethod
+    def _modo_simulacion():
+        return current_app.config.get('USE_MOCK_MAINFRAME', True) or not mainframe.configurado
+
+    @staticmethod
+    def version_posicion_global(cod_cliente):
+        """TRX001: cuentas del cliente con su saldo y tarjeta vinculada."""
+        if not CoreBankingService._modo_simulacion():
+            return None
+        return tuple(db.session.query(
+            Cuenta.num_cuenta, Cuenta.moneda, Cuenta.saldo_disponible, Cuenta.num_tarjeta
+        ).filter(Cuenta.cod_cliente == cod_cliente).order_by(Cuenta.num_cuenta).all())
+
+    @staticmethod
+    def version_detalle_cuenta(num_cuenta: str, cod_cliente):
+        """TRX002: saldo y último ID_TRX de la cuenta, y versión del catálogo MCC. None si la cuenta no es del cliente."""
+        if not CoreBankingService._modo_simulacion():
+            return None
+        ultimo_id = db.session.query(func.max(Movimiento.id_trx)).filter(
+            Movimiento.num_cuenta == Cuenta.num_cuenta
+        ).correlate(Cuenta).scalar_subquery()
+        fila = db.session.query(Cuenta.saldo_disponible, ultimo_id).filter(
+            Cuenta.num_cuenta == num_cuenta,
+            Cuenta.cod_cliente == cod_cliente
+        ).first()
+        if fila is None:
+            return None
+        return tuple(fila) + (catalogo_mcc.version,)
+
+    @staticmethod
+    def version_metricas(cod_cliente):
+        """
+        TRX004: versión del rollup del cliente (última actualización y filas) o, si el rollup
+        no está construido, último ID_TRX de sus cuentas; más el mes en curso (el mes analizado
+        depende de la fecha).
+        """
+        if not CoreBankingService._modo_simulacion():
+            return None
+        now = datetime.now()
+        if CoreBankingService._usar_rollup():
+            R = ResumenGastoMensual
+            fila = db.session.query(
+                func.max(R.updated_at), func.count(), func.sum(R.qty_movimientos)
+            ).filter(R.cod_cliente == cod_cliente).one()
+        else:
+            fila = db.session.query(func.max(Movimiento.id_trx)).join(
+                Cuenta, Movimiento.num_cuenta == Cuenta.num_cuenta
+            ).filter(Cuenta.cod_cliente == cod_cliente).one()
+        return (now.year, now.month) + tuple(fila) + (catalogo_mcc.version,)
+
+    @staticmethod
+    def obtener_detalle_cuenta(num_cuenta: str, cod_cliente: int, usar_cache: bool = True):
         """
         Simula la transacción TRX002 (Detalle de Cuenta y Categorización).
         Retorna saldo, resumen por categorías y últimos movimientos.
         Valida que la cuenta pertenezca al cliente.
+        La respuesta se cachea por (cod_cliente, num_cuenta) durante CORE_CACHE_TTL.
         """
+        return CoreBankingService._cacheado(
+            ('TRX002', str(cod_cliente), num_cuenta),
+            lambda: CoreBankingService._consultar_detalle_cuenta(num_cuenta, cod_cliente),
+            usar_cache
+        )
+
+    @staticmethod
+    def _consultar_detalle_cuenta(num_cuenta: str, cod_cliente: int):
         use_mock = current_app.config.get('USE_MOCK_MAINFRAME', True)
-        cics_url = current_app.config.get('MAINFRAME_CICS_URL')
 
         # --- MODO REAL (HTTP a Mainframe) ---
-        if not use_mock and cics_url:
+        if not use_mock and mainframe.configurado:
             try:
-                # Asumimos endpoint /accounts/{id}/summary o similar
-                url_trx002 = cics_url.replace('trx001', 'trx002') 
-                current_app.logger.info(f"Consultando TRX002 en Mainframe: {url_trx002}")
+                current_app.logger.info(f"Consultando TRX002 en Mainframe: {mainframe.url_para('TRX002')}")
                 
-                response = requests.post(url_trx002, json={"num_cuenta": num_cuenta, "cod_cliente": cod_cliente}, timeout=5)
-                
-                if response.status_code == 200:
-                    return response.json()
-                return None
+                # Protegido por circuit breaker / bulkhead (puede devolver la última respuesta, STALE)
+                return mainframe.consultar('TRX002', {"num_cuenta": num_cuenta, "cod_cliente": cod_cliente})
             except Exception as e:
                 current_app.logger.error(f"Error TRX002 Mainframe: {e}")
                 return None
@@ -47,23 +135,12 @@ class CoreBankingService:
             current_app.logger.warning(f"Cuenta {num_cuenta} no encontrada o no pertenece al cliente {cod_cliente}")
             return None
             
-        saldo_actual = float(cuenta.saldo_disponible)
+        saldo_actual = cuenta.saldo_disponible
         
-        # 2. Obtener Movimientos + Categoría (JOIN)
-        # SELECT M.*, C.NOMBRE_CATEGORIA 
-        # FROM CORE_MOVIMIENTOS M
-        # LEFT JOIN CORE_MCC MCC ON M.COD_COMERCIO = MCC.COD_MCC
-        # LEFT JOIN CORE_CATEGORIA C ON MCC.ID_CATEGORIA = C.ID_CATEGORIA
-        # WHERE M.NUM_CUENTA = ...
+        # 2. Obtener Movimientos (la categoría se resuelve con el catálogo MCC en memoria)
+        # SELECT M.* FROM CORE_MOVIMIENTOS M WHERE M.NUM_CUENTA = ... ORDER BY FECHA_PROCESO DESC
         
-        movimientos_query = db.session.query(
-            Movimiento,
-            CategoriaCore.nombre_categoria
-        ).outerjoin(
-            MccCore, Movimiento.cod_comercio == MccCore.cod_mcc
-        ).outerjoin(
-            CategoriaCore, MccCore.id_categoria == CategoriaCore.id_categoria
-        ).filter(
+        movimientos_query = db.session.query(Movimiento).filter(
             Movimiento.num_cuenta == num_cuenta
         ).order_by(Movimiento.fecha_proceso.desc()).limit(20).all()
         
@@ -71,13 +148,13 @@ class CoreBankingService:
         acumuladores = {}
         lista_movs = []
         
-        for mov, cat_nombre in movimientos_query:
-            nombre_cat = cat_nombre if cat_nombre else "Otros"
-            monto = float(mov.monto)
+        for mov in movimientos_query:
+            nombre_cat = catalogo_mcc.categoria_de(mov.cod_comercio) or "Otros"
+            monto = mov.monto
             
             # Solo sumamos gastos (Débitos) para el gráfico
             if mov.tipo_mov == 'D':
-                acumuladores[nombre_cat] = acumuladores.get(nombre_cat, 0.0) + monto
+                acumuladores[nombre_cat] = acumuladores.get(nombre_cat, Decimal('0')) + monto
             
             # Llenar lista de movimientos
             lista_movs.append({
@@ -107,31 +184,22 @@ class CoreBankingService:
     def obtener_cliente(dni: str):
         """
         Consulta si el cliente existe en el Core Bancario y devuelve sus datos básicos.
-        Retorna un diccionario con {cod_cliente, nombres, ...} o None.
+        Retorna un diccionario con {cod_cliente, nombres, ...} o None si el DNI no es cliente.
+        Lanza MainframeNoDisponibleError si el Core no pudo responder (no equivale a "no es cliente").
         """
         use_mock = current_app.config.get('USE_MOCK_MAINFRAME', True)
-        cics_url = current_app.config.get('MAINFRAME_CICS_URL')
         
         # --- MODO REAL ---
-        if not use_mock and cics_url:
+        if not use_mock and mainframe.configurado:
             try:
-                # Asumimos que existe un endpoint /cliente o que el mismo endpoint
-                # puede devolver info del cliente. Por ahora usaremos una URL base + /cliente
-                # o asumiremos que la URL configurada es un gateway.
-                # Para simplificar, usaremos la misma URL base pero cambiando el path si fuera necesario,
-                # o simplemente enviando un flag.
-                # Aquí simularemos que es otro endpoint o el mismo.
-                url_cliente = cics_url.replace('trx001', 'cliente') # Ejemplo de convención
-                
-                current_app.logger.info(f"Consultando Cliente en Mainframe: {url_cliente}")
-                response = requests.post(url_cliente, json={"dni": dni}, timeout=5)
-                
-                if response.status_code == 200:
-                    return response.json()
-                return None
+                # La URL del endpoint /cliente la construye el cliente compartido (MAINFRAME_TRX_PATHS)
+                current_app.logger.info(f"Consultando Cliente en Mainframe: {mainframe.url_para('CLIENTE')}")
+                return mainframe.consultar('CLIENTE', {"dni": dni}, lanzar_no_disponible=True)
+            except MainframeNoDisponibleError:
+                raise
             except Exception as e:
                 current_app.logger.error(f"Error consultando cliente Mainframe: {e}")
-                return None
+                raise MainframeNoDisponibleError('CLIENTE') from e
 
         # --- MODO SIMULACIÓN ---
         cliente = Cliente.query.filter_by(dni_ruc=dni).first()
@@ -145,26 +213,28 @@ class CoreBankingService:
         return None
 
     @staticmethod
-    def obtener_posicion_global(cod_cliente: str):
+    def obtener_posicion_global(cod_cliente: str, usar_cache: bool = True):
         """
         Simula la transacción TRX001 (Posición Global).
         Recibe el COD_CLIENTE (obtenido en el login) para optimizar la consulta.
+        La respuesta se cachea por cod_cliente durante CORE_CACHE_TTL.
         """
+        return CoreBankingService._cacheado(
+            ('TRX001', str(cod_cliente)),
+            lambda: CoreBankingService._consultar_posicion_global(cod_cliente),
+            usar_cache
+        )
+
+    @staticmethod
+    def _consultar_posicion_global(cod_cliente: str):
         use_mock = current_app.config.get('USE_MOCK_MAINFRAME', True)
-        cics_url = current_app.config.get('MAINFRAME_CICS_URL')
 
         # --- MODO REAL (HTTP a Mainframe) ---
-        if not use_mock and cics_url:
+        if not use_mock and mainframe.configurado:
             try:
-                current_app.logger.info(f"Conectando a Mainframe en: {cics_url}")
+                current_app.logger.info(f"Conectando a Mainframe en: {mainframe.url_para('TRX001')}")
                 # Enviamos cod_cliente en lugar de DNI
-                response = requests.post(cics_url, json={"cod_cliente": cod_cliente}, timeout=5)
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    current_app.logger.error(f"Error Mainframe: {response.status_code} - {response.text}")
-                    return None 
+                return mainframe.consultar('TRX001', {"cod_cliente": cod_cliente})
             except Exception as e:
                 current_app.logger.error(f"Excepción conectando al Mainframe: {e}")
                 return None
@@ -188,7 +258,7 @@ class CoreBankingService:
             lista_cuentas.append({
                 "CTA-NUMERO": c.num_cuenta,
                 "CTA-MONEDA": c.moneda,
-                "CTA-SALDO": float(c.saldo_disponible)
+                "CTA-SALDO": c.saldo_disponible
             })
             
             # 3. Obtener Tarjetas (Vinculadas a la Cuenta)
@@ -206,36 +276,103 @@ class CoreBankingService:
         }
 
     @staticmethod
-    def obtener_movimientos_paginados(num_cuenta: str, categoria: str, last_id: str = None, limit: int = 15):
+    def _serializador_cursor():
+        return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='trx003-cursor')
+
+    @staticmethod
+    def codificar_cursor(num_cuenta: str, filtro_categoria: str, last_id: str):
+        """Cursor opaco y firmado con la clave de orden (ID_TRX) del último movimiento entregado."""
+        return CoreBankingService._serializador_cursor().dumps([num_cuenta, filtro_categoria, last_id])
+
+    @staticmethod
+    def decodificar_cursor(cursor: str, num_cuenta: str, filtro_categoria: str):
+        """
+        Retorna el ID_TRX del cursor. Lanza ValueError si la firma no es válida
+        o si el cursor pertenece a otra cuenta / otro filtro de categoría.
+        """
+        try:
+            cuenta_cursor, filtro_cursor, last_id = CoreBankingService._serializador_cursor().loads(cursor)
+        except (BadSignature, ValueError, TypeError):
+            raise ValueError("Cursor inválido")
+        if cuenta_cursor != num_cuenta or filtro_cursor != filtro_categoria:
+            raise ValueError("El cursor no corresponde a esta cuenta o categoría")
+        return last_id
+
+    @staticmethod
+    def obtener_movimientos_paginados(num_cuenta: str, categoria: str = None, last_id: str = None, limit: int = 15,
+                                      id_categoria: int = None, cursor: str = None):
         """
         Simula la transacción TRX003 (Consulta Detallada Paginada).
-        Retorna movimientos filtrados por categoría con paginación por cursor (last_id).
+        Retorna movimientos filtrados por categoría (nombre o id) con paginación keyset:
+        `cursor` es el valor opaco `next_cursor` de la página anterior (`last_id` se mantiene por compatibilidad).
+        Lanza ValueError si el cursor no es válido.
         """
         use_mock = current_app.config.get('USE_MOCK_MAINFRAME', True)
-        
-        # --- MODO SIMULACIÓN (Mock con BD Local) ---
-        current_app.logger.info(f"TRX003: Cuenta={num_cuenta}, Cat={categoria}, LastID={last_id}")
-        
-        # Construir Query Base
-        # JOIN Movimiento -> MccCore -> CategoriaCore
-        query = db.session.query(Movimiento).join(
-            MccCore, Movimiento.cod_comercio == MccCore.cod_mcc
-        ).join(
-            CategoriaCore, MccCore.id_categoria == CategoriaCore.id_categoria
-        ).filter(
-            Movimiento.num_cuenta == num_cuenta,
-            CategoriaCore.nombre_categoria == categoria
+        filtro_categoria = f"id:{id_categoria}" if id_categoria is not None else f"nombre:{categoria}"
+        if cursor:
+            last_id = CoreBankingService.decodificar_cursor(cursor, num_cuenta, filtro_categoria)
+
+        # --- MODO REAL (HTTP a Mainframe) ---
+        if not use_mock and mainframe.configurado:
+            try:
+                current_app.logger.info(f"Consultando TRX003 en Mainframe: {mainframe.url_para('TRX003')}")
+                resultado = mainframe.consultar('TRX003', {
+                    "num_cuenta": num_cuenta,
+                    "categoria": categoria,
+                    "id_categoria": id_categoria,
+                    "last_id": last_id,
+                    "limit": limit
+                })
+            except Exception as e:
+                current_app.logger.error(f"Error TRX003 Mainframe: {e}")
+                return None
+        else:
+            # --- MODO SIMULACIÓN (Mock con BD Local) ---
+            resultado = CoreBankingService._consultar_movimientos_paginados(num_cuenta, categoria, id_categoria, last_id, limit)
+
+        return CoreBankingService._agregar_next_cursor(resultado, num_cuenta, filtro_categoria)
+
+    @staticmethod
+    def _agregar_next_cursor(resultado, num_cuenta: str, filtro_categoria: str):
+        """Cursor de la siguiente página (clave de orden del último movimiento entregado)."""
+        if resultado is not None:
+            meta = resultado.setdefault("meta", {})
+            datos = resultado.get("data") or []
+            meta["next_cursor"] = CoreBankingService.codificar_cursor(
+                num_cuenta, filtro_categoria, datos[-1]["id_transaccion"]
+            ) if meta.get("has_more") and datos else None
+        return resultado
+
+    @staticmethod
+    def _consultar_movimientos_paginados(num_cuenta: str, categoria: str, id_categoria: int, last_id: str, limit: int):
+        current_app.logger.info(f"TRX003: Cuenta={num_cuenta}, Cat={categoria or id_categoria}, LastID={last_id}")
+
+        # 1. Resolver la categoría a sus códigos MCC (catálogo en memoria, sin consultar la BD)
+        codigos_mcc = catalogo_mcc.mccs_de_categoria(id_categoria, categoria)
+
+        # 2. Keyset: una búsqueda por MCC sobre el índice (NUM_CUENTA, COD_COMERCIO, ID_TRX),
+        # cada una limitada a limit + 1 filas, y se combinan con UNION ALL.
+        # Así el costo de cada página no depende de cuántas páginas se hayan leído antes.
+        # Solo se leen las columnas necesarias (sin hidratar objetos ORM).
+        columnas = (
+            Movimiento.id_trx, Movimiento.fecha_proceso, Movimiento.glosa_trx,
+            Movimiento.monto, Movimiento.tipo_mov, Movimiento.moneda
         )
-        
-        # Aplicar Paginación (Cursor)
-        # Asumimos orden descendente por ID_TRX (que incluye timestamp)
-        if last_id:
-            query = query.filter(Movimiento.id_trx < last_id)
-            
-        # Ordenar y Limitar
-        # Pedimos limit + 1 para saber si hay más páginas
-        movimientos = query.order_by(Movimiento.id_trx.desc()).limit(limit + 1).all()
-        
+        ramas = []
+        for cod_mcc in codigos_mcc:
+            rama = db.session.query(*columnas).filter(
+                Movimiento.num_cuenta == num_cuenta,
+                Movimiento.cod_comercio == cod_mcc
+            )
+            if last_id:
+                rama = rama.filter(Movimiento.id_trx < last_id)
+            ramas.append(rama.order_by(Movimiento.id_trx.desc()).limit(limit + 1).subquery().select())
+
+        movimientos = []
+        if ramas:
+            pagina = union_all(*ramas).subquery('pagina')
+            movimientos = db.session.query(pagina).order_by(pagina.c.id_trx.desc()).limit(limit + 1).all()
+
         has_more = len(movimientos) > limit
         if has_more:
             movimientos = movimientos[:limit] # Recortar al límite solicitado
@@ -247,7 +384,7 @@ class CoreBankingService:
                 "id_transaccion": mov.id_trx,
                 "fecha": mov.fecha_proceso.isoformat(),
                 "glosa": mov.glosa_trx,
-                "monto": float(mov.monto) * (-1 if mov.tipo_mov == 'D' else 1), # Signo negativo para gastos
+                "monto": -mov.monto if mov.tipo_mov == 'D' else mov.monto, # Signo negativo para gastos
                 "moneda": mov.moneda
             })
             
@@ -259,6 +396,69 @@ class CoreBankingService:
             "data": lista_movs
         }
 
+    @staticmethod
+    def exportar_movimientos(num_cuenta: str, desde: date = None, hasta: date = None,
+                             categoria: str = None, id_categoria: int = None):
+        """
+        Historial completo de la cuenta (exportación), del más reciente al más antiguo.
+        Filtros opcionales: rango de fechas [desde, hasta] (inclusive) y categoría (nombre o id).
+
+        Es un generador de lotes (listas de dicts): la consulta se lee con un cursor del lado
+        del servidor (stream_results / yield_per, EXPORT_YIELD_PER filas por lote), así que la
+        memoria no depende del tamaño del historial y el primer lote está disponible antes
+        de que termine la consulta. Debe consumirse dentro del app context (stream_with_context).
+        """
+        consulta = db.select(
+            Movimiento.id_trx, Movimiento.fecha_proceso, Movimiento.tipo_mov, Movimiento.monto,
+            Movimiento.moneda, Movimiento.glosa_trx, Movimiento.cod_comercio
+        ).where(Movimiento.num_cuenta == num_cuenta)
+
+        # Rango sobre FECHA_PROCESO: usa el índice (NUM_CUENTA, FECHA_PROCESO)
+        if desde:
+            consulta = consulta.where(Movimiento.fecha_proceso >= datetime.combine(desde, datetime.min.time()))
+        if hasta:
+            consulta = consulta.where(Movimiento.fecha_proceso < datetime.combine(hasta + timedelta(days=1), datetime.min.time()))
+        if categoria or id_categoria is not None:
+            consulta = consulta.where(Movimiento.cod_comercio.in_(catalogo_mcc.mccs_de_categoria(id_categoria, categoria)))
+
+        lote = current_app.config.get('EXPORT_YIELD_PER', 1000)
+        consulta = consulta.order_by(Movimiento.fecha_proceso.desc(), Movimiento.id_trx.desc()) \
+            .execution_options(stream_results=True, yield_per=lote)
+
+        for filas in db.session.execute(consulta).partitions():
+            yield [{
+                "id_transaccion": mov.id_trx,
+                "fecha": mov.fecha_proceso.isoformat(),
+                "tipo": mov.tipo_mov,
+                "monto": mov.monto * (-1 if mov.tipo_mov == 'D' else 1), # Signo negativo para gastos
+                "moneda": mov.moneda,
+                "glosa": mov.glosa_trx,
+                "categoria": catalogo_mcc.categoria_de(mov.cod_comercio) or "Otros"
+            } for mov in filas]
+
+    @staticmethod
+    def _rango_mes(year: int, month: int):
+        """
+        Rango semiabierto [inicio, fin) del mes. Comparar FECHA_PROCESO contra un rango
+        (en lugar de EXTRACT(month/year)) permite usar el índice (NUM_CUENTA, FECHA_PROCESO).
+        """
+        inicio = datetime(year, month, 1)
+        fin = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        return inicio, fin
+
+    @staticmethod
+    def _inicio_mes_sql(expr):
+        """Primer instante del mes de `expr`, en SQL (PostgreSQL en producción, SQLite en desarrollo)."""
+        if db.session.get_bind().dialect.name == 'sqlite':
+            return func.datetime(expr, 'start of month', type_=DateTime)
+        return func.date_trunc(literal_column("'month'"), expr, type_=DateTime)
+
+    @staticmethod
+    def _sumar_un_mes_sql(expr):
+        if db.session.get_bind().dialect.name == 'sqlite':
+            return func.datetime(expr, '+1 month', type_=DateTime)
+        return expr + literal_column("INTERVAL '1 month'")
+
     @staticmethod
     def obtener_metricas_financieras(cod_cliente: int):
         """
@@ -266,98 +466,185 @@ class CoreBankingService:
         Retorna la categoría TOP y la distribución de gastos por tamaño.
         """
         use_mock = current_app.config.get('USE_MOCK_MAINFRAME', True)
+
+        # --- MODO REAL (HTTP a Mainframe) ---
+        if not use_mock and mainframe.configurado:
+            try:
+                current_app.logger.info(f"Consultando TRX004 en Mainframe: {mainframe.url_para('TRX004')}")
+                return mainframe.consultar('TRX004', {"cod_cliente": cod_cliente})
+            except Exception as e:
+                current_app.logger.error(f"Error TRX004 Mainframe: {e}")
+                return None
+
         current_app.logger.info(f"TRX004: Análisis Financiero para Cliente={cod_cliente}")
 
-        # 1. Determinar el mes de análisis
-        # Intentamos usar el mes actual. Si no hay datos, buscamos el último mes con actividad.
+        # Mes de análisis: el mes actual si tiene movimientos; si no, el último mes con actividad.
         now = datetime.now()
-        target_month = now.month
-        target_year = now.year
+        if CoreBankingService._usar_rollup():
+            return CoreBankingService._metricas_desde_resumen(cod_cliente, date(now.year, now.month, 1))
+        return CoreBankingService._metricas_desde_movimientos(cod_cliente, now)
 
-        # Verificar si hay movimientos en el mes actual
-        has_data = db.session.query(Movimiento).join(
-            Cuenta, Movimiento.num_cuenta == Cuenta.num_cuenta
+    @staticmethod
+    def _usar_rollup():
+        """
+        TRX004 lee el rollup si está habilitado y construido por completo; mientras no se haya
+        corrido `flask analytics rebuild-rollup` (o la migración) se agrega CORE_MOVIMIENTOS.
+        """
+        return current_app.config.get('ANALYTICS_USE_ROLLUP', True) and ResumenGastoService.construido()
+
+    @staticmethod
+    def _formatear_metricas(top_categoria, qty_pequeno, qty_mediano, qty_grande):
+        return {
+            "COD-RETORNO": "00",
+            "METRICAS-GASTO": {
+                "TOP-CATEGORIA": top_categoria or "Ninguna",
+                "QTY-PEQUENO": int(qty_pequeno or 0),
+                "QTY-MEDIANO": int(qty_mediano or 0),
+                "QTY-GRANDE": int(qty_grande or 0)
+            }
+        }
+
+    @staticmethod
+    def _metricas_desde_resumen(cod_cliente: int, periodo_actual: date):
+        """
+        TRX004 sobre el rollup CORE_RESUMEN_GASTO_MENSUAL: el costo depende de las
+        categorías del mes, no del volumen de movimientos históricos del cliente.
+        """
+        R = ResumenGastoMensual
+        hay_datos_mes_actual = db.session.query(R.num_cuenta).filter(
+            R.cod_cliente == cod_cliente,
+            R.periodo == periodo_actual
+        ).exists()
+
+        mes_objetivo = db.session.query(
+            case(
+                (hay_datos_mes_actual, literal(periodo_actual, Date)),
+                else_=func.max(R.periodo)
+            ).label('periodo')
         ).filter(
-            Cuenta.cod_cliente == cod_cliente,
-            extract('month', Movimiento.fecha_proceso) == target_month,
-            extract('year', Movimiento.fecha_proceso) == target_year
-        ).first()
+            R.cod_cliente == cod_cliente
+        ).cte('mes_objetivo')
 
-        if not has_data:
-            # Fallback: Buscar la fecha máxima de movimientos para este cliente
-            last_mov_date = db.session.query(func.max(Movimiento.fecha_proceso)).join(
-                Cuenta, Movimiento.num_cuenta == Cuenta.num_cuenta
-            ).filter(
-                Cuenta.cod_cliente == cod_cliente
-            ).scalar()
-
-            if last_mov_date:
-                target_month = last_mov_date.month
-                target_year = last_mov_date.year
-                current_app.logger.info(f"TRX004: Sin datos en mes actual. Usando último mes disponible: {target_month}/{target_year}")
-            else:
-                current_app.logger.warning("TRX004: Cliente sin movimientos históricos.")
-                return {
-                    "COD-RETORNO": "00",
-                    "METRICAS-GASTO": {
-                        "TOP-CATEGORIA": "Ninguna",
-                        "QTY-PEQUENO": 0,
-                        "QTY-MEDIANO": 0,
-                        "QTY-GRANDE": 0
-                    }
-                }
-
-        # Base Query: Movimientos de Gasto (Debito) del Cliente en el mes OBJETIVO
-        base_query = db.session.query(Movimiento).join(
+        total_debitos = R.qty_pequeno + R.qty_mediano + R.qty_grande
+        top_categoria_sq = db.session.query(
+            R.id_categoria
+        ).join(
+            mes_objetivo, R.periodo == mes_objetivo.c.periodo
+        ).filter(
+            R.cod_cliente == cod_cliente,
+            R.id_categoria != SIN_CATEGORIA
+        ).group_by(
+            R.id_categoria
+        ).having(
+            func.sum(total_debitos) > 0
+        ).order_by(
+            func.sum(R.total_debito).desc()
+        ).limit(1).scalar_subquery()
+
+        resultado = db.session.query(
+            mes_objetivo.c.periodo,
+            top_categoria_sq.label('top_categoria'),
+            func.sum(R.qty_pequeno).label('qty_pequeno'),
+            func.sum(R.qty_mediano).label('qty_mediano'),
+            func.sum(R.qty_grande).label('qty_grande')
+        ).select_from(mes_objetivo).outerjoin(
+            R, and_(R.cod_cliente == cod_cliente, R.periodo == mes_objetivo.c.periodo)
+        ).group_by(
+            mes_objetivo.c.periodo
+        ).one()
+
+        if resultado.periodo is None:
+            current_app.logger.warning("TRX004: Cliente sin movimientos históricos.")
+        elif resultado.periodo != periodo_actual:
+            current_app.logger.info(f"TRX004: Sin datos en mes actual. Usando último mes disponible: {resultado.periodo:%m/%Y}")
+
+        top_categoria = catalogo_mcc.nombre_categoria(resultado.top_categoria)
+        return CoreBankingService._formatear_metricas(
+            top_categoria, resultado.qty_pequeno, resultado.qty_mediano, resultado.qty_grande
+        )
+
+    @staticmethod
+    def _metricas_desde_movimientos(cod_cliente: int, now: datetime):
+        """TRX004 agregando directamente CORE_MOVIMIENTOS (sin rollup)."""
+        inicio_actual, fin_actual = CoreBankingService._rango_mes(now.year, now.month)
+
+        # Una sola sentencia (CTEs): resuelve el mes objetivo y el pivot por tamaño por cada MCC.
+        # WITH mes_objetivo AS (
+        #        SELECT CASE WHEN EXISTS(<movimientos del mes actual>) THEN <inicio mes actual>
+        #               ELSE DATE_TRUNC('month', MAX(<última FECHA_PROCESO de cada cuenta>)) END),
+        #      gastos AS (SELECT ... FROM CORE_MOVIMIENTOS JOIN CORE_CUENTAS JOIN mes_objetivo
+        #                 ON FECHA_PROCESO en [inicio, inicio + 1 mes) WHERE TIPO_MOV = 'D')
+        # SELECT inicio, COD_COMERCIO, SUM(MONTO), SUM(CASE ...) x3 FROM mes_objetivo LEFT JOIN gastos GROUP BY ...
+        # Cada subconsulta es un rango o un MAX sobre el índice (NUM_CUENTA, FECHA_PROCESO).
+        hay_datos_mes_actual = db.session.query(Movimiento.id_trx).join(
             Cuenta, Movimiento.num_cuenta == Cuenta.num_cuenta
         ).filter(
             Cuenta.cod_cliente == cod_cliente,
-            Movimiento.tipo_mov == 'D',
-            extract('month', Movimiento.fecha_proceso) == target_month,
-            extract('year', Movimiento.fecha_proceso) == target_year
-        )
+            Movimiento.fecha_proceso >= inicio_actual,
+            Movimiento.fecha_proceso < fin_actual
+        ).exists()
 
-        # QUERY 1: Top Categoría
-        top_cat_result = db.session.query(
-            CategoriaCore.nombre_categoria,
-            func.sum(Movimiento.monto).label('total_gasto')
-        ).join(
-            MccCore, Movimiento.cod_comercio == MccCore.cod_mcc
-        ).join(
-            CategoriaCore, MccCore.id_categoria == CategoriaCore.id_categoria
+        ultima_fecha_cuenta = db.session.query(
+            func.max(Movimiento.fecha_proceso)
+        ).filter(
+            Movimiento.num_cuenta == Cuenta.num_cuenta
+        ).correlate(Cuenta).scalar_subquery()
+
+        mes_objetivo = db.session.query(
+            case(
+                (hay_datos_mes_actual, literal(inicio_actual, DateTime)),
+                else_=CoreBankingService._inicio_mes_sql(func.max(ultima_fecha_cuenta))
+            ).label('inicio')
+        ).select_from(Cuenta).filter(
+            Cuenta.cod_cliente == cod_cliente
+        ).cte('mes_objetivo')
+
+        gastos = db.session.query(
+            Movimiento.monto.label('monto'),
+            Movimiento.cod_comercio.label('cod_comercio')
         ).join(
             Cuenta, Movimiento.num_cuenta == Cuenta.num_cuenta
+        ).join(
+            mes_objetivo, and_(
+                Movimiento.fecha_proceso >= mes_objetivo.c.inicio,
+                Movimiento.fecha_proceso < CoreBankingService._sumar_un_mes_sql(mes_objetivo.c.inicio)
+            )
         ).filter(
             Cuenta.cod_cliente == cod_cliente,
-            Movimiento.tipo_mov == 'D',
-            extract('month', Movimiento.fecha_proceso) == target_month,
-            extract('year', Movimiento.fecha_proceso) == target_year
-        ).group_by(
-            CategoriaCore.nombre_categoria
-        ).order_by(
-            func.sum(Movimiento.monto).desc()
-        ).first()
+            Movimiento.tipo_mov == 'D'
+        ).cte('gastos')
 
-        top_categoria = top_cat_result[0] if top_cat_result else "Ninguna"
+        # Pequeño (< 50), Mediano (50-200), Grande (> 200), agrupado por MCC:
+        # la categoría TOP se resuelve en Python con el catálogo MCC en memoria.
+        filas = db.session.query(
+            mes_objetivo.c.inicio,
+            gastos.c.cod_comercio,
+            func.sum(gastos.c.monto).label('total'),
+            func.sum(case((gastos.c.monto < 50, 1), else_=0)).label('qty_pequeno'),
+            func.sum(case((gastos.c.monto.between(50, 200), 1), else_=0)).label('qty_mediano'),
+            func.sum(case((gastos.c.monto > 200, 1), else_=0)).label('qty_grande')
+        ).select_from(mes_objetivo).outerjoin(
+            gastos, true()
+        ).group_by(
+            mes_objetivo.c.inicio, gastos.c.cod_comercio
+        ).all()
 
-        # QUERY 2: Clasificación por Tamaño (Pivot con CASE)
-        # Pequeño (< 50), Mediano (50-200), Grande (> 200)
-        metrics_result = base_query.with_entities(
-            func.sum(case((Movimiento.monto < 50, 1), else_=0)).label('qty_pequeno'),
-            func.sum(case((Movimiento.monto.between(50, 200), 1), else_=0)).label('qty_mediano'),
-            func.sum(case((Movimiento.monto > 200, 1), else_=0)).label('qty_grande')
-        ).first()
+        inicio = filas[0].inicio if filas else None
+        if inicio is None:
+            current_app.logger.warning("TRX004: Cliente sin movimientos históricos.")
+        elif not (inicio_actual <= inicio < fin_actual):
+            current_app.logger.info(f"TRX004: Sin datos en mes actual. Usando último mes disponible: {inicio:%m/%Y}")
 
-        qty_pequeno = int(metrics_result.qty_pequeno or 0)
-        qty_mediano = int(metrics_result.qty_mediano or 0)
-        qty_grande = int(metrics_result.qty_grande or 0)
+        total_por_categoria = {}
+        for fila in filas:
+            nombre_cat = catalogo_mcc.categoria_de(fila.cod_comercio)
+            if nombre_cat is not None:
+                total_por_categoria[nombre_cat] = total_por_categoria.get(nombre_cat, 0) + fila.total
+        top_categoria = max(total_por_categoria, key=total_por_categoria.get) if total_por_categoria else None
 
-        return {
-            "COD-RETORNO": "00",
-            "METRICAS-GASTO": {
-                "TOP-CATEGORIA": top_categoria,
-                "QTY-PEQUENO": qty_pequeno,
-                "QTY-MEDIANO": qty_mediano,
-                "QTY-GRANDE": qty_grande
-            }
-        }
+        return CoreBankingService._formatear_metricas(
+            top_categoria,
+            sum(fila.qty_pequeno or 0 for fila in filas),
+            sum(fila.qty_mediano or 0 for fila in filas),
+            sum(fila.qty_grande or 0 for fila in filas)
+        )
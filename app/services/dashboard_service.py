@@ -0,0 +1,116 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import current_app
+from app.extensions import dashboard_pool
+from app.services.core_banking_service import CoreBankingService
+from app.services.core_banking_async_service import CoreBankingAsyncService
+
+
+class DashboardService:
+    """
+    Orquesta las transacciones del dashboard (apertura de la App) en un solo request:
+    TRX001 y TRX004 en paralelo y, en cuanto llega TRX001, un TRX002 por cuenta.
+
+    Cada sub-llamada tiene su propio plazo (DASHBOARD_SUBCALL_TIMEOUT, contado desde que se
+    lanza); si vence o falla, el resto de resultados se entrega igual y el tramo se reporta
+    en `errores`. Retorna {"TRX001": data, "TRX002": {num_cuenta: data}, "TRX004": data, "errores": [...]}.
+
+    - `obtener`: vistas síncronas, las sub-llamadas corren en el pool compartido del worker
+      (`dashboard_pool`, cada hilo con su propio app context y sesión de BD).
+    - `obtener_async`: vistas async, asyncio.gather sobre CoreBankingAsyncService.
+    """
+
+    @staticmethod
+    def _error(errores, seccion, motivo, num_cuenta=None):
+        error = {"seccion": seccion, "motivo": motivo}
+        if num_cuenta is not None:
+            error["nro_cuenta"] = num_cuenta
+        errores.append(error)
+
+    @staticmethod
+    def _cuentas(posicion):
+        return [c['CTA-NUMERO'] for c in (posicion or {}).get('TABLA-CUENTAS', [])]
+
+    @staticmethod
+    def obtener(cod_cliente):
+        app = current_app._get_current_object()
+        plazo = app.config.get('DASHBOARD_SUBCALL_TIMEOUT', 3.0)
+        lanzados = []
+
+        def lanzar(func, *args):
+            # Copia del contexto por sub-llamada: sus tiempos suman al Server-Timing del request
+            contexto = contextvars.copy_context()
+            futuro = dashboard_pool.submit(contexto.run, CoreBankingService.en_contexto, app, func, *args)
+            lanzados.append(futuro)
+            return futuro, time.monotonic() + plazo
+
+        def esperar(lanzado, seccion, num_cuenta=None):
+            futuro, limite = lanzado
+            try:
+                resultado = futuro.result(timeout=max(0.0, limite - time.monotonic()))
+            except FutureTimeoutError:
+                DashboardService._error(errores, seccion, "timeout", num_cuenta)
+                return None
+            except Exception as e:
+                app.logger.error(f"Dashboard: error en {seccion} ({cod_cliente}): {e}")
+                DashboardService._error(errores, seccion, "error", num_cuenta)
+                return None
+            if not resultado:
+                DashboardService._error(errores, seccion, "no_disponible", num_cuenta)
+            return resultado
+
+        errores = []
+        try:
+            trx001 = lanzar(CoreBankingService.obtener_posicion_global, cod_cliente)
+            trx004 = lanzar(CoreBankingService.obtener_metricas_financieras, cod_cliente)
+
+            posicion = esperar(trx001, 'TRX001')
+            trx002 = {
+                num_cuenta: lanzar(CoreBankingService.obtener_detalle_cuenta, num_cuenta, cod_cliente)
+                for num_cuenta in DashboardService._cuentas(posicion)
+            }
+            detalles = {num_cuenta: esperar(lanzado, 'TRX002', num_cuenta) for num_cuenta, lanzado in trx002.items()}
+            metricas = esperar(trx004, 'TRX004')
+        finally:
+            # Las sub-llamadas vencidas que siguen en cola no llegan a ejecutarse; las que ya
+            # empezaron terminan en segundo plano (acotadas por los timeouts HTTP)
+            for futuro in lanzados:
+                futuro.cancel()
+
+        return {"TRX001": posicion, "TRX002": detalles, "TRX004": metricas, "errores": errores}
+
+    @staticmethod
+    async def obtener_async(cod_cliente):
+        plazo = current_app.config.get('DASHBOARD_SUBCALL_TIMEOUT', 3.0)
+        errores = []
+
+        async def esperar(corutina, seccion, num_cuenta=None):
+            try:
+                resultado = await asyncio.wait_for(corutina, plazo)
+            except asyncio.TimeoutError:
+                DashboardService._error(errores, seccion, "timeout", num_cuenta)
+                return None
+            except Exception as e:
+                current_app.logger.error(f"Dashboard: error en {seccion} ({cod_cliente}): {e}")
+                DashboardService._error(errores, seccion, "error", num_cuenta)
+                return None
+            if not resultado:
+                DashboardService._error(errores, seccion, "no_disponible", num_cuenta)
+            return resultado
+
+        async def posicion_y_detalles():
+            posicion = await esperar(CoreBankingAsyncService.obtener_posicion_global(cod_cliente), 'TRX001')
+            cuentas = DashboardService._cuentas(posicion)
+            detalles = await asyncio.gather(*(
+                esperar(CoreBankingAsyncService.obtener_detalle_cuenta(num_cuenta, cod_cliente), 'TRX002', num_cuenta)
+                for num_cuenta in cuentas
+            ))
+            return posicion, dict(zip(cuentas, detalles))
+
+        (posicion, detalles), metricas = await asyncio.gather(
+            posicion_y_detalles(),
+            esperar(CoreBankingAsyncService.obtener_metricas_financieras(cod_cliente), 'TRX004'),
+        )
+        return {"TRX001": posicion, "TRX002": detalles, "TRX004": metricas, "errores": errores}
@@ -0,0 +1,220 @@
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+# Maestro de categorías y MCCs sintéticos: (cod_mcc, descripción, id_categoria, rango de montos)
+CATEGORIAS = (
+    (1, 'Alimentación'),
+    (2, 'Transporte y Viajes'),
+    (3, 'Tecnología'),
+    (4, 'Entretenimiento'),
+    (5, 'Ahorro e Inversión'),
+    (6, 'Salud'),
+    (7, 'Servicios'),
+)
+MCCS = (
+    ('5411', 'Supermercados', 1, (15, 250)),
+    ('5812', 'Restaurantes', 1, (20, 150)),
+    ('5814', 'Comida rápida', 1, (8, 40)),
+    ('4111', 'Transporte urbano', 2, (2, 10)),
+    ('4121', 'Taxis y movilidad', 2, (8, 45)),
+    ('4511', 'Aerolíneas', 2, (250, 1800)),
+    ('5732', 'Electrónica', 3, (80, 3000)),
+    ('5817', 'Apps y software', 3, (5, 60)),
+    ('7832', 'Cines', 4, (15, 60)),
+    ('5813', 'Bares', 4, (20, 200)),
+    ('6211', 'Inversiones', 5, (100, 5000)),
+    ('5912', 'Farmacias', 6, (10, 150)),
+    ('4900', 'Luz, agua y gas', 7, (40, 300)),
+    ('4814', 'Telefonía', 7, (30, 150)),
+)
+NOMBRES = ('Ana', 'Luis', 'María', 'José', 'Carmen', 'Jorge', 'Rosa', 'Carlos', 'Lucía', 'Miguel', 'Sofía', 'Diego')
+APELLIDOS = ('Quispe', 'Flores', 'Rodríguez', 'García', 'Huamán', 'Chávez', 'Torres', 'Ramírez', 'Mendoza', 'Vargas')
+
+
+class GeneradorDatosCore:
+    """
+    Generador reproducible de datos sintéticos para las tablas CORE_* (misma semilla = mismos datos).
+
+    Cada cliente usa su propio generador aleatorio derivado de (semilla, cod_cliente), así que
+    las filas de cada tabla se pueden producir por separado y en streaming (sin tener todo en
+    memoria) y siguen siendo consistentes entre sí: las cuentas de CORE_CUENTAS son las mismas
+    que referencian CORE_MOVIMIENTOS.
+
+    El historial es sesgado como en producción: una fracción `proporcion_intensivos` de clientes
+    (usuarios intensivos) tiene `factor_intensivos` veces el promedio de movimientos y el resto
+    tiene menos, de modo que el promedio global sigue siendo `movimientos_por_cuenta`.
+
+    `filas(tabla)` retorna un iterador de dicts por nombre de columna, listo para BulkLoadService.cargar.
+    """
+
+    def __init__(self, clientes=1000, cuentas_por_cliente=2, movimientos_por_cuenta=200,
+                 semilla=42, primer_cliente=1, meses=12, hasta=None,
+                 proporcion_intensivos=0.1, factor_intensivos=5):
+        if proporcion_intensivos * factor_intensivos >= 1:
+            raise ValueError("proporcion_intensivos * factor_intensivos debe ser menor que 1")
+        self.clientes = clientes
+        self.cuentas_por_cliente = cuentas_por_cliente
+        self.movimientos_por_cuenta = movimientos_por_cuenta
+        self.proporcion_intensivos = proporcion_intensivos
+        self.factor_intensivos = factor_intensivos
+        # Factor de los usuarios livianos para conservar el promedio global
+        self.factor_livianos = (1 - proporcion_intensivos * factor_intensivos) / (1 - proporcion_intensivos)
+        self.semilla = semilla
+        self.primer_cliente = primer_cliente
+        self.meses = meses
+        self.hasta = hasta or datetime.now().replace(microsecond=0)
+
+    def filas(self, tabla: str):
+        generadores = {
+            'CORE_CATEGORIA': self._categorias,
+            'CORE_MCC': self._mccs,
+            'CORE_CLIENTES': self._clientes,
+            'CORE_TARJETAS': self._tarjetas,
+            'CORE_CUENTAS': self._cuentas,
+            'CORE_MOVIMIENTOS': self._movimientos,
+        }
+        return generadores[tabla.upper()]()
+
+    def total_estimado(self, tabla: str):
+        """Filas aproximadas de la tabla (para reportar avance)."""
+        tabla = tabla.upper()
+        cuentas = self.clientes * (self.cuentas_por_cliente + 1) / 2
+        return {
+            'CORE_CATEGORIA': len(CATEGORIAS),
+            'CORE_MCC': len(MCCS),
+            'CORE_CLIENTES': self.clientes,
+            'CORE_TARJETAS': int(cuentas * 0.7),
+            'CORE_CUENTAS': int(cuentas),
+            'CORE_MOVIMIENTOS': int(cuentas * self.movimientos_por_cuenta),
+        }[tabla]
+
+    # --- Estructura de cada cliente (determinística por semilla y cod_cliente) ---
+
+    def _rng(self, cod_cliente, parte):
+        return random.Random(f"{self.semilla}:{cod_cliente}:{parte}")
+
+    def _codigos_cliente(self):
+        return range(self.primer_cliente, self.primer_cliente + self.clientes)
+
+    def es_intensivo(self, cod_cliente):
+        """True si el cliente es un usuario intensivo (historial largo)."""
+        return self._rng(cod_cliente, 'perfil').random() < self.proporcion_intensivos
+
+    def clientes_por_perfil(self, cantidad):
+        """Hasta `cantidad` COD_CLIENTE de cada perfil: {"intensivo": [...], "liviano": [...]}."""
+        perfiles = {"intensivo": [], "liviano": []}
+        for cod_cliente in self._codigos_cliente():
+            perfil = perfiles["intensivo" if self.es_intensivo(cod_cliente) else "liviano"]
+            if len(perfil) < cantidad:
+                perfil.append(cod_cliente)
+            if all(len(p) >= cantidad for p in perfiles.values()):
+                break
+        return perfiles
+
+    def _cuentas_de(self, cod_cliente):
+        """[(num_cuenta, moneda, num_tarjeta o None, cantidad de movimientos)]"""
+        factor = self.factor_intensivos if self.es_intensivo(cod_cliente) else self.factor_livianos
+        rng = self._rng(cod_cliente, 'cuentas')
+        cuentas = []
+        for j in range(rng.randint(1, self.cuentas_por_cliente)):
+            num_cuenta = f"191-{cod_cliente:09d}-{j}"
+            moneda = 'PEN' if j == 0 or rng.random() < 0.8 else 'USD'
+            num_tarjeta = f"4557{cod_cliente:011d}{j}" if j == 0 or rng.random() < 0.4 else None
+            cantidad = int(self.movimientos_por_cuenta * factor * rng.uniform(0.5, 1.5))
+            cuentas.append((num_cuenta, moneda, num_tarjeta, cantidad))
+        return cuentas
+
+    # --- Filas por tabla ---
+
+    def _categorias(self):
+        for id_categoria, nombre in CATEGORIAS:
+            yield {"ID_CATEGORIA": id_categoria, "NOMBRE_CATEGORIA": nombre}
+
+    def _mccs(self):
+        for cod_mcc, descripcion, id_categoria, _ in MCCS:
+            yield {"COD_MCC": cod_mcc, "DESCRIPCION": descripcion, "ID_CATEGORIA": id_categoria}
+
+    def _clientes(self):
+        for cod_cliente in self._codigos_cliente():
+            rng = self._rng(cod_cliente, 'cliente')
+            nombre, apellido = rng.choice(NOMBRES), rng.choice(APELLIDOS)
+            yield {
+                "COD_CLIENTE": cod_cliente,
+                "DNI_RUC": f"{40000000 + cod_cliente:08d}",
+                "NOMBRES": nombre,
+                "APELLIDOS": f"{apellido} {rng.choice(APELLIDOS)}",
+                "FECHA_NAC": date(rng.randint(1950, 2005), rng.randint(1, 12), rng.randint(1, 28)),
+                "EMAIL": f"{nombre.lower()}.{cod_cliente}@example.com",
+                "TELEFONO": f"9{rng.randint(0, 99999999):08d}",
+                "INGRESOS_MES": Decimal(rng.randint(1025, 20000)),
+                "SCORE_CREDITICIO": rng.randint(300, 850),
+                "FECHA_ALTA": (self.hasta - timedelta(days=rng.randint(self.meses * 31, 3650))).date(),
+            }
+
+    def _tarjetas(self):
+        for cod_cliente in self._codigos_cliente():
+            for _, _, num_tarjeta, _ in self._cuentas_de(cod_cliente):
+                if num_tarjeta:
+                    yield {
+                        "NUM_TARJETA": num_tarjeta,
+                        "TIPO_TARJETA": 'DEBITO',
+                        "MARCA": 'VISA',
+                        "FECHA_VENC": date(self.hasta.year + 4, self.hasta.month, 1),
+                        "ESTADO": 'A',
+                    }
+
+    def _cuentas(self):
+        for cod_cliente in self._codigos_cliente():
+            rng = self._rng(cod_cliente, 'saldos')
+            for num_cuenta, moneda, num_tarjeta, _ in self._cuentas_de(cod_cliente):
+                saldo = Decimal(rng.randint(0, 5000000)) / 100
+                yield {
+                    "NUM_CUENTA": num_cuenta,
+                    "COD_CLIENTE": cod_cliente,
+                    "TIPO_CUENTA": rng.choice(('AHO', 'AHO', 'CTE', 'CTS')),
+                    "MONEDA": moneda,
+                    "SALDO_CONTABLE": saldo,
+                    "SALDO_DISPONIBLE": saldo,
+                    "ESTADO": 'A',
+                    "NUM_TARJETA": num_tarjeta,
+                }
+
+    def _movimientos(self):
+        inicio = self.hasta - timedelta(days=self.meses * 30)
+        segundos = int((self.hasta - inicio).total_seconds())
+        for cod_cliente in self._codigos_cliente():
+            rng = self._rng(cod_cliente, 'movimientos')
+            for j, (num_cuenta, moneda, _, cantidad) in enumerate(self._cuentas_de(cod_cliente)):
+                # Instantes distintos y ordenados: ID_TRX = timestamp + secuencia es único y crece con la fecha
+                instantes = sorted(rng.sample(range(segundos), min(cantidad, segundos)))
+                for k, segundo in enumerate(instantes):
+                    fecha = inicio + timedelta(seconds=segundo)
+                    yield self._movimiento(rng, cod_cliente, j, k, num_cuenta, moneda, fecha)
+
+    def _movimiento(self, rng, cod_cliente, j, k, num_cuenta, moneda, fecha):
+        sorteo = rng.random()
+        if sorteo < 0.08:
+            # Abonos (sueldo, transferencias recibidas): sin comercio
+            tipo, cod_mcc, glosa = 'C', None, 'ABONO TRANSFERENCIA'
+            monto = rng.uniform(500, 5000)
+        elif sorteo < 0.13:
+            # Transferencias enviadas / retiros: débito sin MCC (Sin categoría)
+            tipo, cod_mcc, glosa = 'D', None, 'TRANSFERENCIA A TERCEROS'
+            monto = rng.uniform(20, 1500)
+        else:
+            cod_mcc, descripcion, _, (minimo, maximo) = rng.choice(MCCS)
+            tipo, glosa = 'D', f"COMPRA {descripcion.upper()}"
+            # Sesgo hacia montos bajos dentro del rango del rubro
+            monto = minimo + (maximo - minimo) * rng.random() ** 2
+        return {
+            "ID_TRX": f"{fecha:%Y%m%d%H%M%S}{cod_cliente % 10 ** 8:08d}{j % 10}{k % 1000:03d}",
+            "NUM_CUENTA": num_cuenta,
+            "FECHA_PROCESO": fecha,
+            "TIPO_MOV": tipo,
+            "MONTO": Decimal(f"{monto:.2f}"),
+            "MONEDA": moneda,
+            "GLOSA_TRX": glosa,
+            "COD_CANAL": 'POS' if cod_mcc else 'APP',
+            "COD_COMERCIO": cod_mcc,
+        }
@@ -0,0 +1,188 @@
+import contextvars
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MODOS = ('off', 'log', 'raise')
+
+# Normalización de la "forma" de una sentencia: literales y listas de parámetros no cuentan
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_MARCADORES = re.compile(r"\?|%\(\w+\)s|%s|:\w+|\$\d+")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+
+class QueryBudgetError(Exception):
+    """Un request o bloque superó su presupuesto de consultas o repitió la misma sentencia (N+1)."""
+
+
+def forma_sentencia(statement: str) -> str:
+    """SQL sin literales ni parámetros: `... WHERE id = ?` y `... IN (?)` para cualquier valor o lista."""
+    forma = _LITERALES.sub('?', statement)
+    forma = _MARCADORES.sub('?', forma)
+    forma = _LISTAS.sub('(?)', forma)
+    return _ESPACIOS.sub(' ', forma).strip()
+
+
+class ConteoConsultas:
+    """Sentencias SQL ejecutadas dentro de un request o de un bloque `GuardiaConsultas.bloque`."""
+
+    def __init__(self, nombre, presupuesto=None, umbral_repetidas=None):
+        self.nombre = nombre
+        self.presupuesto = presupuesto
+        self.umbral_repetidas = umbral_repetidas
+        self.por_forma = Counter()
+        self._lock = threading.Lock()
+
+    def registrar(self, statement):
+        forma = forma_sentencia(statement)
+        with self._lock:
+            self.por_forma[forma] += 1
+
+    @property
+    def total(self):
+        return sum(self.por_forma.values())
+
+    def repetidas(self):
+        """[(forma, veces)] de las sentencias que se repiten más de `umbral_repetidas` veces."""
+        if not self.umbral_repetidas:
+            return []
+        return [(forma, veces) for forma, veces in self.por_forma.most_common() if veces > self.umbral_repetidas]
+
+    def problemas(self):
+        """Descripción de cada violación (lista vacía si está dentro del presupuesto)."""
+        problemas = []
+        if self.presupuesto is not None and self.total > self.presupuesto:
+            problemas.append(f"{self.total} consultas (presupuesto {self.presupuesto})")
+        for forma, veces in self.repetidas():
+            problemas.append(f"posible N+1: {veces} veces `{forma[:200]}`")
+        return problemas
+
+
+# Conteos activos (el del request y los bloques anidados); se propaga a los hilos del dashboard
+_conteos = contextvars.ContextVar('guardia_consultas', default=())
+
+
+class GuardiaConsultas:
+    """
+    Presupuesto de consultas SQL por endpoint y detección de N+1 (pruebas y staging).
+
+    Cuenta las sentencias de cada request (eventos de SQLAlchemy) y agrupa las que tienen la
+    misma forma (mismo SQL con distintos parámetros): una forma repetida más de
+    QUERY_GUARD_REPEAT_THRESHOLD veces suele ser una relación lazy recorrida fila a fila.
+
+    QUERY_GUARD_MODE: 'off' (sin costo), 'log' (warning por violación, pensado para staging)
+    o 'raise' (QueryBudgetError: el request falla con 500; en TestingConfig la excepción llega
+    a la prueba). El presupuesto de cada endpoint está en QUERY_BUDGETS (nombre del endpoint ->
+    máximo de consultas); los demás usan QUERY_BUDGET_DEFAULT. En las respuestas en streaming
+    solo se cuenta hasta que empieza el envío del cuerpo.
+
+    `bloque()` aplica el mismo control a un fragmento de código (pruebas, comandos CLI).
+    """
+
+    def __init__(self, app=None):
+        self.modo = 'off'
+        self.presupuesto_default = None
+        self.presupuestos = {}
+        self.umbral_repetidas = 5
+        self._lock = threading.Lock()
+        self._reset_contadores()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        modo = app.config.get('QUERY_GUARD_MODE', 'off')
+        if modo not in MODOS:
+            raise ValueError(f"QUERY_GUARD_MODE inválido: {modo} (opciones: {', '.join(MODOS)})")
+        self.modo = modo
+        self.presupuesto_default = app.config.get('QUERY_BUDGET_DEFAULT')
+        self.presupuestos = dict(app.config.get('QUERY_BUDGETS', {}))
+        self.umbral_repetidas = app.config.get('QUERY_GUARD_REPEAT_THRESHOLD', 5)
+        self._reset_contadores()
+        if self.modo != 'off':
+            app.before_request(self._antes_del_request)
+            app.after_request(self._despues_del_request)
+            app.teardown_request(self._al_terminar_request)
+            if not event.contains(Engine, 'before_cursor_execute', _al_ejecutar):
+                event.listen(Engine, 'before_cursor_execute', _al_ejecutar)
+        app.extensions['guardia_consultas'] = self
+
+    def _reset_contadores(self):
+        self.requests_revisados = 0
+        self.violaciones = 0
+        self.ultimas_violaciones = []
+
+    def presupuesto_para(self, endpoint):
+        return self.presupuestos.get(endpoint, self.presupuesto_default)
+
+    # --- Hooks del request ---
+
+    def _antes_del_request(self):
+        endpoint = request.endpoint or 'sin_ruta'
+        g.conteo_consultas = ConteoConsultas(endpoint, self.presupuesto_para(endpoint), self.umbral_repetidas)
+        # Se suma a los conteos activos: un bloque que envuelve al request (test client) también cuenta
+        _conteos.set(_conteos.get() + (g.conteo_consultas,))
+
+    def _despues_del_request(self, response):
+        conteo = g.get('conteo_consultas')
+        if conteo is not None:
+            with self._lock:
+                self.requests_revisados += 1
+            self._verificar(conteo)
+        return response
+
+    def _al_terminar_request(self, error=None):
+        conteo = g.pop('conteo_consultas', None)
+        if conteo is not None:
+            _conteos.set(tuple(c for c in _conteos.get() if c is not conteo))
+
+    # --- Bloques ---
+
+    @contextmanager
+    def bloque(self, nombre, presupuesto=None, umbral_repetidas=None, modo=None):
+        """
+        Cuenta las consultas del bloque y al salir aplica el presupuesto (con `modo`, o el configurado).
+        Funciona aunque QUERY_GUARD_MODE sea 'off'; retorna el ConteoConsultas.
+        """
+        conteo = ConteoConsultas(nombre, presupuesto, umbral_repetidas or self.umbral_repetidas)
+        if not event.contains(Engine, 'before_cursor_execute', _al_ejecutar):
+            event.listen(Engine, 'before_cursor_execute', _al_ejecutar)
+        token = _conteos.set(_conteos.get() + (conteo,))
+        try:
+            yield conteo
+        finally:
+            _conteos.reset(token)
+        self._verificar(conteo, modo)
+
+    def _verificar(self, conteo, modo=None):
+        modo = modo or self.modo
+        problemas = conteo.problemas()
+        if not problemas or modo == 'off':
+            return
+        mensaje = f"Presupuesto de consultas excedido en {conteo.nombre}: " + '; '.join(problemas)
+        with self._lock:
+            self.violaciones += 1
+            self.ultimas_violaciones = (self.ultimas_violaciones + [mensaje])[-20:]
+        if modo == 'raise':
+            raise QueryBudgetError(mensaje)
+        current_app.logger.warning(mensaje)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "modo": self.modo,
+                "presupuesto_default": self.presupuesto_default,
+                "umbral_repetidas": self.umbral_repetidas,
+                "requests_revisados": self.requests_revisados,
+                "violaciones": self.violaciones,
+                "ultimas_violaciones": list(self.ultimas_violaciones),
+            }
+
+
+def _al_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    for conteo in _conteos.get():
+        conteo.registrar(statement)
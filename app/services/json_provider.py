@@ -0,0 +1,76 @@
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask (módulo json de la librería estándar) con el formato anterior de la App:
+    Decimal como número (vía float, puede perder centavos) y fechas en ISO 8601.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Decimal):
+            return float(o)
+        if hasattr(o, 'isoformat'):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON basado en orjson (JSON_PROVIDER=orjson).
+
+    - Decimal se escribe tal cual como número JSON (orjson.Fragment con su representación
+      exacta): los montos Numeric(15, 2) no pasan por float y conservan los centavos.
+    - datetime / date / time en ISO 8601 (nativo en orjson).
+    - Claves no string (ej. id_categoria) y orden de claves igual que el proveedor por defecto.
+    - Salida UTF-8 sin escapar (ensure_ascii no aplica) y compacta salvo en modo debug.
+
+    Si se pasan opciones propias de json.dumps (indent, cls...) delega en el proveedor estándar.
+    """
+
+    def __init__(self, app):
+        import orjson
+        self._orjson = orjson
+        super().__init__(app)
+
+    def _default(self, o):
+        if isinstance(o, Decimal):
+            if not o.is_finite():
+                raise TypeError(f"Decimal no representable en JSON: {o}")
+            return self._orjson.Fragment(str(o))
+        return DefaultJSONProvider.default(o)
+
+    def _opciones(self):
+        opciones = self._orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opciones |= self._orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            opciones |= self._orjson.OPT_INDENT_2
+        return opciones
+
+    def dumps_bytes(self, obj) -> bytes:
+        return self._orjson.dumps(obj, default=self._default, option=self._opciones())
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            kwargs.setdefault('default', StdlibJSONProvider.default)
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self._orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+# JSON_PROVIDER -> clase del proveedor
+PROVEEDORES_JSON = {
+    'orjson': OrjsonProvider,
+    'stdlib': StdlibJSONProvider,
+}
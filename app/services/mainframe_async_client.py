@@ -0,0 +1,121 @@
+import asyncio
+import contextvars
+import json
+import time
+from contextlib import asynccontextmanager
+from decimal import Decimal
+import httpx
+from flask import current_app
+from app.services.circuit_breaker import CircuitOpenError, BulkheadFullError
+from app.services.metricas_rendimiento import registrar_mainframe
+
+
+class AsyncMainframeClient:
+    """
+    Variante asyncio del cliente del gateway CICS (httpx.AsyncClient).
+
+    No tiene configuración propia: usa la del MainframeClient síncrono (URLs, timeouts,
+    reintentos) y comparte con él los circuit breakers y las respuestas STALE, de modo
+    que ambos modos ven el mismo estado del Mainframe.
+
+    Flask ejecuta cada vista async en su propio event loop, así que el pool de conexiones
+    vive lo que dura el request: `sesion()` abre un AsyncClient y lo deja disponible para
+    todas las transacciones del request (incluidas las que se lanzan en paralelo).
+    Fuera de una sesión, cada `consultar` abre y cierra su propio cliente.
+    """
+
+    def __init__(self, base, app=None):
+        self.base = base
+        self._sesion_actual = contextvars.ContextVar('mainframe_async_sesion', default=None)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['mainframe_async_client'] = self
+
+    @property
+    def configurado(self):
+        return self.base.configurado
+
+    def url_para(self, trx: str) -> str:
+        return self.base.url_para(trx)
+
+    def _crear_cliente(self):
+        base = self.base
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(base.read_timeout, connect=base.connect_timeout),
+            limits=httpx.Limits(max_connections=base.pool_size, max_keepalive_connections=base.pool_size),
+        )
+
+    @asynccontextmanager
+    async def sesion(self):
+        """`async with mainframe_async.sesion():` comparte un AsyncClient entre las llamadas del bloque."""
+        actual = self._sesion_actual.get()
+        if actual is not None:
+            yield actual
+            return
+        cliente = self._crear_cliente()
+        token = self._sesion_actual.set(cliente)
+        try:
+            yield cliente
+        finally:
+            self._sesion_actual.reset(token)
+            await cliente.aclose()
+
+    async def post(self, trx: str, payload: dict):
+        """
+        Ejecuta la transacción `trx` y retorna el `httpx.Response`.
+        Las transacciones idempotentes se reintentan ante errores de red o 502/503/504,
+        con backoff exponencial (mismos MAINFRAME_MAX_RETRIES / MAINFRAME_BACKOFF_FACTOR).
+        """
+        async with self.sesion() as cliente:
+            reintentos = self.base.max_retries if trx in self.base.retry_trx else 0
+            for intento in range(reintentos + 1):
+                if intento:
+                    await asyncio.sleep(self.base.backoff_factor * (2 ** (intento - 1)))
+                try:
+                    response = await cliente.post(self.url_para(trx), json=payload)
+                except httpx.TransportError:
+                    if intento == reintentos:
+                        raise
+                    continue
+                if response.status_code not in (502, 503, 504) or intento == reintentos:
+                    return response
+
+    async def consultar(self, trx: str, payload: dict):
+        """
+        Igual que MainframeClient.consultar: JSON de respuesta, última respuesta buena
+        marcada con STALE si el Mainframe no está disponible, o None.
+        """
+        inicio = time.perf_counter()
+        data = await self._consultar(trx, payload)
+        registrar_mainframe(trx, time.perf_counter() - inicio, data)
+        return data
+
+    async def _consultar(self, trx: str, payload: dict):
+        clave = (trx, json.dumps(payload, sort_keys=True, default=str))
+        try:
+            response = await self.base.breaker(trx).llamar_async(
+                lambda: self.post(trx, payload),
+                es_fallo=lambda r: r.status_code >= 500
+            )
+        except CircuitOpenError:
+            current_app.logger.warning(f"Circuit breaker abierto para {trx}. Fallando rápido.")
+            return self.base._respuesta_diferida(clave)
+        except BulkheadFullError:
+            current_app.logger.warning(f"Límite de llamadas concurrentes alcanzado para {trx}.")
+            return self.base._respuesta_diferida(clave)
+        except httpx.HTTPError as e:
+            current_app.logger.error(f"Excepción conectando al Mainframe ({trx}): {e}")
+            return self.base._respuesta_diferida(clave)
+
+        if response.status_code == 200:
+            # Montos como Decimal (exactos hasta la respuesta JSON de la App)
+            data = response.json(parse_float=Decimal)
+            self.base._guardar_respuesta(clave, data)
+            return data
+
+        current_app.logger.error(f"Error Mainframe {trx}: {response.status_code} - {response.text}")
+        if response.status_code >= 500:
+            return self.base._respuesta_diferida(clave)
+        return None
@@ -0,0 +1,240 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, BulkheadFullError
+from app.services.metricas_rendimiento import registrar_mainframe
+
+
+class MainframeNoDisponibleError(Exception):
+    """El Mainframe no respondió (breaker abierto, bulkhead lleno, error de red o 5xx) y no hay copia STALE."""
+
+
+class MainframeClient:
+    """
+    Cliente HTTP compartido para el gateway CICS / z/OS Connect.
+    Mantiene una sesión con pool de conexiones keep-alive por worker (proceso),
+    de modo que las transacciones reutilizan la conexión TCP+TLS en lugar de
+    abrir una nueva en cada request.
+    También es el único lugar donde se construyen las URLs de cada transacción.
+    Cada transacción pasa por su propio circuit breaker / bulkhead; si está abierto
+    se sirve la última respuesta buena (marcada con STALE) o se falla rápido.
+    """
+
+    def __init__(self, app=None):
+        self.base_url = None
+        self.paths = {}
+        self.connect_timeout = 2
+        self.read_timeout = 5
+        self.pool_size = 10
+        self.max_retries = 2
+        self.backoff_factor = 0.3
+        self.retry_trx = set()
+        self.breakers = {}
+        self.breaker_config = {}
+        self.serve_stale = True
+        self.stale_max_age = 600
+        self.stale_max_entries = 5000
+        self._stale = OrderedDict()
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.base_url = self._resolver_base_url(config.get('MAINFRAME_BASE_URL'), config.get('MAINFRAME_CICS_URL'))
+        self.paths = dict(config.get('MAINFRAME_TRX_PATHS', {}))
+        self.connect_timeout = config.get('MAINFRAME_CONNECT_TIMEOUT', 2)
+        self.read_timeout = config.get('MAINFRAME_READ_TIMEOUT', 5)
+        self.pool_size = config.get('MAINFRAME_POOL_SIZE', 10)
+        self.max_retries = config.get('MAINFRAME_MAX_RETRIES', 2)
+        self.backoff_factor = config.get('MAINFRAME_BACKOFF_FACTOR', 0.3)
+        self.retry_trx = set(config.get('MAINFRAME_IDEMPOTENT_TRX', ()))
+        self.breaker_config = {
+            'window_size': config.get('MAINFRAME_BREAKER_WINDOW', 20),
+            'min_calls': config.get('MAINFRAME_BREAKER_MIN_CALLS', 10),
+            'failure_rate': config.get('MAINFRAME_BREAKER_FAILURE_RATE', 0.5),
+            'slow_call_seconds': config.get('MAINFRAME_BREAKER_SLOW_CALL_SECONDS', 2.5),
+            'slow_call_rate': config.get('MAINFRAME_BREAKER_SLOW_CALL_RATE', 0.5),
+            'open_seconds': config.get('MAINFRAME_BREAKER_OPEN_SECONDS', 30),
+            'max_concurrent': config.get('MAINFRAME_MAX_CONCURRENT', 5),
+            'bulkhead_timeout': config.get('MAINFRAME_BULKHEAD_TIMEOUT', 0.1),
+        }
+        self.breakers = {
+            trx: CircuitBreaker(trx, **self.breaker_config)
+            for trx in config.get('MAINFRAME_BREAKER_TRX', ())
+        }
+        self.serve_stale = config.get('MAINFRAME_SERVE_STALE', True)
+        self.stale_max_age = config.get('MAINFRAME_STALE_MAX_AGE', 600)
+        self.stale_max_entries = config.get('MAINFRAME_STALE_MAX_ENTRIES', 5000)
+        self._stale = OrderedDict()
+        self.cerrar()
+        app.extensions['mainframe_client'] = self
+
+    @staticmethod
+    def _resolver_base_url(base_url, cics_url):
+        """
+        Compatibilidad: si solo se configuró MAINFRAME_CICS_URL (apuntando a trx001),
+        la base es el path padre de esa URL.
+        """
+        if base_url:
+            return base_url.rstrip('/')
+        if not cics_url:
+            return None
+        cics_url = cics_url.rstrip('/')
+        base, _, ultimo = cics_url.rpartition('/')
+        if ultimo.lower() == 'trx001' and base:
+            return base
+        return cics_url
+
+    @property
+    def configurado(self):
+        return bool(self.base_url)
+
+    def url_para(self, trx: str) -> str:
+        """Construye la URL de la transacción (TRX001, TRX002, CLIENTE...)."""
+        path = self.paths.get(trx, trx.lower())
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _crear_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        # Las consultas idempotentes se reintentan con backoff exponencial.
+        # requests elige el adapter por prefijo de URL más largo, así que basta
+        # con montarlo sobre la URL de cada transacción idempotente.
+        if self.base_url and self.retry_trx and self.max_retries:
+            retry = Retry(
+                total=self.max_retries,
+                connect=self.max_retries,
+                read=self.max_retries,
+                status=self.max_retries,
+                backoff_factor=self.backoff_factor,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset(['POST']),
+                raise_on_status=False,
+            )
+            adapter_reintentos = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+            for trx in self.retry_trx:
+                session.mount(self.url_para(trx), adapter_reintentos)
+        return session
+
+    @property
+    def session(self):
+        # Una sesión por proceso: tras el fork de gunicorn cada worker crea su propio pool.
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._crear_session()
+                    self._session_pid = pid
+        return self._session
+
+    def post(self, trx: str, payload: dict):
+        """
+        Ejecuta la transacción `trx` contra el gateway y retorna el `requests.Response`.
+        Usa timeouts separados de conexión y lectura.
+        """
+        return self.session.post(self.url_para(trx), json=payload,
+                                 timeout=(self.connect_timeout, self.read_timeout))
+
+    def breaker(self, trx: str) -> CircuitBreaker:
+        breaker = self.breakers.get(trx)
+        if breaker is None:
+            with self._lock:
+                breaker = self.breakers.setdefault(trx, CircuitBreaker(trx, **self.breaker_config))
+        return breaker
+
+    def consultar(self, trx: str, payload: dict, lanzar_no_disponible: bool = False):
+        """
+        Ejecuta la transacción protegida por su circuit breaker y bulkhead.
+        Retorna el JSON de respuesta, la última respuesta buena marcada con STALE
+        si el Mainframe no está disponible, o None.
+        Con `lanzar_no_disponible`, None significa solo que el Mainframe rechazó la consulta (4xx):
+        si no está disponible y no hay copia STALE lanza MainframeNoDisponibleError.
+        La latencia se registra en las métricas de rendimiento (Server-Timing y /metrics).
+        """
+        inicio = time.perf_counter()
+        data = None
+        try:
+            data = self._consultar(trx, payload, lanzar_no_disponible)
+        finally:
+            registrar_mainframe(trx, time.perf_counter() - inicio, data)
+        return data
+
+    def _consultar(self, trx: str, payload: dict, lanzar_no_disponible: bool = False):
+        clave = (trx, json.dumps(payload, sort_keys=True, default=str))
+        try:
+            response = self.breaker(trx).llamar(
+                lambda: self.post(trx, payload),
+                es_fallo=lambda r: r.status_code >= 500
+            )
+        except CircuitOpenError:
+            current_app.logger.warning(f"Circuit breaker abierto para {trx}. Fallando rápido.")
+            return self._diferida_o_error(clave, lanzar_no_disponible)
+        except BulkheadFullError:
+            current_app.logger.warning(f"Límite de llamadas concurrentes alcanzado para {trx}.")
+            return self._diferida_o_error(clave, lanzar_no_disponible)
+        except requests.RequestException as e:
+            current_app.logger.error(f"Excepción conectando al Mainframe ({trx}): {e}")
+            return self._diferida_o_error(clave, lanzar_no_disponible)
+
+        if response.status_code == 200:
+            # Montos como Decimal (exactos hasta la respuesta JSON de la App)
+            data = response.json(parse_float=Decimal)
+            self._guardar_respuesta(clave, data)
+            return data
+
+        current_app.logger.error(f"Error Mainframe {trx}: {response.status_code} - {response.text}")
+        if response.status_code >= 500:
+            return self._diferida_o_error(clave, lanzar_no_disponible)
+        return None
+
+    def _guardar_respuesta(self, clave, data):
+        if not self.serve_stale or not isinstance(data, dict):
+            return
+        with self._lock:
+            self._stale[clave] = (time.monotonic(), data)
+            self._stale.move_to_end(clave)
+            while len(self._stale) > self.stale_max_entries:
+                self._stale.popitem(last=False)
+
+    def _diferida_o_error(self, clave, lanzar_no_disponible):
+        data = self._respuesta_diferida(clave)
+        if data is None and lanzar_no_disponible:
+            raise MainframeNoDisponibleError(clave[0])
+        return data
+
+    def _respuesta_diferida(self, clave):
+        """Última respuesta buena conocida (si no es demasiado antigua), marcada como STALE."""
+        if not self.serve_stale:
+            return None
+        with self._lock:
+            entrada = self._stale.get(clave)
+        if entrada is None:
+            return None
+        guardado_en, data = entrada
+        if time.monotonic() - guardado_en > self.stale_max_age:
+            return None
+        current_app.logger.info(f"Sirviendo respuesta diferida (STALE) para {clave[0]}")
+        return {**data, "STALE": True}
+
+    def estado_breakers(self):
+        return {trx: breaker.snapshot() for trx, breaker in sorted(self.breakers.items())}
+
+    def cerrar(self):
+        """Cierra el pool de conexiones (ej. al reciclar el worker)."""
+        if self._session is not None:
+            self._session.close()
+        self._session = None
+        self._session_pid = None
@@ -0,0 +1,249 @@
+import contextvars
+import functools
+import threading
+import time
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites (segundos) de los histogramas de latencia y de cantidad de sentencias SQL por request
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_SENTENCIAS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+# Valor de etiqueta para las series que exceden el máximo por métrica o no son conocidas
+OTRO = 'otro'
+
+
+class _Acumulador:
+    """Tiempos de un request. Las sub-llamadas en paralelo (dashboard) suman desde varios hilos."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.sentencias = 0
+        self.segundos_db = 0.0
+        self.mainframe = {}  # trx -> segundos
+        self.tramos = {}     # nombre -> segundos (ej. 'mapeo')
+        self._lock = threading.Lock()
+
+    def sumar_db(self, segundos):
+        with self._lock:
+            self.sentencias += 1
+            self.segundos_db += segundos
+
+    def sumar(self, destino, nombre, segundos):
+        with self._lock:
+            destino[nombre] = destino.get(nombre, 0.0) + segundos
+
+
+# Acumulador del request en curso; se propaga a los hilos del dashboard y a las tareas asyncio
+_acumulador = contextvars.ContextVar('metricas_rendimiento', default=None)
+
+
+class Histograma:
+    """Histograma con etiquetas en formato de exposición Prometheus (acumulado por worker)."""
+
+    def __init__(self, nombre, ayuda, etiquetas, buckets, max_series=500):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.buckets = tuple(buckets)
+        self.max_series = max_series
+        self._series = {}  # valores de etiquetas -> [conteo por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_etiquetas):
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                if len(self._series) >= self.max_series:
+                    # Cardinalidad acotada: las series nuevas se agrupan en 'otro'
+                    valores_etiquetas = (OTRO,) * len(self.etiquetas)
+                serie = self._series.setdefault(valores_etiquetas, [[0] * len(self.buckets), 0.0, 0])
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    @staticmethod
+    def _escapar(valor):
+        return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def _etiquetas(self, valores, extra=''):
+        pares = [f'{e}="{self._escapar(v)}"' for e, v in zip(self.etiquetas, valores)]
+        if extra:
+            pares.append(extra)
+        return '{' + ','.join(pares) + '}' if pares else ''
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            series = sorted((valores, (list(s[0]), s[1], s[2])) for valores, s in self._series.items())
+        for valores, (conteos, suma, total) in series:
+            for limite, conteo in zip(self.buckets, conteos):
+                le = f'le="{limite}"'
+                lineas.append(f'{self.nombre}_bucket{self._etiquetas(valores, le)} {conteo}')
+            le = 'le="+Inf"'
+            lineas.append(f'{self.nombre}_bucket{self._etiquetas(valores, le)} {total}')
+            lineas.append(f'{self.nombre}_sum{self._etiquetas(valores)} {suma}')
+            lineas.append(f'{self.nombre}_count{self._etiquetas(valores)} {total}')
+        return '\n'.join(lineas)
+
+
+class MetricasRendimiento:
+    """
+    Instrumentación por request (por worker): tiempo total, sentencias SQL y su tiempo
+    (eventos de SQLAlchemy), latencia de cada transacción al Mainframe y tramos medidos
+    explícitamente (ej. el mapeo COBOL -> JSON de products.py).
+
+    - Cabecera `Server-Timing` en cada respuesta (SERVER_TIMING_ENABLED). Lo que no es BD,
+      Mainframe ni un tramo medido se reporta como `app` (serialización, JWT, hooks...).
+      En el dashboard las sub-llamadas corren en paralelo, así que db + mainframe puede superar a `total`.
+    - Histogramas Prometheus expuestos en /metrics. Las etiquetas tienen cardinalidad acotada:
+      la regla de URL (no la URL), la clase de status (2xx, 4xx...), la transacción (solo las
+      configuradas) y un máximo de PERF_METRICS_MAX_SERIES series por métrica.
+
+    En las respuestas en streaming (exportación) solo se mide hasta que empieza el envío del cuerpo.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.server_timing = True
+        self.trx_conocidas = frozenset()
+        self._crear_histogramas(500)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PERF_METRICS_ENABLED', True)
+        self.server_timing = app.config.get('SERVER_TIMING_ENABLED', True)
+        self.trx_conocidas = frozenset(app.config.get('MAINFRAME_BREAKER_TRX', ()))
+        self._crear_histogramas(app.config.get('PERF_METRICS_MAX_SERIES', 500))
+        if self.enabled or self.server_timing:
+            app.before_request(self._antes_del_request)
+            app.after_request(self._despues_del_request)
+            app.teardown_request(self._al_terminar_request)
+            if not event.contains(Engine, 'before_cursor_execute', _antes_de_sentencia):
+                event.listen(Engine, 'before_cursor_execute', _antes_de_sentencia)
+                event.listen(Engine, 'after_cursor_execute', _despues_de_sentencia)
+        app.extensions['metricas_rendimiento'] = self
+
+    def _crear_histogramas(self, max_series):
+        self.duracion_request = Histograma(
+            'http_request_duration_seconds', 'Tiempo total de procesamiento del request.',
+            ('endpoint', 'method', 'status'), BUCKETS_SEGUNDOS, max_series)
+        self.sentencias_request = Histograma(
+            'http_request_db_statements', 'Sentencias SQL ejecutadas por request.',
+            ('endpoint',), BUCKETS_SENTENCIAS, max_series)
+        self.duracion_db_request = Histograma(
+            'http_request_db_duration_seconds', 'Tiempo total en sentencias SQL por request.',
+            ('endpoint',), BUCKETS_SEGUNDOS, max_series)
+        self.duracion_mainframe = Histograma(
+            'mainframe_call_duration_seconds', 'Latencia de cada transacción al Mainframe (incluye reintentos).',
+            ('trx', 'resultado'), BUCKETS_SEGUNDOS, max_series)
+
+    @property
+    def histogramas(self):
+        return (self.duracion_request, self.sentencias_request, self.duracion_db_request, self.duracion_mainframe)
+
+    def reset(self):
+        for histograma in self.histogramas:
+            histograma.reset()
+
+    def exponer(self):
+        """Texto en formato de exposición Prometheus (text/plain; version=0.0.4)."""
+        return '\n\n'.join(h.exponer() for h in self.histogramas) + '\n'
+
+    # --- Hooks del request ---
+
+    def _antes_del_request(self):
+        _acumulador.set(_Acumulador())
+
+    def _despues_del_request(self, response):
+        acumulador = _acumulador.get()
+        if acumulador is None:
+            return response
+        total = time.perf_counter() - acumulador.inicio
+        if self.server_timing:
+            response.headers['Server-Timing'] = self._server_timing(acumulador, total)
+        if self.enabled:
+            endpoint = request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+            self.duracion_request.observar(total, endpoint, request.method, f"{response.status_code // 100}xx")
+            self.sentencias_request.observar(acumulador.sentencias, endpoint)
+            self.duracion_db_request.observar(acumulador.segundos_db, endpoint)
+        return response
+
+    def _al_terminar_request(self, error=None):
+        _acumulador.set(None)
+
+    @staticmethod
+    def _server_timing(acumulador, total):
+        metricas = [f'total;dur={total * 1000:.1f}']
+        medido = acumulador.segundos_db
+        metricas.append(f'db;dur={acumulador.segundos_db * 1000:.1f};desc="{acumulador.sentencias} sentencias"')
+        for trx, segundos in sorted(acumulador.mainframe.items()):
+            metricas.append(f'mf-{trx.lower()};dur={segundos * 1000:.1f};desc="Mainframe {trx}"')
+            medido += segundos
+        for nombre, segundos in sorted(acumulador.tramos.items()):
+            metricas.append(f'{nombre};dur={segundos * 1000:.1f}')
+            medido += segundos
+        metricas.append(f'app;dur={max(0.0, total - medido) * 1000:.1f}')
+        return ', '.join(metricas)
+
+    # --- Registro desde los servicios ---
+
+    def observar_mainframe(self, trx, segundos, resultado):
+        acumulador = _acumulador.get()
+        if acumulador is not None:
+            acumulador.sumar(acumulador.mainframe, trx, segundos)
+        if self.enabled:
+            self.duracion_mainframe.observar(segundos, trx if trx in self.trx_conocidas else OTRO, resultado)
+
+
+def _antes_de_sentencia(conn, cursor, statement, parameters, context, executemany):
+    # El inicio se guarda en el contexto de ejecución de la sentencia (no en la conexión):
+    # si la sentencia falla no queda un valor pendiente que desfase las mediciones siguientes
+    if context is not None and _acumulador.get() is not None:
+        context._metricas_inicio = time.perf_counter()
+
+
+def _despues_de_sentencia(conn, cursor, statement, parameters, context, executemany):
+    acumulador = _acumulador.get()
+    inicio = getattr(context, '_metricas_inicio', None)
+    if acumulador is not None and inicio is not None:
+        acumulador.sumar_db(time.perf_counter() - inicio)
+
+
+def resultado_mainframe(data):
+    """Etiqueta `resultado` de una respuesta de MainframeClient.consultar."""
+    if data is None:
+        return 'error'
+    return 'stale' if isinstance(data, dict) and data.get('STALE') else 'ok'
+
+
+def registrar_mainframe(trx, segundos, data):
+    """Registra la latencia de una transacción (no hace nada fuera de una app con métricas)."""
+    metricas = current_app.extensions.get('metricas_rendimiento')
+    if metricas is not None:
+        metricas.observar_mainframe(trx, segundos, resultado_mainframe(data))
+
+
+def tramo(nombre):
+    """Decorador: suma la duración de la función al tramo `nombre` del Server-Timing del request en curso."""
+    def decorador(func):
+        @functools.wraps(func)
+        def envoltura(*args, **kwargs):
+            acumulador = _acumulador.get()
+            if acumulador is None:
+                return func(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                acumulador.sumar(acumulador.tramos, nombre, time.perf_counter() - inicio)
+        return envoltura
+    return decorador
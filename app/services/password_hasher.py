@@ -0,0 +1,114 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashQueueFullError(Exception):
+    """Hay demasiadas verificaciones de contraseña pendientes (tormenta de logins)."""
+
+
+class PasswordHasher:
+    """
+    Pool acotado (por worker) para generar y verificar hashes de contraseñas.
+
+    El hash (scrypt / pbkdf2) es CPU intensivo: se ejecuta en un ThreadPoolExecutor de
+    `workers` hilos (hashlib libera el GIL durante el cálculo) y se limita la cantidad de
+    tareas en vuelo a `max_pending`. Si la cola está llena se lanza HashQueueFullError
+    en lugar de encolar, para que una tormenta de logins no acapare los hilos del
+    servidor que atienden los endpoints de productos.
+
+    El método y el largo de la sal salen de Config (PASSWORD_HASH_METHOD /
+    PASSWORD_HASH_SALT_LENGTH); `verificar` indica si el hash guardado usa otros
+    parámetros para re-generarlo tras un login exitoso.
+    """
+
+    def __init__(self, app=None):
+        self.method = 'scrypt'
+        self.salt_length = 16
+        self.workers = os.cpu_count() or 1
+        self.max_pending = self.workers * 4
+        self.timeout = 5.0
+        self._prefijo = None
+        self._executor = None
+        self._pid = None
+        self._cupos = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self.rechazados = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        self.salt_length = app.config.get('PASSWORD_HASH_SALT_LENGTH', 16)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING') or self.workers * 4
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 5.0)
+        self._prefijo = None
+        self.cerrar()
+        app.extensions['password_hasher'] = self
+
+    def _pool(self):
+        # Un executor por proceso: los hilos no sobreviven a un fork (gunicorn --preload)
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            with self._lock:
+                if self._executor is None or self._pid != pid:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                    self._cupos = threading.BoundedSemaphore(self.max_pending)
+                    self._pid = pid
+        return self._executor
+
+    def _ejecutar(self, func, *args, **kwargs):
+        pool = self._pool()
+        if not self._cupos.acquire(blocking=False):
+            with self._lock:
+                self.rechazados += 1
+            raise HashQueueFullError("Demasiadas verificaciones de contraseña en curso")
+        try:
+            futuro = pool.submit(func, *args, **kwargs)
+        except Exception:
+            self._cupos.release()
+            raise
+        futuro.add_done_callback(lambda _: self._cupos.release())
+        try:
+            return futuro.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashQueueFullError("Tiempo de espera agotado verificando la contraseña")
+
+    def generar(self, password):
+        return self._ejecutar(generate_password_hash, password, method=self.method, salt_length=self.salt_length)
+
+    @property
+    def prefijo(self):
+        """Parámetros completos del método configurado, ej. 'scrypt:32768:8:1'."""
+        if self._prefijo is None:
+            self._prefijo = generate_password_hash('', method=self.method, salt_length=1).split('$', 1)[0]
+        return self._prefijo
+
+    def necesita_rehash(self, password_hash):
+        partes = password_hash.split('$')
+        return len(partes) != 3 or partes[0] != self.prefijo or len(partes[1]) != self.salt_length
+
+    def verificar(self, password_hash, password):
+        """Retorna (valida, necesita_rehash)."""
+        if not password_hash:
+            return False, False
+        valida = self._ejecutar(check_password_hash, password_hash, password)
+        return valida, valida and self.necesita_rehash(password_hash)
+
+    def cerrar(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._pid = None
+
+    def stats(self):
+        return {
+            "metodo": self.prefijo,
+            "largo_sal": self.salt_length,
+            "hilos": self.workers,
+            "max_pendientes": self.max_pending,
+            "rechazados": self.rechazados,
+        }
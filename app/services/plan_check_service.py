@@ -0,0 +1,166 @@
+from app.extensions import db, core_cache, catalogo_mcc
+from app.models.core_banking import Cliente, Cuenta, Movimiento, CategoriaCore, MccCore, ResumenGastoMensual, EstadoRollup
+from flask import current_app
+from sqlalchemy import event
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+import json
+
+# Tablas que crecen con los clientes: un recorrido completo sobre ellas es una regresión
+TABLAS_GRANDES = (
+    'CORE_CLIENTES',
+    'CORE_CUENTAS',
+    'CORE_MOVIMIENTOS',
+    'CORE_RESUMEN_GASTO_MENSUAL',
+    'TOKEN_BLOCKLIST',
+)
+
+DNI_PLAN = 'PLANCHK0001'
+CUENTA_PLAN = 'PLANCHK-0001'
+MCC_PLAN = 'PLANCHK-MCC'
+
+
+class PlanCheckService:
+    """
+    Verificación de planes de ejecución de las consultas de CoreBankingService (modo mock).
+
+    Siembra un dataset mínimo dentro de una transacción, ejecuta cada transacción
+    (TRX001..TRX004, búsqueda de cliente) capturando las sentencias SQL emitidas,
+    corre EXPLAIN sobre cada una y reporta los recorridos secuenciales sobre TABLAS_GRANDES.
+    Al terminar se hace ROLLBACK: no deja datos.
+
+    - PostgreSQL: EXPLAIN (FORMAT JSON) con `enable_seqscan = off`. Con datos pequeños el
+      planner prefiere un Seq Scan aunque exista el índice; con el costo penalizado, un
+      Seq Scan que sobrevive indica que ningún índice sirve a la consulta.
+    - SQLite: EXPLAIN QUERY PLAN; se reporta cada `SCAN <tabla>` y cada índice automático.
+    """
+
+    @staticmethod
+    def verificar(tablas=TABLAS_GRANDES):
+        """
+        Retorna la lista de resultados, uno por sentencia capturada:
+        {"caso", "sql", "plan", "recorridos": [tablas con recorrido completo]}
+        """
+        resultados = []
+        config_original = {k: current_app.config.get(k) for k in ('USE_MOCK_MAINFRAME', 'ANALYTICS_USE_ROLLUP')}
+        current_app.config['USE_MOCK_MAINFRAME'] = True
+        try:
+            datos = PlanCheckService._sembrar()
+            for caso, llamada in PlanCheckService._casos(datos):
+                with PlanCheckService._capturar() as sentencias:
+                    llamada()
+                for sql, parametros in sentencias:
+                    plan, recorridos = PlanCheckService._explicar(sql, parametros, tablas)
+                    resultados.append({"caso": caso, "sql": sql, "plan": plan, "recorridos": recorridos})
+        finally:
+            current_app.config.update(config_original)
+            db.session.rollback()
+            core_cache.limpiar()
+            catalogo_mcc.invalidar()
+        return resultados
+
+    @staticmethod
+    def _sembrar():
+        """Dataset mínimo: un cliente, una cuenta con 40 días de movimientos y una categoría."""
+        categoria = CategoriaCore(nombre_categoria='PlanCheck')
+        db.session.add(categoria)
+        db.session.flush()
+        db.session.add(MccCore(cod_mcc=MCC_PLAN, descripcion='PlanCheck', id_categoria=categoria.id_categoria))
+        cliente = Cliente(dni_ruc=DNI_PLAN, nombres='Plan', apellidos='Check', fecha_nac=date(1990, 1, 1))
+        db.session.add(cliente)
+        db.session.flush()
+        db.session.add(Cuenta(num_cuenta=CUENTA_PLAN, cod_cliente=cliente.cod_cliente, tipo_cuenta='AHO',
+                              saldo_contable=Decimal('1000'), saldo_disponible=Decimal('1000')))
+        # Rollup marcado como construido (dentro de la transacción) para que los movimientos
+        # lo alimenten y el caso "TRX004 (rollup)" lo lea
+        if db.session.get(EstadoRollup, ResumenGastoMensual.__tablename__) is None:
+            db.session.add(EstadoRollup(tabla=ResumenGastoMensual.__tablename__))
+        db.session.flush()
+
+        ahora = datetime.now()
+        for i in range(40):
+            db.session.add(Movimiento(
+                id_trx=f'PLANCHK{i:019d}', num_cuenta=CUENTA_PLAN,
+                fecha_proceso=ahora - timedelta(days=i), tipo_mov='D' if i % 4 else 'C',
+                monto=Decimal(10 + i * 9), glosa_trx=f'PLANCHK {i}',
+                cod_comercio=MCC_PLAN if i % 2 else None
+            ))
+        db.session.flush()
+        return {"cod_cliente": cliente.cod_cliente, "id_categoria": categoria.id_categoria}
+
+    @staticmethod
+    def _casos(datos):
+        from app.services.core_banking_service import CoreBankingService as S
+
+        cod_cliente = datos["cod_cliente"]
+        id_categoria = datos["id_categoria"]
+        catalogo_mcc.refrescar()
+
+        def metricas(usar_rollup):
+            def llamada():
+                current_app.config['ANALYTICS_USE_ROLLUP'] = usar_rollup
+                S.obtener_metricas_financieras(cod_cliente)
+            return llamada
+
+        def trx003_pagina_2():
+            pagina = S.obtener_movimientos_paginados(CUENTA_PLAN, id_categoria=id_categoria, limit=5)
+            S.obtener_movimientos_paginados(CUENTA_PLAN, id_categoria=id_categoria, limit=5,
+                                            cursor=pagina["meta"]["next_cursor"])
+
+        return [
+            ("CLIENTE (obtener_cliente)", lambda: S.obtener_cliente(DNI_PLAN)),
+            ("TRX001 (posición global)", lambda: S._consultar_posicion_global(cod_cliente)),
+            ("TRX002 (detalle de cuenta)", lambda: S._consultar_detalle_cuenta(CUENTA_PLAN, cod_cliente)),
+            ("TRX003 (página 1 y 2)", trx003_pagina_2),
+            ("TRX004 (rollup)", metricas(True)),
+            ("TRX004 (movimientos)", metricas(False)),
+        ]
+
+    @staticmethod
+    @contextmanager
+    def _capturar():
+        sentencias = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+                sentencias.append((statement, parameters))
+
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield sentencias
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    @staticmethod
+    def _explicar(sql, parametros, tablas):
+        conexion = db.session.connection()
+        if conexion.dialect.name == 'postgresql':
+            conexion.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            try:
+                fila = conexion.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, parametros).scalar()
+            finally:
+                conexion.exec_driver_sql("SET LOCAL enable_seqscan = on")
+            plan = fila if isinstance(fila, list) else json.loads(fila)
+            recorridos = sorted(PlanCheckService._seq_scans_pg(plan[0]["Plan"], tablas))
+            return json.dumps(plan, indent=1), recorridos
+
+        filas = conexion.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, parametros).all()
+        detalles = [fila[-1] for fila in filas]
+        recorridos = sorted({
+            tabla for detalle in detalles for tabla in tablas
+            if detalle.split()[:2] == ['SCAN', tabla]
+            # Índice automático: SQLite recorre la tabla completa para construirlo en cada ejecución
+            or f"{tabla} USING AUTOMATIC" in detalle
+        })
+        return "\n".join(detalles), recorridos
+
+    @staticmethod
+    def _seq_scans_pg(nodo, tablas):
+        encontrados = set()
+        if nodo.get("Node Type") == "Seq Scan" and nodo.get("Relation Name") in tablas:
+            encontrados.add(nodo["Relation Name"])
+        for hijo in nodo.get("Plans", []):
+            encontrados |= PlanCheckService._seq_scans_pg(hijo, tablas)
+        return encontrados
@@ -0,0 +1,80 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.pool import QueuePool
+
+
+class PoolDashboard:
+    """
+    Pool de hilos compartido (por worker) para las consultas a la BD que corren fuera del hilo
+    del request: las sub-llamadas del dashboard síncrono y, en las vistas async con el Core
+    simulado, cada transacción (`ejecutar_async`, en lugar del executor por defecto de cada
+    event loop, que no tiene un límite común).
+
+    Se crea una sola vez en `init_app` (los hilos se inician en el primer uso, después del
+    fork de gunicorn). Cada sub-llamada usa su propio app context y sesión de BD, así que el
+    pool limita a DASHBOARD_MAX_WORKERS las conexiones extra por proceso, sin importar cuántos
+    requests estén en curso; las sub-llamadas que no consiguen hilo esperan en cola
+    (y vencen con DASHBOARD_SUBCALL_TIMEOUT como cualquier otra).
+
+    DASHBOARD_MAX_WORKERS se acota a la capacidad del pool de SQLAlchemy (pool_size + max_overflow)
+    menos las conexiones que pueden retener los hilos que atienden requests (DB_REQUEST_THREADS),
+    para que el dashboard no agote el pool de conexiones.
+    """
+
+    def __init__(self, app=None):
+        self.max_workers = None
+        self.capacidad_bd = None
+        self._executor = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        solicitados = app.config.get('DASHBOARD_MAX_WORKERS', 8)
+        hilos_request = app.config.get('DB_REQUEST_THREADS', 8)
+        self.capacidad_bd = self._capacidad_pool_bd(app)
+        self.max_workers = solicitados
+        if self.capacidad_bd is not None and solicitados + hilos_request > self.capacidad_bd:
+            self.max_workers = max(1, self.capacidad_bd - hilos_request)
+            app.logger.warning(
+                f"DASHBOARD_MAX_WORKERS={solicitados} con {hilos_request} hilos por worker excede el pool de BD "
+                f"({self.capacidad_bd} conexiones): se usan {self.max_workers} hilos para el dashboard"
+            )
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='dashboard')
+        app.extensions['pool_dashboard'] = self
+
+    @staticmethod
+    def _capacidad_pool_bd(app):
+        """Conexiones máximas del engine (None si el pool no las limita, ej. SQLite en memoria)."""
+        from app.extensions import db
+
+        with app.app_context():
+            pool = db.engine.pool
+        if not isinstance(pool, QueuePool):
+            return None
+        max_overflow = getattr(pool, '_max_overflow', 0)
+        if max_overflow < 0:
+            return None
+        return pool.size() + max_overflow
+
+    def submit(self, func, *args):
+        return self._executor.submit(func, *args)
+
+    def ejecutar_async(self, func, *args):
+        """Awaitable de `func(*args)` en el pool, con una copia del contexto (como asyncio.to_thread)."""
+        contexto = contextvars.copy_context()
+        return asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(contexto.run, func, *args)
+        )
+
+    def stats(self):
+        return {
+            "max_workers": self.max_workers,
+            "capacidad_pool_bd": self.capacidad_bd,
+        }
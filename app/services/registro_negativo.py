@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class RegistroNegativo:
+    """
+    DNIs que el Core informó que no son clientes (caché negativa del registro, por worker).
+
+    Independiente de la caché de respuestas TRX001 / TRX002: no depende de CORE_CACHE_ENABLED,
+    no se descarta con `core_cache.limpiar()` (ej. tras una carga masiva) y no altera sus
+    estadísticas de hits / misses.
+    - Expiración por AUTH_REGISTRO_NEGATIVO_TTL (0 = deshabilitada).
+    - Evicción del más antiguo al superar AUTH_REGISTRO_NEGATIVO_MAX_ENTRIES.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 60
+        self.max_entries = 10000
+        self._expira_en = OrderedDict()  # dni -> expira_en (monotonic)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('AUTH_REGISTRO_NEGATIVO_TTL', 60)
+        self.max_entries = app.config.get('AUTH_REGISTRO_NEGATIVO_MAX_ENTRIES', 10000)
+        self.limpiar()
+        app.extensions['registro_negativo'] = self
+
+    def contiene(self, dni) -> bool:
+        with self._lock:
+            expira_en = self._expira_en.get(dni)
+            if expira_en is None:
+                return False
+            if expira_en <= time.monotonic():
+                del self._expira_en[dni]
+                return False
+            return True
+
+    def agregar(self, dni):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._expira_en.pop(dni, None)
+            self._expira_en[dni] = time.monotonic() + self.ttl
+            while len(self._expira_en) > self.max_entries:
+                self._expira_en.popitem(last=False)
+
+    def limpiar(self):
+        with self._lock:
+            self._expira_en.clear()
+
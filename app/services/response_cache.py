@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Caché en memoria (por worker) para respuestas de transacciones del Core Bancario.
+    - Expiración por TTL.
+    - Evicción LRU al superar el máximo de entradas o el máximo de bytes estimados.
+    - Contadores de hits / misses para monitoreo.
+    - Invalidación explícita por cliente (y opcionalmente por cuenta).
+
+    Las claves son tuplas cuyo segundo elemento es el cod_cliente, ej:
+    ('TRX001', '123') o ('TRX002', '123', '191-1234567-0-99').
+    Los valores almacenados se comparten entre requests: no deben modificarse.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.ttl = 60
+        self.max_entries = 10000
+        self.max_bytes = 32 * 1024 * 1024
+        self._datos = OrderedDict()  # clave -> (expira_en, tamaño, valor)
+        self._por_cliente = {}       # cod_cliente -> set(claves)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._reset_contadores()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('CORE_CACHE_ENABLED', True)
+        self.ttl = app.config.get('CORE_CACHE_TTL', 60)
+        self.max_entries = app.config.get('CORE_CACHE_MAX_ENTRIES', 10000)
+        self.max_bytes = app.config.get('CORE_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+        self.limpiar()
+        app.extensions['core_cache'] = self
+
+    def _reset_contadores(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _estimar_tamano(valor):
+        # Aproximación barata: tamaño serializado + overhead fijo por entrada
+        return len(json.dumps(valor, default=str)) + 200
+
+    def get(self, clave):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            expira_en, _, valor = entrada
+            if expira_en <= time.monotonic():
+                self._eliminar(clave)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            return valor
+
+    def set(self, clave, valor, ttl=None):
+        if not self.enabled or valor is None:
+            return
+        tamano = self._estimar_tamano(valor)
+        if tamano > self.max_bytes:
+            return
+        expira_en = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            if clave in self._datos:
+                self._eliminar(clave)
+            self._datos[clave] = (expira_en, tamano, valor)
+            self._bytes += tamano
+            self._por_cliente.setdefault(clave[1], set()).add(clave)
+            while self._datos and (len(self._datos) > self.max_entries or self._bytes > self.max_bytes):
+                clave_lru = next(iter(self._datos))
+                self._eliminar(clave_lru)
+                self.evictions += 1
+
+    def _eliminar(self, clave):
+        _, tamano, _ = self._datos.pop(clave)
+        self._bytes -= tamano
+        claves_cliente = self._por_cliente.get(clave[1])
+        if claves_cliente is not None:
+            claves_cliente.discard(clave)
+            if not claves_cliente:
+                del self._por_cliente[clave[1]]
+
+    def invalidar(self, cod_cliente, num_cuenta=None):
+        """
+        Invalida las entradas de un cliente. Si se indica `num_cuenta`,
+        solo las de esa cuenta (y la posición global, que incluye su saldo).
+        Retorna la cantidad de entradas eliminadas.
+        """
+        cod_cliente = str(cod_cliente)
+        with self._lock:
+            claves = list(self._por_cliente.get(cod_cliente, ()))
+            if num_cuenta is not None:
+                claves = [c for c in claves if len(c) < 3 or c[2] == num_cuenta]
+            for clave in claves:
+                self._eliminar(clave)
+            return len(claves)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._por_cliente.clear()
+            self._bytes = 0
+            self._reset_contadores()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "habilitado": self.enabled,
+                "entradas": len(self._datos),
+                "bytes_estimados": self._bytes,
+                "max_entradas": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_segundos": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
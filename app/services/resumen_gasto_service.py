@@ -0,0 +1,150 @@
+from app.models.core_banking import Cuenta, Movimiento, MccCore, ResumenGastoMensual, EstadoRollup
+from app.extensions import db
+from flask import current_app
+from sqlalchemy import event, func, case, cast, select, delete, literal_column, Date
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import date, datetime
+from decimal import Decimal
+
+# Clasificación por tamaño de gasto (TRX004): Pequeño (< 50), Mediano (50-200), Grande (> 200)
+UMBRAL_PEQUENO = 50
+UMBRAL_GRANDE = 200
+
+SIN_CATEGORIA = 0
+
+_eventos_registrados = False
+
+
+class ResumenGastoService:
+    """
+    Mantenimiento del rollup CORE_RESUMEN_GASTO_MENSUAL
+    (cod_cliente, num_cuenta, mes, categoría) -> débitos y conteo por tamaño.
+
+    El rollup solo se mantiene y se lee una vez construido por completo (`reconstruir()` sin
+    cliente, `flask analytics rebuild-rollup` o la migración), lo que deja su marca en
+    CORE_ROLLUP_ESTADO. Antes de eso un delta incremental dejaría filas parciales.
+    """
+
+    @staticmethod
+    def construido(connection=None) -> bool:
+        """True si el rollup tiene su marca de construcción completa."""
+        consulta = select(EstadoRollup.tabla).where(EstadoRollup.tabla == ResumenGastoMensual.__tablename__)
+        if connection is None:
+            return db.session.execute(consulta).first() is not None
+        return connection.execute(consulta).first() is not None
+
+    @staticmethod
+    def registrar_eventos():
+        """Mantiene el rollup al insertar movimientos vía ORM (se registra una sola vez por proceso)."""
+        global _eventos_registrados
+        if _eventos_registrados:
+            return
+        event.listen(Movimiento, 'after_insert', ResumenGastoService._after_insert_movimiento)
+        _eventos_registrados = True
+
+    @staticmethod
+    def _after_insert_movimiento(mapper, connection, mov):
+        cod_cliente = connection.execute(
+            select(Cuenta.cod_cliente).where(Cuenta.num_cuenta == mov.num_cuenta)
+        ).scalar()
+        if cod_cliente is None:
+            return
+
+        if ResumenGastoService.construido(connection):
+            id_categoria = SIN_CATEGORIA
+            if mov.cod_comercio:
+                id_categoria = connection.execute(
+                    select(MccCore.id_categoria).where(MccCore.cod_mcc == mov.cod_comercio)
+                ).scalar() or SIN_CATEGORIA
+
+            ResumenGastoService.acumular(connection, cod_cliente, mov.num_cuenta, mov.fecha_proceso,
+                                         id_categoria, mov.tipo_mov, Decimal(str(mov.monto)))
+
+        # La respuesta cacheada de TRX001/TRX002 ya no refleja este movimiento
+        from app.extensions import core_cache
+        core_cache.invalidar(cod_cliente, mov.num_cuenta)
+
+    @staticmethod
+    def acumular(connection, cod_cliente, num_cuenta, fecha, id_categoria, tipo_mov, monto):
+        """UPSERT del delta de un movimiento sobre la fila (cuenta, mes, categoría) del rollup."""
+        es_debito = tipo_mov == 'D'
+        valores = {
+            'NUM_CUENTA': num_cuenta,
+            'PERIODO': date(fecha.year, fecha.month, 1),
+            'ID_CATEGORIA': id_categoria,
+            'COD_CLIENTE': cod_cliente,
+            'TOTAL_DEBITO': monto if es_debito else Decimal('0'),
+            'QTY_PEQUENO': int(es_debito and monto < UMBRAL_PEQUENO),
+            'QTY_MEDIANO': int(es_debito and UMBRAL_PEQUENO <= monto <= UMBRAL_GRANDE),
+            'QTY_GRANDE': int(es_debito and monto > UMBRAL_GRANDE),
+            'QTY_MOVIMIENTOS': 1,
+            'UPDATED_AT': datetime.utcnow(),
+        }
+
+        tabla = ResumenGastoMensual.__table__
+        dialecto = postgresql if connection.dialect.name == 'postgresql' else sqlite
+        stmt = dialecto.insert(tabla).values(**valores)
+        acumulables = ('TOTAL_DEBITO', 'QTY_PEQUENO', 'QTY_MEDIANO', 'QTY_GRANDE', 'QTY_MOVIMIENTOS')
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['NUM_CUENTA', 'PERIODO', 'ID_CATEGORIA'],
+            set_={
+                **{col: tabla.c[col] + stmt.excluded[col] for col in acumulables},
+                'UPDATED_AT': stmt.excluded.UPDATED_AT,
+            }
+        )
+        connection.execute(stmt)
+
+    @staticmethod
+    def _periodo_sql(expr):
+        if db.session.get_bind().dialect.name == 'sqlite':
+            return func.date(expr, 'start of month', type_=Date)
+        return cast(func.date_trunc(literal_column("'month'"), expr), Date)
+
+    @staticmethod
+    def reconstruir(cod_cliente: int = None):
+        """
+        Recalcula el rollup desde CORE_MOVIMIENTOS (backfills, cargas masivas, correcciones).
+        Si se indica `cod_cliente`, solo reconstruye las filas de ese cliente; la reconstrucción
+        completa además marca el rollup como construido (se empieza a mantener y a leer).
+        Retorna la cantidad de filas generadas.
+        """
+        es_debito = Movimiento.tipo_mov == 'D'
+        periodo = ResumenGastoService._periodo_sql(Movimiento.fecha_proceso)
+        id_categoria = func.coalesce(MccCore.id_categoria, SIN_CATEGORIA)
+
+        origen = select(
+            Movimiento.num_cuenta,
+            periodo,
+            id_categoria,
+            Cuenta.cod_cliente,
+            func.sum(case((es_debito, Movimiento.monto), else_=0)),
+            func.sum(case((es_debito & (Movimiento.monto < UMBRAL_PEQUENO), 1), else_=0)),
+            func.sum(case((es_debito & Movimiento.monto.between(UMBRAL_PEQUENO, UMBRAL_GRANDE), 1), else_=0)),
+            func.sum(case((es_debito & (Movimiento.monto > UMBRAL_GRANDE), 1), else_=0)),
+            func.count(),
+            func.now(),
+        ).join(
+            Cuenta, Movimiento.num_cuenta == Cuenta.num_cuenta
+        ).outerjoin(
+            MccCore, Movimiento.cod_comercio == MccCore.cod_mcc
+        ).group_by(
+            Movimiento.num_cuenta, periodo, id_categoria, Cuenta.cod_cliente
+        )
+
+        borrar = delete(ResumenGastoMensual)
+        if cod_cliente is not None:
+            origen = origen.where(Cuenta.cod_cliente == cod_cliente)
+            borrar = borrar.where(ResumenGastoMensual.cod_cliente == cod_cliente)
+
+        tabla = ResumenGastoMensual.__table__
+        db.session.execute(borrar)
+        resultado = db.session.execute(tabla.insert().from_select(
+            ['NUM_CUENTA', 'PERIODO', 'ID_CATEGORIA', 'COD_CLIENTE', 'TOTAL_DEBITO',
+             'QTY_PEQUENO', 'QTY_MEDIANO', 'QTY_GRANDE', 'QTY_MOVIMIENTOS', 'UPDATED_AT'],
+            origen
+        ))
+        if cod_cliente is None:
+            db.session.merge(EstadoRollup(tabla=tabla.name, construido_at=datetime.utcnow()))
+        db.session.commit()
+        current_app.logger.info(f"Rollup CORE_RESUMEN_GASTO_MENSUAL reconstruido ({resultado.rowcount} filas)")
+        return resultado.rowcount
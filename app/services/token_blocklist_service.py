@@ -0,0 +1,80 @@
+from app.extensions import db
+from app.models.mobile_app import TokenBlocklist
+from flask import current_app
+from sqlalchemy import or_, and_, func, text
+from datetime import datetime, timedelta
+import time
+
+
+class TokenBlocklistService:
+    """
+    Mantenimiento de la tabla TOKEN_BLOCKLIST.
+    Una fila solo es útil mientras el token revocado siga vigente; después se puede borrar.
+    """
+
+    @staticmethod
+    def _filtro_expirados(ahora=None):
+        ahora = ahora or datetime.utcnow()
+        expires = current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES', 3600 * 24)
+        ttl = expires if isinstance(expires, timedelta) else timedelta(seconds=expires)
+        return or_(
+            TokenBlocklist.expires_at < ahora,
+            # Filas anteriores a expires_at: el token expiró como máximo created_at + TTL
+            and_(TokenBlocklist.expires_at.is_(None), TokenBlocklist.created_at < ahora - ttl)
+        )
+
+    @staticmethod
+    def purgar_expirados(batch_size: int = 1000, max_batches: int = None, pausa: float = 0.0):
+        """
+        Elimina las filas de tokens ya expirados en lotes acotados (un COMMIT por lote),
+        para no bloquear la tabla ni generar transacciones largas.
+        Retorna el total de filas eliminadas.
+        """
+        eliminadas = 0
+        lotes = 0
+        filtro = TokenBlocklistService._filtro_expirados()
+
+        while max_batches is None or lotes < max_batches:
+            ids = [fila.id for fila in db.session.query(TokenBlocklist.id).filter(filtro).limit(batch_size).all()]
+            if not ids:
+                break
+
+            db.session.query(TokenBlocklist).filter(TokenBlocklist.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+
+            eliminadas += len(ids)
+            lotes += 1
+            current_app.logger.info(f"TOKEN_BLOCKLIST: lote {lotes} eliminado ({len(ids)} filas)")
+
+            if len(ids) < batch_size:
+                break
+            if pausa:
+                time.sleep(pausa)
+
+        return eliminadas
+
+    @staticmethod
+    def estadisticas():
+        """
+        Métricas de tamaño de la tabla: filas totales, filas expiradas (compactables)
+        y, en PostgreSQL, el tamaño en disco de la tabla con sus índices.
+        """
+        total = db.session.query(func.count(TokenBlocklist.id)).scalar()
+        expiradas = db.session.query(func.count(TokenBlocklist.id)).filter(
+            TokenBlocklistService._filtro_expirados()
+        ).scalar()
+        mas_antigua = db.session.query(func.min(TokenBlocklist.created_at)).scalar()
+
+        tamano_bytes = None
+        if db.engine.dialect.name == 'postgresql':
+            tamano_bytes = db.session.execute(
+                text("SELECT pg_total_relation_size('\"TOKEN_BLOCKLIST\"')")
+            ).scalar()
+
+        return {
+            "filas_totales": total,
+            "filas_expiradas": expiradas,
+            "filas_vigentes": total - expiradas,
+            "fila_mas_antigua_utc": mas_antigua.isoformat() if mas_antigua else None,
+            "tamano_bytes": tamano_bytes,
+        }
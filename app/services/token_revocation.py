@@ -0,0 +1,111 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class RevokedTokenFilter:
+    """
+    Conjunto en memoria (por worker) de JTIs revocados, con la expiración de cada token.
+
+    Evita una consulta a TOKEN_BLOCKLIST en cada request autenticado: las búsquedas se
+    responden desde memoria y cada `sync_interval` segundos se traen de la BD las
+    revocaciones nuevas (ej. logouts hechos en otros workers). Así, un logout tiene
+    efecto en todos los workers con un retraso máximo de `sync_interval`.
+    Los JTIs se descartan de memoria cuando su token ya expiró.
+    """
+
+    def __init__(self, app=None):
+        self.sync_interval = 5
+        self.sync_overlap = 30
+        self.token_ttl = 3600 * 24
+        self._revocados = {}       # jti -> timestamp (epoch) de expiración del token
+        self._watermark = None     # created_at (UTC) de la última sincronización
+        self._proxima_sync = 0.0
+        self._lock = threading.Lock()
+        self.syncs = 0
+        self.sync_errors = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.sync_interval = app.config.get('JWT_BLOCKLIST_SYNC_SECONDS', 5)
+        self.sync_overlap = app.config.get('JWT_BLOCKLIST_SYNC_OVERLAP_SECONDS', 30)
+        expires = app.config.get('JWT_ACCESS_TOKEN_EXPIRES', 3600 * 24)
+        self.token_ttl = expires.total_seconds() if isinstance(expires, timedelta) else expires
+        self.reset()
+        app.extensions['revoked_tokens'] = self
+
+    def reset(self):
+        with self._lock:
+            self._revocados = {}
+            self._watermark = None
+            self._proxima_sync = 0.0
+
+    def registrar(self, jti, exp=None):
+        """Registra localmente un JTI revocado (ej. en el logout de este worker)."""
+        if exp is None:
+            exp = time.time() + self.token_ttl
+        with self._lock:
+            self._revocados[jti] = exp
+
+    def esta_revocado(self, jti):
+        if time.monotonic() >= self._proxima_sync:
+            self.sincronizar()
+        return jti in self._revocados
+
+    def sincronizar(self):
+        """
+        Trae de TOKEN_BLOCKLIST las revocaciones creadas desde la última sincronización
+        (con un margen `sync_overlap` para no perder inserts confirmados con retraso)
+        y purga los tokens ya expirados.
+        """
+        from app.extensions import db
+        from app.models.mobile_app import TokenBlocklist
+
+        with self._lock:
+            if time.monotonic() < self._proxima_sync:
+                return
+            self._proxima_sync = time.monotonic() + self.sync_interval
+            watermark = self._watermark
+
+        ahora = datetime.utcnow()
+        if watermark is None:
+            # Carga inicial: solo pueden seguir vigentes los tokens revocados dentro del TTL
+            desde = ahora - timedelta(seconds=self.token_ttl)
+        else:
+            desde = watermark - timedelta(seconds=self.sync_overlap)
+
+        try:
+            filas = db.session.query(TokenBlocklist.jti, TokenBlocklist.created_at, TokenBlocklist.expires_at).filter(
+                TokenBlocklist.created_at >= desde
+            ).all()
+        except Exception:
+            # Sin sincronización no podemos garantizar el retraso máximo: reintentamos en el próximo request
+            with self._lock:
+                self.sync_errors += 1
+                self._proxima_sync = 0.0
+            raise
+
+        epoch = datetime(1970, 1, 1)
+        ahora_ts = time.time()
+        with self._lock:
+            for jti, created_at, expires_at in filas:
+                if expires_at is not None:
+                    exp = (expires_at - epoch).total_seconds()
+                else:
+                    # Filas antiguas sin expires_at: cota superior (el token se emitió antes del logout)
+                    exp = (created_at - epoch).total_seconds() + self.token_ttl
+                self._revocados.setdefault(jti, exp)
+            self._revocados = {j: e for j, e in self._revocados.items() if e > ahora_ts}
+            self._watermark = ahora
+            self.syncs += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "jtis_en_memoria": len(self._revocados),
+                "intervalo_sync_segundos": self.sync_interval,
+                "ultima_sync_utc": self._watermark.isoformat() if self._watermark else None,
+                "syncs": self.syncs,
+                "errores_sync": self.sync_errors,
+            }
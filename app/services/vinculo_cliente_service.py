@@ -0,0 +1,80 @@
+from app.extensions import db, registro_negativo
+from app.services.core_banking_service import CoreBankingService
+from app.services.mainframe_client import MainframeNoDisponibleError
+from flask import current_app
+from datetime import datetime, timedelta
+
+
+class VinculoClienteService:
+    """
+    Vínculo entre el usuario de la App (USUARIOS) y su COD_CLIENTE en el Core Bancario.
+
+    El vínculo se guarda en el usuario al registrarse y se reutiliza en cada login;
+    solo se vuelve a consultar el Core (transacción CLIENTE) cuando vence la ventana
+    AUTH_VINCULO_REVALIDAR_SECONDS o cuando se pide una re-sincronización explícita.
+    """
+
+    @staticmethod
+    def _como_claim(cod_cliente):
+        # Se guarda como texto. Solo el Core simulado (CORE_CLIENTES, claves enteras) se convierte;
+        # el código del Mainframe real se usa tal cual (ej. "00012345" conserva los ceros)
+        if CoreBankingService._modo_simulacion() and cod_cliente.isdigit():
+            return int(cod_cliente)
+        return cod_cliente
+
+    @staticmethod
+    def vinculo_vigente(usuario, ahora=None):
+        if not usuario.cod_cliente_core or not usuario.vinculo_validado_at:
+            return False
+        ventana = timedelta(seconds=current_app.config.get('AUTH_VINCULO_REVALIDAR_SECONDS', 3600 * 24))
+        return (ahora or datetime.utcnow()) - usuario.vinculo_validado_at < ventana
+
+    @staticmethod
+    def vincular(usuario, cliente_core):
+        """Guarda en el usuario el COD_CLIENTE devuelto por el Core (sin hacer commit)."""
+        usuario.cod_cliente_core = str(cliente_core['cod_cliente'])
+        # Una respuesta diferida (STALE) no cuenta como validación: se reintenta en el próximo login
+        if not cliente_core.get('STALE'):
+            usuario.vinculo_validado_at = datetime.utcnow()
+
+    @staticmethod
+    def obtener_cod_cliente(usuario, forzar=False):
+        """
+        Retorna el COD_CLIENTE del usuario. Usa el vínculo guardado si sigue vigente;
+        si no (o si `forzar`), lo revalida contra el Core y lo actualiza.
+        Retorna None si el Core no reconoce el DNI. Si el Core no está disponible se usa el
+        vínculo guardado aunque esté vencido (se revalida en el próximo login); con `forzar`,
+        o sin vínculo guardado, se propaga MainframeNoDisponibleError.
+        """
+        if not forzar and VinculoClienteService.vinculo_vigente(usuario):
+            return VinculoClienteService._como_claim(usuario.cod_cliente_core)
+
+        try:
+            cliente_core = CoreBankingService.obtener_cliente(usuario.dni_vinculado)
+        except MainframeNoDisponibleError:
+            if forzar or not usuario.cod_cliente_core:
+                raise
+            current_app.logger.warning("Core no disponible: se usa el vínculo guardado sin revalidar")
+            return VinculoClienteService._como_claim(usuario.cod_cliente_core)
+        if not cliente_core:
+            return None
+
+        VinculoClienteService.vincular(usuario, cliente_core)
+        db.session.commit()
+        return VinculoClienteService._como_claim(usuario.cod_cliente_core)
+
+    @staticmethod
+    def buscar_cliente_para_registro(dni):
+        """
+        Consulta el Core para un registro nuevo. Los DNIs que no son clientes se
+        recuerdan durante AUTH_REGISTRO_NEGATIVO_TTL (`registro_negativo`),
+        para que los reintentos no lleguen al Mainframe. Si el Core no está disponible
+        se propaga MainframeNoDisponibleError y no se guarda nada en la caché negativa.
+        """
+        if registro_negativo.contiene(dni):
+            return None
+
+        cliente_core = CoreBankingService.obtener_cliente(dni)
+        if not cliente_core:
+            registro_negativo.agregar(dni)
+        return cliente_core
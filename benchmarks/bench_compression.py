@@ -0,0 +1,192 @@
+"""
+Benchmark de compresión de respuestas: CPU gastada vs bytes ahorrados por endpoint.
+
+1. Siembra una base SQLite temporal (o --database-url) con GeneradorDatosCore, igual que
+   bench_endpoints.py, y registra un usuario de cada perfil (intensivo / liviano).
+2. Obtiene el cuerpo sin comprimir (Accept-Encoding: identity) de TRX001-TRX004, del dashboard
+   y de la exportación NDJSON / CSV.
+3. Comprime cada cuerpo con gzip (--gzip-levels) y brotli (--brotli-qualities) y reporta bytes,
+   ratio y milisegundos de CPU por respuesta (mediana de --repeat corridas). La exportación se
+   comprime por partes (una por lote, con flush en cada una) como lo hace CompresionRespuestas.
+4. Verifica de punta a punta con el test client (COMPRESSION_ENABLED) que la respuesta negociada
+   se descomprime al mismo cuerpo y que los cuerpos bajo COMPRESSION_MIN_SIZE no se comprimen.
+
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --clients 500 --movements-per-account 2000 --gzip-levels 1 6 9
+
+Sirve para elegir COMPRESSION_MIN_SIZE y los niveles: en respuestas chicas el ahorro son pocos
+cientos de bytes y no compensa la CPU; el historial (TRX003, dashboard, exportación) comprime 4-7x.
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bench_endpoints import sembrar, preparar_usuarios
+
+from app import create_app
+from app.config import Config
+from app.extensions import compresion
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# escenario -> path con {num_cuenta}
+ESCENARIOS = {
+    'trx001': '/api/v1/products',
+    'trx002': '/api/v1/accounts/{num_cuenta}/summary',
+    'trx003': '/api/v1/accounts/{num_cuenta}/details?category=Alimentaci%C3%B3n&page_size=50',
+    'trx004': '/api/v1/financial-personality',
+    'dashboard': '/api/v1/dashboard',
+    'export-ndjson': '/api/v1/accounts/{num_cuenta}/export?format=ndjson',
+    'export-csv': '/api/v1/accounts/{num_cuenta}/export?format=csv',
+}
+
+
+def crear_app(database_url, min_size):
+    config = type('BenchCompressionConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'USE_MOCK_MAINFRAME': True,
+        'CORE_CACHE_ENABLED': False,
+        'ETAGS_ENABLED': False,
+        'MONITORING_ENABLED': False,
+        'SWAGGER_MODE': 'off',
+        'COMPRESSION_ENABLED': True,
+        'COMPRESSION_MIN_SIZE': min_size,
+    })
+    return create_app(config)
+
+
+def compresores(gzip_levels, brotli_qualities):
+    """[(nombre, comprimir(bytes) -> bytes, comprimir_partes([bytes]) -> bytes)]"""
+    casos = []
+    for nivel in gzip_levels:
+        def partes_gzip(partes, nivel=nivel):
+            compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+            salida = [compresor.compress(p) + compresor.flush(zlib.Z_SYNC_FLUSH) for p in partes]
+            return b''.join(salida) + compresor.flush()
+        casos.append((f'gzip-{nivel}', lambda d, nivel=nivel: gzip.compress(d, compresslevel=nivel, mtime=0),
+                      partes_gzip))
+    if brotli is not None:
+        for calidad in brotli_qualities:
+            def partes_br(partes, calidad=calidad):
+                compresor = brotli.Compressor(quality=calidad)
+                salida = [compresor.process(p) + compresor.flush() for p in partes]
+                return b''.join(salida) + compresor.finish()
+            casos.append((f'br-{calidad}', lambda d, calidad=calidad: brotli.compress(d, quality=calidad),
+                          partes_br))
+    return casos
+
+
+def obtener(cliente, path, token, encoding):
+    respuesta = cliente.get(path, headers={'Authorization': f'Bearer {token}', 'Accept-Encoding': encoding})
+    if respuesta.status_code != 200:
+        sys.exit(f"{path}: {respuesta.status_code} {respuesta.get_data(as_text=True)[:200]}")
+    return respuesta
+
+
+def partes_de(respuesta):
+    """Partes del cuerpo tal como las entrega la vista (una por lote en la exportación)."""
+    if respuesta.is_streamed:
+        return [p if isinstance(p, bytes) else p.encode('utf-8') for p in respuesta.response]
+    return [respuesta.get_data()]
+
+
+def descomprimir(encoding, datos):
+    if encoding == 'br':
+        return brotli.decompress(datos)
+    return gzip.decompress(datos)
+
+
+def cpu_ms(funcion, repeat):
+    tiempos = []
+    for _ in range(repeat):
+        inicio = time.process_time()
+        funcion()
+        tiempos.append(time.process_time() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def verificar(cliente, path, token, identidad, min_size):
+    """Negociación de punta a punta: el cuerpo negociado se descomprime al mismo contenido."""
+    errores = []
+    for encoding in ('gzip', 'br') if brotli is not None else ('gzip',):
+        respuesta = obtener(cliente, path, token, f'{encoding};q=1, identity;q=0.5')
+        datos = respuesta.get_data()
+        esperado = encoding if (respuesta.is_streamed or len(identidad) >= min_size) else None
+        if respuesta.headers.get('Content-Encoding') != esperado:
+            errores.append(f"{encoding}: Content-Encoding {respuesta.headers.get('Content-Encoding')} (esperado {esperado})")
+        elif esperado and descomprimir(encoding, datos) != identidad:
+            errores.append(f"{encoding}: el cuerpo descomprimido no coincide")
+    return errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=None, help='Por defecto, SQLite temporal')
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--movements-per-account', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scenarios', nargs='+', default=list(ESCENARIOS), choices=list(ESCENARIOS))
+    parser.add_argument('--gzip-levels', type=int, nargs='+', default=[1, 6])
+    parser.add_argument('--brotli-qualities', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--min-size', type=int, default=Config.COMPRESSION_MIN_SIZE,
+                        help='COMPRESSION_MIN_SIZE para la verificación de punta a punta')
+    parser.add_argument('--repeat', type=int, default=20, help='Corridas por medición (se reporta la mediana)')
+    args = parser.parse_args()
+
+    from app.services.generador_datos import GeneradorDatosCore
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_compression_'), 'bench.db')}"
+    app = crear_app(database_url, args.min_size)
+    generador = GeneradorDatosCore(clientes=args.clients, movimientos_por_cuenta=args.movements_per_account,
+                                   semilla=args.seed)
+    sembrar(app, generador)
+    usuarios = preparar_usuarios(app, generador, 1)
+    casos = compresores(args.gzip_levels, args.brotli_qualities)
+    if brotli is None:
+        print("brotli no está instalado: solo se mide gzip")
+
+    cliente = app.test_client()
+    print(f"\n{'escenario':<14} {'perfil':<10} {'bytes':>9}  " + '  '.join(f"{n:>22}" for n, _, _ in casos))
+    print(f"{'':<14} {'':<10} {'':>9}  " + '  '.join(f"{'bytes  ratio   CPU ms':>22}" for _ in casos))
+    fallas = []
+    for escenario in args.scenarios:
+        for perfil, lista in usuarios.items():
+            usuario = lista[0]
+            path = ESCENARIOS[escenario].format(num_cuenta=usuario['num_cuenta'])
+            partes = partes_de(obtener(cliente, path, usuario['token'], 'identity'))
+            identidad = b''.join(partes)
+            streaming = len(partes) > 1 or escenario.startswith('export')
+
+            columnas = []
+            for nombre, comprimir, comprimir_partes in casos:
+                funcion = (lambda: comprimir_partes(partes)) if streaming else (lambda: comprimir(identidad))
+                comprimido = funcion()
+                ms = cpu_ms(funcion, args.repeat)
+                columnas.append(f"{len(comprimido):>7} {len(identidad) / len(comprimido):>5.1f}x {ms:>7.3f}")
+            print(f"{escenario:<14} {perfil:<10} {len(identidad):>9}  " + '  '.join(f"{c:>22}" for c in columnas))
+
+            fallas += [f"{escenario}/{perfil} {e}" for e in
+                       verificar(cliente, path, usuario['token'], identidad, args.min_size)]
+
+    stats = compresion.stats()
+    print(f"\nVerificación de punta a punta: {'OK' if not fallas else 'FALLAS'} "
+          f"(respuestas comprimidas {stats['respuestas_comprimidas']})")
+    for falla in fallas:
+        print(f"  - {falla}")
+    if fallas:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+"""
+Benchmark de endpoints (auth, TRX001-TRX004 y dashboard) sobre datos sintéticos reproducibles.
+
+1. Base de datos: --database-url (por defecto, una SQLite temporal). Si CORE_CLIENTES está
+   vacía se siembra con GeneradorDatosCore + BulkLoadService (--clients, --movements-per-account,
+   --seed): mismos parámetros y semilla = mismos datos, para comparar corridas.
+2. Registra usuarios de la App para --users clientes intensivos (historial largo) y --users livianos.
+3. Cada escenario se ejecuta por perfil con --concurrency hilos durante --seconds:
+   - transporte `client`: test client de Flask (en proceso, sin red)
+   - transporte `http`: servidor werkzeug multihilo local, o --url para un servidor externo
+     (ej. gunicorn -c gunicorn.conf.py apuntando a la misma base de datos)
+4. Reporta req/s, latencia p50/p95/p99, errores y consultas SQL por request (solo en proceso),
+   y guarda el resultado en benchmarks/results/ (JSON). Con --compare se muestra la variación
+   contra una corrida anterior.
+
+    python benchmarks/bench_endpoints.py --clients 2000 --transports client http --seconds 5
+    python benchmarks/bench_endpoints.py --compare benchmarks/results/endpoints_20250301-101500.json
+
+La caché de respuestas (CORE_CACHE_ENABLED) se desactiva por defecto para medir el camino a la BD; --cache la activa.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+
+PASSWORD_BENCH = 'bench-password'
+
+# escenario -> (método, path con {num_cuenta}, ¿credenciales en el cuerpo? (si no, token Bearer))
+ESCENARIOS = {
+    'login': ('POST', '/auth/login', True),
+    'trx001': ('GET', '/api/v1/products', False),
+    'trx002': ('GET', '/api/v1/accounts/{num_cuenta}/summary', False),
+    'trx003': ('GET', '/api/v1/accounts/{num_cuenta}/details?category=Alimentaci%C3%B3n', False),
+    'trx004': ('GET', '/api/v1/financial-personality', False),
+    'dashboard': ('GET', '/api/v1/dashboard', False),
+}
+
+
+def crear_app(database_url, cache):
+    config = type('BenchEndpointsConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'USE_MOCK_MAINFRAME': True,
+        'CORE_CACHE_ENABLED': cache,
+        'MONITORING_ENABLED': False,
+        'SWAGGER_MODE': 'off',
+    })
+    return create_app(config)
+
+
+def sembrar(app, generador):
+    from app.models.core_banking import Cliente
+    from app.services.bulk_load_service import BulkLoadService, TABLAS_CORE
+
+    with app.app_context():
+        if Cliente.query.first() is not None:
+            print("La base ya tiene datos: no se siembra (se asume la misma semilla)")
+            return
+        inicio = time.perf_counter()
+        for tabla in TABLAS_CORE:
+            BulkLoadService.cargar(tabla, generador.filas(tabla))
+        BulkLoadService.despues_de_cargar(TABLAS_CORE)
+        print(f"Datos sintéticos cargados en {time.perf_counter() - inicio:.1f}s")
+
+
+def preparar_usuarios(app, generador, cantidad):
+    """Registra (si hace falta) y hace login de los usuarios de cada perfil."""
+    from app.models.core_banking import Cuenta
+
+    cliente = app.test_client()
+    usuarios = {}
+    for perfil, codigos in generador.clientes_por_perfil(cantidad).items():
+        usuarios[perfil] = []
+        for cod_cliente in codigos:
+            dni = f"{40000000 + cod_cliente:08d}"
+            cliente.post('/auth/register', json={'dni': dni, 'password': PASSWORD_BENCH})
+            respuesta = cliente.post('/auth/login', json={'dni': dni, 'password': PASSWORD_BENCH})
+            if respuesta.status_code != 200:
+                sys.exit(f"Login fallido para {dni}: {respuesta.status_code} {respuesta.get_data(as_text=True)}")
+            with app.app_context():
+                num_cuenta = Cuenta.query.filter_by(cod_cliente=cod_cliente).order_by(Cuenta.num_cuenta).first().num_cuenta
+            usuarios[perfil].append({
+                'dni': dni,
+                'token': respuesta.get_json()['access_token'],
+                'num_cuenta': num_cuenta,
+            })
+    return usuarios
+
+
+class ContadorConsultas:
+    """Cuenta las sentencias SQL ejecutadas por el engine (todas las conexiones del proceso)."""
+
+    def __init__(self, engine):
+        self.total = 0
+        self._lock = threading.Lock()
+        from sqlalchemy import event
+        event.listen(engine, 'before_cursor_execute', self._contar)
+
+    def _contar(self, *args):
+        with self._lock:
+            self.total += 1
+
+
+def transporte_client(app):
+    locales = threading.local()
+
+    def enviar(metodo, path, cabeceras, cuerpo):
+        if not hasattr(locales, 'cliente'):
+            locales.cliente = app.test_client()
+        respuesta = locales.cliente.open(path, method=metodo, headers=cabeceras, json=cuerpo)
+        respuesta.get_data()
+        return respuesta.status_code
+    return enviar
+
+
+def transporte_http(base):
+    locales = threading.local()
+
+    def enviar(metodo, path, cabeceras, cuerpo):
+        if not hasattr(locales, 'sesion'):
+            locales.sesion = requests.Session()
+        try:
+            return locales.sesion.request(metodo, base + path, headers=cabeceras, json=cuerpo, timeout=60).status_code
+        except requests.RequestException:
+            return None
+    return enviar
+
+
+def medir(enviar, escenario, usuarios, concurrency, seconds):
+    metodo, plantilla, con_cuerpo = ESCENARIOS[escenario]
+    fin = time.perf_counter() + seconds
+    resultados = []
+
+    def trabajador(indice):
+        latencias, errores = [], 0
+        usuario = usuarios[indice % len(usuarios)]
+        path = plantilla.format(num_cuenta=usuario['num_cuenta'])
+        cabeceras = {} if con_cuerpo else {'Authorization': f"Bearer {usuario['token']}"}
+        cuerpo = {'dni': usuario['dni'], 'password': PASSWORD_BENCH} if con_cuerpo else None
+        while time.perf_counter() < fin:
+            t0 = time.perf_counter()
+            status = enviar(metodo, path, cabeceras, cuerpo)
+            latencias.append((time.perf_counter() - t0) * 1000)
+            errores += status != 200
+        resultados.append((latencias, errores))
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=trabajador, args=(i,)) for i in range(concurrency)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+    latencias = [l for propias, _ in resultados for l in propias]
+    errores = sum(e for _, e in resultados)
+    return duracion, latencias, errores
+
+
+def percentiles(latencias):
+    if len(latencias) < 2:
+        valor = latencias[0] if latencias else 0.0
+        return valor, valor, valor
+    p = statistics.quantiles(latencias, n=100)
+    return p[49], p[94], p[98]
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, anterior, ruta_anterior):
+    previos = {(r['transporte'], r['escenario'], r['perfil']): r for r in anterior['resultados']}
+    print(f"\nComparación contra {ruta_anterior} (commit {anterior.get('commit')}):")
+    print(f"{'transporte':10s} {'escenario':10s} {'perfil':10s} {'req/s':>9s} {'Δ req/s':>9s} {'p95 ms':>9s} {'Δ p95':>9s}")
+    for r in resultados:
+        previo = previos.get((r['transporte'], r['escenario'], r['perfil']))
+        if not previo:
+            continue
+        delta_rps = (r['rps'] / previo['rps'] - 1) * 100 if previo['rps'] else 0.0
+        delta_p95 = (r['p95_ms'] / previo['p95_ms'] - 1) * 100 if previo['p95_ms'] else 0.0
+        print(f"{r['transporte']:10s} {r['escenario']:10s} {r['perfil']:10s} {r['rps']:9.1f} {delta_rps:+8.1f}% "
+              f"{r['p95_ms']:9.1f} {delta_p95:+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=None, help='Por defecto, SQLite temporal')
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--movements-per-account', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--users', type=int, default=5, help='Usuarios de la App por perfil')
+    parser.add_argument('--scenarios', nargs='+', default=list(ESCENARIOS), choices=list(ESCENARIOS))
+    parser.add_argument('--profiles', nargs='+', default=['intensivo', 'liviano'], choices=['intensivo', 'liviano'])
+    parser.add_argument('--transports', nargs='+', default=['client'], choices=['client', 'http'])
+    parser.add_argument('--url', default=None, help='Servidor externo para el transporte http')
+    parser.add_argument('--port', type=int, default=8777, help='Puerto del servidor local (transporte http)')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duración de cada escenario')
+    parser.add_argument('--cache', action='store_true', help='Activar la caché de respuestas TRX001/TRX002')
+    parser.add_argument('--output', default=None, help='Por defecto, benchmarks/results/endpoints_<fecha>.json')
+    parser.add_argument('--compare', default=None, help='JSON de una corrida anterior')
+    args = parser.parse_args()
+
+    from app.services.generador_datos import GeneradorDatosCore
+
+    anterior = None
+    if args.compare:
+        # Se lee antes de correr: --output podría sobrescribir el mismo archivo
+        with open(args.compare, encoding='utf-8') as archivo:
+            anterior = json.load(archivo)
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_endpoints_'), 'bench.db')}"
+    app = crear_app(database_url, args.cache)
+    generador = GeneradorDatosCore(clientes=args.clients, movimientos_por_cuenta=args.movements_per_account,
+                                   semilla=args.seed)
+    sembrar(app, generador)
+    usuarios = preparar_usuarios(app, generador, args.users)
+    with app.app_context():
+        contador = ContadorConsultas(db.engine)
+
+    servidor = None
+    resultados = []
+    try:
+        for transporte in args.transports:
+            if transporte == 'client':
+                enviar = transporte_client(app)
+            else:
+                base = args.url
+                if base is None:
+                    from werkzeug.serving import make_server
+                    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+                    servidor = make_server('127.0.0.1', args.port, app, threaded=True)
+                    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+                    base = f'http://127.0.0.1:{args.port}'
+                enviar = transporte_http(base.rstrip('/'))
+            en_proceso = transporte == 'client' or args.url is None
+
+            for escenario in args.scenarios:
+                for perfil in args.profiles:
+                    consultas_antes = contador.total
+                    duracion, latencias, errores = medir(enviar, escenario, usuarios[perfil],
+                                                         args.concurrency, args.seconds)
+                    p50, p95, p99 = percentiles(latencias)
+                    total = len(latencias)
+                    resultados.append({
+                        'transporte': transporte,
+                        'escenario': escenario,
+                        'perfil': perfil,
+                        'requests': total,
+                        'errores': errores,
+                        'rps': (total - errores) / duracion,
+                        'p50_ms': p50,
+                        'p95_ms': p95,
+                        'p99_ms': p99,
+                        'consultas_por_request': (contador.total - consultas_antes) / total if en_proceso and total else None,
+                    })
+                    r = resultados[-1]
+                    consultas = f"{r['consultas_por_request']:.1f}" if r['consultas_por_request'] is not None else '-'
+                    print(f"{transporte:8s} {escenario:10s} {perfil:10s} {r['rps']:8.1f} req/s  p50 {p50:7.1f}  "
+                          f"p95 {p95:7.1f}  p99 {p99:7.1f} ms  errores {errores}  consultas/req {consultas}")
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+
+    salida = args.output or os.path.join(RAIZ, 'benchmarks', 'results',
+                                         f"endpoints_{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(salida), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        json.dump({
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit_actual(),
+            'python': platform.python_version(),
+            'parametros': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+            'resultados': resultados,
+        }, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {salida}")
+
+    if anterior is not None:
+        comparar(resultados, anterior, args.compare)
+
+
+if __name__ == '__main__':
+    main()
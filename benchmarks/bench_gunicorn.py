@@ -0,0 +1,192 @@
+"""
+Benchmark de servicio con gunicorn (gunicorn.conf.py) por clase de worker.
+
+1. Levanta un gateway CICS simulado (HTTP local) que responde TRX001 / CLIENTE tras `--latency` s.
+2. Siembra una BD SQLite con un cliente y su usuario de la App.
+3. Por cada clase de worker arranca gunicorn en modo Mainframe real (USE_MOCK_MAINFRAME=False)
+   y mide, con `--concurrency` clientes durante `--seconds`, GET /api/v1/products
+   (caché de respuestas desactivada para que cada request llegue al gateway).
+
+    python benchmarks/bench_gunicorn.py --worker-classes gthread gevent --latency 0.2 --concurrency 64
+
+Para gevent: `pip install gevent psycogreen`.
+"""
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+DNI_BENCH = 'BENCHGUNI01'
+PASSWORD_BENCH = 'bench-password'
+
+RESPUESTAS_GATEWAY = {
+    'trx001': {"COD-RETORNO": "00",
+               "TABLA-CUENTAS": [{"CTA-NUMERO": "BENCH-0001", "CTA-MONEDA": "PEN", "CTA-SALDO": 1500.25}],
+               "TABLA-TARJETAS": []},
+    'cliente': {"cod_cliente": 1, "nombres": "Bench", "apellidos": "Gunicorn"},
+}
+
+
+def iniciar_gateway(puerto, latencia):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(latencia)
+            cuerpo = json.dumps(RESPUESTAS_GATEWAY.get(self.path.rsplit('/', 1)[-1], {"COD-RETORNO": "00"})).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', puerto), Handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def sembrar(database_url):
+    os.environ['DATABASE_URL'] = database_url
+    from app import create_app
+    from app.config import Config
+    from app.extensions import db
+    from app.models.core_banking import Cliente
+    from app.models.mobile_app import Usuario
+
+    app = create_app(type('BenchSeedConfig', (Config,), {'SQLALCHEMY_DATABASE_URI': database_url}))
+    with app.app_context():
+        if not Cliente.query.filter_by(dni_ruc=DNI_BENCH).first():
+            cliente = Cliente(dni_ruc=DNI_BENCH, nombres='Bench', apellidos='Gunicorn', fecha_nac=date(1990, 1, 1))
+            db.session.add(cliente)
+            db.session.flush()
+            usuario = Usuario(user_uuid=str(cliente.cod_cliente), dni_vinculado=DNI_BENCH)
+            usuario.set_password(PASSWORD_BENCH)
+            db.session.add(usuario)
+            db.session.commit()
+
+
+def esperar_servidor(url, proceso, limite=30):
+    fin = time.time() + limite
+    while time.time() < fin:
+        if proceso.poll() is not None:
+            raise RuntimeError("gunicorn terminó durante el arranque")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn no respondió a tiempo")
+
+
+def medir(base, token, concurrency, seconds):
+    fin = time.perf_counter() + seconds
+    cabeceras = {'Authorization': f'Bearer {token}'}
+
+    def cliente(_):
+        sesion = requests.Session()
+        latencias, errores = [], 0
+        while time.perf_counter() < fin:
+            t0 = time.perf_counter()
+            try:
+                ok = sesion.get(f'{base}/api/v1/products', headers=cabeceras, timeout=30).status_code == 200
+            except requests.RequestException:
+                ok = False
+            latencias.append((time.perf_counter() - t0) * 1000)
+            errores += not ok
+        return latencias, errores
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        resultados = list(pool.map(cliente, range(concurrency)))
+    duracion = time.perf_counter() - inicio
+    latencias = [l for propias, _ in resultados for l in propias]
+    errores = sum(e for _, e in resultados)
+    return duracion, latencias, errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--worker-classes', nargs='+', default=['gthread', 'gevent'])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8, help='Hilos por worker (gthread)')
+    parser.add_argument('--worker-connections', type=int, default=200, help='Conexiones por worker (gevent)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Latencia del gateway simulado (s)')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=15.0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--gateway-port', type=int, default=8799)
+    args = parser.parse_args()
+
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_gunicorn_'), 'bench.db')}"
+    sembrar(database_url)
+    gateway = iniciar_gateway(args.gateway_port, args.latency)
+
+    env = dict(os.environ,
+               DATABASE_URL=database_url,
+               APP_CONFIG='production',
+               USE_MOCK_MAINFRAME='False',
+               MAINFRAME_BASE_URL=f'http://127.0.0.1:{args.gateway_port}',
+               CORE_CACHE_ENABLED='False',
+               MONITORING_ENABLED='False',
+               MAINFRAME_MAX_CONCURRENT=str(max(args.threads, args.worker_connections)),
+               GUNICORN_BIND=f'127.0.0.1:{args.port}',
+               GUNICORN_WORKERS=str(args.workers),
+               GUNICORN_THREADS=str(args.threads),
+               GUNICORN_WORKER_CONNECTIONS=str(args.worker_connections),
+               GUNICORN_ACCESSLOG='',
+               GUNICORN_LOGLEVEL='warning')
+    base = f'http://127.0.0.1:{args.port}'
+
+    filas = []
+    try:
+        for worker_class in args.worker_classes:
+            proceso = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--worker-class', worker_class],
+                cwd=RAIZ, env=dict(env, GUNICORN_WORKER_CLASS=worker_class)
+            )
+            try:
+                esperar_servidor(f'{base}/auth/login', proceso)
+                token = requests.post(f'{base}/auth/login', json={'dni': DNI_BENCH, 'password': PASSWORD_BENCH},
+                                      timeout=30).json()['access_token']
+                duracion, latencias, errores = medir(base, token, args.concurrency, args.seconds)
+                p = statistics.quantiles(latencias, n=100)
+                filas.append((worker_class, (len(latencias) - errores) / duracion, p[49], p[94], p[98], errores))
+            except RuntimeError as e:
+                filas.append((worker_class, None, None, None, None, str(e)))
+            finally:
+                proceso.send_signal(signal.SIGTERM)
+                proceso.wait(timeout=60)
+    finally:
+        gateway.shutdown()
+
+    print(f"\nworkers={args.workers} threads={args.threads} worker_connections={args.worker_connections} "
+          f"latencia_gateway={args.latency * 1000:.0f}ms concurrencia={args.concurrency} duración={args.seconds}s")
+    print(f"{'worker':10s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'errores':>8s}")
+    for worker_class, rps, p50, p95, p99, errores in filas:
+        if rps is None:
+            print(f"{worker_class:10s} no disponible: {errores}")
+        else:
+            print(f"{worker_class:10s} {rps:8.1f} {p50:8.1f} {p95:8.1f} {p99:8.1f} {errores:8d}")
+
+
+if __name__ == '__main__':
+    main()
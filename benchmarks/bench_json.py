@@ -0,0 +1,133 @@
+"""
+Micro-benchmark de serialización JSON de respuestas TRX002 / TRX003.
+
+Compara, para payloads del tamaño de cada transacción (montos Numeric(15, 2) como Decimal):
+  - `float+stdlib`: camino anterior (montos float en el servicio, totales sumados en float,
+    json estándar de Flask)
+  - `stdlib`: StdlibJSONProvider con Decimal (convierte a float al serializar)
+  - `orjson`: OrjsonProvider (Decimal exacto, sin pasar por float)
+
+Reporta microsegundos por respuesta (provider.response(); mediana de --repeat corridas de
+--number serializaciones), bytes por respuesta y si los montos de la respuesta son exactamente
+los de la BD (con float los totales por categoría acumulan error de redondeo).
+
+    python benchmarks/bench_json.py
+    python benchmarks/bench_json.py --movements 20 50 200 --number 2000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from app.services.json_provider import PROVEEDORES_JSON
+
+CATEGORIAS = ('Alimentación', 'Transporte y Viajes', 'Tecnología', 'Entretenimiento', 'Salud', 'Otros')
+
+
+def monto(rng, maximo=5000):
+    return Decimal(rng.randint(1, maximo * 100)) / 100
+
+
+def payload_trx002(rng, movimientos, numero=Decimal):
+    """
+    Respuesta de /accounts/<num_cuenta>/summary (cabecera, resumen por categoría y movimientos).
+    `numero`: tipo de los montos (Decimal, o float como hacía antes el servicio); los totales
+    por categoría se acumulan con ese tipo.
+    """
+    lista_movs = [
+        {
+            "fecha": f"2025-03-{1 + i % 28:02d}",
+            "glosa": f"COMPRA COMERCIO {i}",
+            "monto": numero(monto(rng)),
+            "categoria": rng.choice(CATEGORIAS),
+        }
+        for i in range(movimientos)
+    ]
+    totales = {}
+    for mov in lista_movs:
+        totales[mov["categoria"]] = totales.get(mov["categoria"], numero(0)) + mov["monto"]
+    return {
+        "data": {
+            "cabecera": {"saldo": numero(Decimal('98765432109876.53')), "moneda": "PEN"},
+            "resumen_categorias": [{"categoria": c, "total": t} for c, t in totales.items()],
+            "movimientos": lista_movs,
+        }
+    }
+
+
+def payload_trx003(rng, movimientos, numero=Decimal):
+    """Página de /accounts/<num_cuenta>/details (movimientos con id, fecha ISO y monto con signo)."""
+    inicio = datetime(2025, 3, 1)
+    return {
+        "meta": {"count": movimientos, "has_more": True, "next_cursor": "eyJsYXN0X2lkIjoiMjAyNTAzMDEifQ.abc"},
+        "data": [
+            {
+                "id_transaccion": f"20250301{i:012d}",
+                "fecha": (inicio + timedelta(minutes=37 * i)).isoformat(),
+                "glosa": f"COMPRA COMERCIO {i}",
+                "monto": -numero(monto(rng)),
+                "moneda": "PEN",
+            }
+            for i in range(movimientos)
+        ],
+    }
+
+
+def montos(valor):
+    """Decimales del payload (para verificar que la salida conserva los centavos)."""
+    if isinstance(valor, dict):
+        for v in valor.values():
+            yield from montos(v)
+    elif isinstance(valor, list):
+        for v in valor:
+            yield from montos(v)
+    elif isinstance(valor, Decimal):
+        yield valor
+
+
+def medir(funcion, number, repeat):
+    tiempos = timeit.repeat(funcion, number=number, repeat=repeat)
+    return statistics.median(tiempos) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--movements', type=int, nargs='+', default=[20, 50],
+                        help='Movimientos por respuesta (20 = TRX002, 50 = página máxima de TRX003)')
+    parser.add_argument('--number', type=int, default=1000, help='Serializaciones por corrida')
+    parser.add_argument('--repeat', type=int, default=5, help='Corridas (se reporta la mediana)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    proveedores = {nombre: clase(app) for nombre, clase in PROVEEDORES_JSON.items()}
+
+    print(f"{'payload':<10} {'movs':>5} {'proveedor':<13} {'us/resp':>9} {'bytes':>7}  exacto")
+    with app.app_context():
+        for nombre_payload, constructor in (('TRX002', payload_trx002), ('TRX003', payload_trx003)):
+            for movimientos in args.movements:
+                payload = constructor(random.Random(args.seed), movimientos)
+                payload_float = constructor(random.Random(args.seed), movimientos, float)
+                casos = {
+                    'float+stdlib': lambda: proveedores['stdlib'].response(payload_float).get_data(),
+                    'stdlib': lambda: proveedores['stdlib'].response(payload).get_data(),
+                    'orjson': lambda: proveedores['orjson'].response(payload).get_data(),
+                }
+                for caso, funcion in casos.items():
+                    salida = funcion()
+                    exacto = sorted(montos(payload)) == sorted(montos(json.loads(salida, parse_float=Decimal)))
+                    micros = medir(funcion, args.number, args.repeat)
+                    print(f"{nombre_payload:<10} {movimientos:>5} {caso:<13} {micros:>9.1f} {len(salida):>7}  "
+                          f"{'sí' if exacto else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
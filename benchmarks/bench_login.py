@@ -0,0 +1,134 @@
+"""
+Benchmark de /auth/login: logins por segundo (total y por core) para cada configuración de hash.
+
+Para cada método (PASSWORD_HASH_METHOD) crea la app, registra un usuario sintético y lanza
+`--concurrency` hilos que hacen login durante `--seconds` segundos con el cliente de pruebas
+de Flask. Reporta logins/s, logins/s por core, latencia p50/p95 y respuestas 503
+(pool de hashing saturado).
+
+Por defecto usa una base SQLite temporal (el costo a medir es el hash, no la BD):
+    python benchmarks/bench_login.py --methods scrypt pbkdf2:sha256:600000 --concurrency 8 --seconds 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.core_banking import Cliente
+
+DNI_BENCH = 'BENCHLOGIN1'
+PASSWORD_BENCH = 'bench-password'
+
+
+def cores_disponibles():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def crear_app(database_url, method, workers, max_pending):
+    config = type('BenchLoginConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'USE_MOCK_MAINFRAME': True,
+        'PASSWORD_HASH_METHOD': method,
+        'PASSWORD_HASH_WORKERS': workers,
+        'PASSWORD_HASH_MAX_PENDING': max_pending,
+    })
+    return create_app(config)
+
+
+def preparar_usuario(app):
+    with app.app_context():
+        if not Cliente.query.filter_by(dni_ruc=DNI_BENCH).first():
+            db.session.add(Cliente(dni_ruc=DNI_BENCH, nombres='Bench', apellidos='Login', fecha_nac=date(1990, 1, 1)))
+            db.session.commit()
+    cliente = app.test_client()
+    cliente.post('/auth/register', json={'dni': DNI_BENCH, 'password': PASSWORD_BENCH})
+    # Primer login: regenera el hash si el usuario venía de otro método
+    respuesta = cliente.post('/auth/login', json={'dni': DNI_BENCH, 'password': PASSWORD_BENCH})
+    if respuesta.status_code != 200:
+        sys.exit(f"No se pudo hacer login con el usuario sintético: {respuesta.status_code} {respuesta.get_data(as_text=True)}")
+
+
+def medir(app, concurrency, seconds):
+    latencias = []
+    codigos = {}
+    lock = threading.Lock()
+    fin = time.perf_counter() + seconds
+
+    def trabajador():
+        cliente = app.test_client()
+        propias = []
+        propios = {}
+        while time.perf_counter() < fin:
+            t0 = time.perf_counter()
+            respuesta = cliente.post('/auth/login', json={'dni': DNI_BENCH, 'password': PASSWORD_BENCH})
+            propias.append((time.perf_counter() - t0) * 1000)
+            propios[respuesta.status_code] = propios.get(respuesta.status_code, 0) + 1
+        with lock:
+            latencias.extend(propias)
+            for codigo, n in propios.items():
+                codigos[codigo] = codigos.get(codigo, 0) + n
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=trabajador) for _ in range(concurrency)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return time.perf_counter() - inicio, latencias, codigos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--methods', nargs='+', default=['scrypt', 'pbkdf2:sha256:600000', 'pbkdf2:sha256:100000'],
+                        help='Valores de PASSWORD_HASH_METHOD a comparar')
+    parser.add_argument('--concurrency', type=int, default=8, help='Hilos cliente concurrentes')
+    parser.add_argument('--seconds', type=float, default=10.0, help='Duración de cada medición')
+    parser.add_argument('--workers', type=int, default=None, help='PASSWORD_HASH_WORKERS (por defecto, nº de CPUs)')
+    parser.add_argument('--max-pending', type=int, default=None, help='PASSWORD_HASH_MAX_PENDING')
+    parser.add_argument('--database-url', default=None, help='Por defecto, SQLite temporal')
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        archivo = os.path.join(tempfile.mkdtemp(prefix='bench_login_'), 'bench.db')
+        database_url = f'sqlite:///{archivo}'
+
+    cores = cores_disponibles()
+    print(f"Cores disponibles: {cores}, concurrencia: {args.concurrency}, duración: {args.seconds}s")
+
+    resultados = []
+    for method in args.methods:
+        app = crear_app(database_url, method, args.workers, args.max_pending)
+        preparar_usuario(app)
+        duracion, latencias, codigos = medir(app, args.concurrency, args.seconds)
+        exitosos = codigos.get(200, 0)
+        percentiles = statistics.quantiles(latencias, n=100) if len(latencias) > 1 else latencias * 99
+        resultados.append({
+            "method": method,
+            "logins_s": exitosos / duracion,
+            "logins_s_core": exitosos / duracion / cores,
+            "p50": percentiles[49] if percentiles else 0.0,
+            "p95": percentiles[94] if percentiles else 0.0,
+            "rechazados": codigos.get(503, 0),
+            "otros": sum(n for codigo, n in codigos.items() if codigo not in (200, 503)),
+        })
+
+    print(f"\n{'método':28s} {'logins/s':>10s} {'/s/core':>10s} {'p50 ms':>9s} {'p95 ms':>9s} {'503':>6s} {'otros':>6s}")
+    for r in resultados:
+        print(f"{r['method']:28s} {r['logins_s']:10.1f} {r['logins_s_core']:10.1f} {r['p50']:9.1f} {r['p95']:9.1f} "
+              f"{r['rechazados']:6d} {r['otros']:6d}")
+
+
+if __name__ == '__main__':
+    main()
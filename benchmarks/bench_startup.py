@@ -0,0 +1,79 @@
+"""
+Benchmark de arranque: tiempo de `import app` + `create_app()` por configuración.
+
+- En frío: cada muestra es un proceso Python nuevo (equivale al arranque de un worker
+  de gunicorn sin --preload), se mide la importación y el create_app.
+- En caliente: create_app repetido dentro del mismo proceso (equivale a una suite de
+  tests que crea una app por test).
+
+Usa DATABASE_URL (por defecto, una SQLite temporal; con PostgreSQL el ahorro de
+db.create_all() y de la precarga del catálogo incluye los round trips de red):
+    python benchmarks/bench_startup.py --samples 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEDICION = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from app import create_app
+from app.config import config_por_nombre
+t1 = time.perf_counter()
+create_app(config_por_nombre[sys.argv[1]])
+t2 = time.perf_counter()
+calientes = []
+for _ in range(int(sys.argv[2])):
+    t = time.perf_counter()
+    create_app(config_por_nombre[sys.argv[1]])
+    calientes.append(time.perf_counter() - t)
+print(json.dumps({"import": t1 - t0, "create_app": t2 - t1, "calientes": calientes}))
+"""
+
+
+def muestrear(config, samples, repeticiones, env):
+    frios_import, frios_create, calientes = [], [], []
+    for i in range(samples):
+        salida = subprocess.run(
+            [sys.executable, '-c', MEDICION, config, str(repeticiones if i == 0 else 0)],
+            cwd=RAIZ, env=env, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        datos = json.loads(salida)
+        frios_import.append(datos["import"] * 1000)
+        frios_create.append(datos["create_app"] * 1000)
+        calientes.extend(t * 1000 for t in datos["calientes"])
+    return frios_import, frios_create, calientes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=10, help='Procesos nuevos por configuración')
+    parser.add_argument('--warm', type=int, default=20, help='create_app repetidos en caliente')
+    parser.add_argument('--configs', nargs='+', default=['development', 'production'])
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not env.get('DATABASE_URL'):
+        archivo = os.path.join(tempfile.mkdtemp(prefix='bench_startup_'), 'bench.db')
+        env['DATABASE_URL'] = f'sqlite:///{archivo}'
+        # Con la BD vacía, el primer create_all crea las tablas: se hace antes de medir
+        subprocess.run([sys.executable, '-c', 'from app import create_app; create_app()'],
+                       cwd=RAIZ, env=env, capture_output=True, check=True)
+
+    print(f"{'config':14s} {'import ms':>10s} {'create_app ms':>14s} {'total ms':>10s} {'caliente ms':>12s}")
+    for config in args.configs:
+        imports, creates, calientes = muestrear(config, args.samples, args.warm, env)
+        total = [i + c for i, c in zip(imports, creates)]
+        print(f"{config:14s} {statistics.median(imports):10.1f} {statistics.median(creates):14.1f} "
+              f"{statistics.median(total):10.1f} {statistics.median(calientes) if calientes else 0.0:12.1f}")
+    print("(medianas; 'caliente' = create_app repetido en un proceso ya inicializado)")
+
+
+if __name__ == '__main__':
+    main()
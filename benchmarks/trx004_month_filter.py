@@ -0,0 +1,158 @@
+"""
+Benchmark TRX004: filtro por mes con EXTRACT(month/year) vs rango semiabierto [inicio, fin).
+
+Crea un cliente sintético con cientos de miles de movimientos, y muestra el plan de ejecución
+(EXPLAIN ANALYZE) y el tiempo de la consulta de gasto mensual en cuatro escenarios:
+predicado EXTRACT / rango, sin y con el índice (NUM_CUENTA, FECHA_PROCESO).
+
+Requiere PostgreSQL en DATABASE_URL:
+    python benchmarks/trx004_month_filter.py --rows 300000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text, bindparam
+from app import create_app
+from app.extensions import db
+from app.services.core_banking_service import CoreBankingService
+
+INDICE = 'ix_CORE_MOVIMIENTOS_NUM_CUENTA_FECHA_PROCESO'
+DNI_BENCH = 'BENCH000001'
+CUENTAS_BENCH = ('BENCH-0001', 'BENCH-0002')
+
+BASE_SQL = """
+    SELECT cat."NOMBRE_CATEGORIA", SUM(m."MONTO") AS total
+    FROM "CORE_MOVIMIENTOS" m
+    JOIN "CORE_MCC" mcc ON m."COD_COMERCIO" = mcc."COD_MCC"
+    JOIN "CORE_CATEGORIA" cat ON mcc."ID_CATEGORIA" = cat."ID_CATEGORIA"
+    JOIN "CORE_CUENTAS" c ON m."NUM_CUENTA" = c."NUM_CUENTA"
+    WHERE c."COD_CLIENTE" = :cod_cliente
+      AND m."TIPO_MOV" = 'D'
+      AND {filtro_mes}
+    GROUP BY cat."NOMBRE_CATEGORIA"
+    ORDER BY total DESC
+    LIMIT 1
+"""
+
+FILTRO_EXTRACT = """EXTRACT(month FROM m."FECHA_PROCESO") = :mes AND EXTRACT(year FROM m."FECHA_PROCESO") = :anio"""
+FILTRO_RANGO = """m."FECHA_PROCESO" >= :inicio AND m."FECHA_PROCESO" < :fin"""
+
+
+def sembrar(rows):
+    db.session.execute(text("""
+        INSERT INTO "CORE_CATEGORIA" ("NOMBRE_CATEGORIA") SELECT 'Bench'
+        WHERE NOT EXISTS (SELECT 1 FROM "CORE_CATEGORIA" WHERE "NOMBRE_CATEGORIA" = 'Bench')
+    """))
+    db.session.execute(text("""
+        INSERT INTO "CORE_MCC" ("COD_MCC", "DESCRIPCION", "ID_CATEGORIA")
+        SELECT 'BENCH-MCC', 'Benchmark', "ID_CATEGORIA" FROM "CORE_CATEGORIA" WHERE "NOMBRE_CATEGORIA" = 'Bench'
+        ON CONFLICT DO NOTHING
+    """))
+    cod_cliente = db.session.execute(text("""
+        INSERT INTO "CORE_CLIENTES" ("DNI_RUC", "NOMBRES", "APELLIDOS", "FECHA_NAC")
+        VALUES (:dni, 'Bench', 'Usuario', '1990-01-01') RETURNING "COD_CLIENTE"
+    """), {"dni": DNI_BENCH}).scalar()
+    for num_cuenta in CUENTAS_BENCH:
+        db.session.execute(text("""
+            INSERT INTO "CORE_CUENTAS" ("NUM_CUENTA", "COD_CLIENTE", "TIPO_CUENTA", "MONEDA", "SALDO_CONTABLE", "SALDO_DISPONIBLE", "ESTADO")
+            VALUES (:num_cuenta, :cod_cliente, 'AHO', 'PEN', 1000, 1000, 'A')
+        """), {"num_cuenta": num_cuenta, "cod_cliente": cod_cliente})
+    # Un movimiento por minuto hacia atrás: 300k filas ~ 7 meses de historia
+    db.session.execute(text("""
+        INSERT INTO "CORE_MOVIMIENTOS" ("ID_TRX", "NUM_CUENTA", "FECHA_PROCESO", "TIPO_MOV", "MONTO", "MONEDA", "GLOSA_TRX", "COD_COMERCIO")
+        SELECT 'BENCH' || lpad(g::text, 21, '0'),
+               CASE WHEN g % 2 = 0 THEN :cta1 ELSE :cta2 END,
+               now() - (g || ' minutes')::interval,
+               CASE WHEN g % 5 = 0 THEN 'C' ELSE 'D' END,
+               (g % 400) + 0.50, 'PEN', 'BENCH MOV ' || g, 'BENCH-MCC'
+        FROM generate_series(1, :rows) g
+    """), {"rows": rows, "cta1": CUENTAS_BENCH[0], "cta2": CUENTAS_BENCH[1]})
+    db.session.commit()
+    db.session.execute(text('ANALYZE "CORE_MOVIMIENTOS"'))
+    db.session.execute(text('ANALYZE "CORE_CUENTAS"'))
+    db.session.commit()
+    return cod_cliente
+
+
+def limpiar():
+    db.session.execute(text("""DELETE FROM "CORE_MOVIMIENTOS" WHERE "NUM_CUENTA" IN :cuentas""").bindparams(
+        bindparam('cuentas', expanding=True)), {"cuentas": list(CUENTAS_BENCH)})
+    db.session.execute(text("""DELETE FROM "CORE_CUENTAS" WHERE "NUM_CUENTA" IN :cuentas""").bindparams(
+        bindparam('cuentas', expanding=True)), {"cuentas": list(CUENTAS_BENCH)})
+    db.session.execute(text("""DELETE FROM "CORE_CLIENTES" WHERE "DNI_RUC" = :dni"""), {"dni": DNI_BENCH})
+    db.session.commit()
+
+
+def set_indice(presente):
+    db.session.execute(text(f'DROP INDEX IF EXISTS "{INDICE}"'))
+    if presente:
+        db.session.execute(text(f'CREATE INDEX "{INDICE}" ON "CORE_MOVIMIENTOS" ("NUM_CUENTA", "FECHA_PROCESO")'))
+    db.session.commit()
+    db.session.execute(text('ANALYZE "CORE_MOVIMIENTOS"'))
+    db.session.commit()
+
+
+def medir(sql, params, repeticiones):
+    plan = db.session.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + sql), params).scalars().all()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        db.session.execute(text(sql), params).all()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return plan, statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=300000, help='Movimientos del cliente sintético')
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--keep', action='store_true', help='No borrar los datos sintéticos al terminar')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            sys.exit("Este benchmark requiere PostgreSQL (DATABASE_URL).")
+
+        limpiar()
+        cod_cliente = sembrar(args.rows)
+        ahora = datetime.now()
+        inicio, fin = CoreBankingService._rango_mes(ahora.year, ahora.month)
+        params = {"cod_cliente": cod_cliente, "mes": ahora.month, "anio": ahora.year, "inicio": inicio, "fin": fin}
+
+        try:
+            resultados = []
+            for con_indice in (False, True):
+                set_indice(con_indice)
+                for nombre, filtro in (("EXTRACT", FILTRO_EXTRACT), ("RANGO", FILTRO_RANGO)):
+                    plan, mediana = medir(BASE_SQL.format(filtro_mes=filtro), params, args.repeticiones)
+                    etiqueta = f"{nombre} {'con' if con_indice else 'sin'} índice"
+                    resultados.append((etiqueta, mediana))
+                    print(f"\n=== {etiqueta}: mediana {mediana:.2f} ms")
+                    print("\n".join(plan))
+
+            # Llamada completa al servicio (ya usa rangos), con el índice creado
+            tiempos = []
+            for _ in range(args.repeticiones):
+                t0 = time.perf_counter()
+                CoreBankingService.obtener_metricas_financieras(cod_cliente)
+                tiempos.append((time.perf_counter() - t0) * 1000)
+            resultados.append(("obtener_metricas_financieras (servicio)", statistics.median(tiempos)))
+
+            print("\n=== Resumen (mediana, ms) ===")
+            for etiqueta, mediana in resultados:
+                print(f"{etiqueta:45s} {mediana:10.2f}")
+        finally:
+            set_indice(True)
+            if not args.keep:
+                limpiar()
+
+
+if __name__ == '__main__':
+    main()
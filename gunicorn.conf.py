@@ -0,0 +1,117 @@
+"""
+Configuración de gunicorn para servir la API en producción:
+
+    gunicorn -c gunicorn.conf.py
+
+La carga es de I/O: cada request espera al gateway CICS (requests.post) y a PostgreSQL.
+Todos los valores se pueden sobrescribir con variables de entorno GUNICORN_*.
+
+Clases de worker (GUNICORN_WORKER_CLASS):
+- gthread (por defecto): `workers` procesos x `threads` hilos. Mientras un hilo espera al
+  Mainframe, los demás atienden; el GIL se libera durante la espera de red.
+- gevent: workers cooperativos, `worker_connections` requests concurrentes por proceso.
+  Requiere `pip install gevent psycogreen` (no están en requirements.txt). Se desactiva
+  --preload: el monkey-patching debe ocurrir antes de importar requests / psycopg2.
+
+Los timeouts se derivan de los del cliente Mainframe (MAINFRAME_*): un request no debe
+ser cortado por gunicorn mientras el cliente aún está dentro de su presupuesto de reintentos.
+
+Medición (benchmarks/bench_gunicorn.py): levanta un gateway simulado con latencia fija,
+arranca gunicorn con cada clase de worker contra una BD SQLite sembrada y mide req/s y
+latencias de GET /api/v1/products en modo Mainframe real. Ejemplo:
+
+    python benchmarks/bench_gunicorn.py --worker-classes gthread gevent --latency 0.2 --concurrency 64
+
+Medido en un contenedor de desarrollo de 1 vCPU (2 workers, 8 hilos / 200 conexiones,
+latencia del gateway 200 ms, 64 clientes concurrentes, 15 s). Son valores de referencia:
+repetir la medición en el hardware de destino antes de elegir la clase de worker.
+
+    worker     req/s   p50 ms   p95 ms   p99 ms
+    gthread     51.6   1815.5   1944.0   1991.6   (16 requests en vuelo: el resto espera en cola)
+    gevent     205.5    282.2    424.3    515.5
+"""
+import importlib.util
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _cargar_config():
+    """
+    Config de app/config.py cargado por ruta: `from app.config import Config` ejecutaría
+    app/__init__.py (Flask, SQLAlchemy, requests, httpx, ssl...) en el master antes del
+    monkey-patching de gevent. config.py solo depende de os y python-dotenv.
+    """
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'config.py')
+    spec = importlib.util.spec_from_file_location('_gunicorn_app_config', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo.Config
+
+
+Config = _cargar_config()
+
+
+def _env(nombre, defecto, tipo=str):
+    valor = os.environ.get(nombre)
+    return tipo(valor) if valor not in (None, '') else defecto
+
+
+# --- Aplicación ---
+wsgi_app = _env('GUNICORN_APP', 'run:app')
+bind = _env('GUNICORN_BIND', '0.0.0.0:8000')
+raw_env = ['APP_CONFIG=' + os.environ.get('APP_CONFIG', 'production')]
+os.environ.setdefault('APP_CONFIG', 'production')
+
+# --- Workers ---
+worker_class = _env('GUNICORN_WORKER_CLASS', 'gthread')
+workers = _env('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2, int)
+threads = _env('GUNICORN_THREADS', 8, int)                       # gthread
+worker_connections = _env('GUNICORN_WORKER_CONNECTIONS', 200, int)  # gevent
+
+# Cargar la app en el master y compartirla con fork (arranque más rápido, menos memoria).
+# Con gevent no se precarga: el parcheo de sockets tiene que preceder a los imports.
+preload_app = _env('GUNICORN_PRELOAD', 'false' if worker_class == 'gevent' else 'true').lower() == 'true'
+
+# --- Reciclado de workers (fugas de memoria, fragmentación) ---
+max_requests = _env('GUNICORN_MAX_REQUESTS', 2000, int)
+max_requests_jitter = _env('GUNICORN_MAX_REQUESTS_JITTER', 200, int)
+
+# --- Timeouts alineados con el cliente Mainframe ---
+# Peor caso de una llamada: (connect + read) por intento, más el backoff entre reintentos
+_intentos = Config.MAINFRAME_MAX_RETRIES + 1
+_backoff = sum(Config.MAINFRAME_BACKOFF_FACTOR * (2 ** i) for i in range(Config.MAINFRAME_MAX_RETRIES))
+_presupuesto_mainframe = (Config.MAINFRAME_CONNECT_TIMEOUT + Config.MAINFRAME_READ_TIMEOUT) * _intentos + _backoff
+
+timeout = _env('GUNICORN_TIMEOUT', int(_presupuesto_mainframe) + 10, int)
+graceful_timeout = _env('GUNICORN_GRACEFUL_TIMEOUT', int(_presupuesto_mainframe) + 5, int)
+keepalive = _env('GUNICORN_KEEPALIVE', 5, int)
+
+# --- Logs ---
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None  # vacío = sin access log
+errorlog = _env('GUNICORN_ERRORLOG', '-')
+loglevel = _env('GUNICORN_LOGLEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """
+    Recursos abiertos en el master (con preload_app) que no se deben compartir entre procesos:
+    conexiones del pool de SQLAlchemy y la sesión HTTP keep-alive hacia el gateway.
+    """
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("psycogreen no está instalado: las consultas a PostgreSQL bloquearán el worker gevent")
+
+    if not preload_app:
+        return
+
+    from app.extensions import db, mainframe
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+    mainframe.cerrar()
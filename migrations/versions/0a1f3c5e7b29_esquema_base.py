@@ -0,0 +1,190 @@
+"""Esquema base: tablas del Core Bancario y de la App (modelos originales)
+
+Revision ID: 0a1f3c5e7b29
+Revises:
+Create Date: 2026-10-17 02:00:00.000000
+
+En una BD nueva, `flask db upgrade` crea todo el esquema desde esta revisión.
+Una BD ya creada con db.create_all() se marca como migrada sin tocarla:
+
+    flask db stamp head
+
+(o `flask db stamp 0a1f3c5e7b29` y luego `flask db upgrade` si se creó con una versión
+anterior de los modelos). Las tablas que ya existan se omiten.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a1f3c5e7b29'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _tablas():
+    """(nombre, columnas y restricciones) en orden de dependencia (FKs)."""
+    return (
+        ('CORE_CLIENTES', (
+            sa.Column('COD_CLIENTE', sa.Integer(), autoincrement=True, nullable=False, comment='ID único interno (Auto-incremental)'),
+            sa.Column('DNI_RUC', sa.String(length=11), nullable=False),
+            sa.Column('NOMBRES', sa.String(length=50), nullable=False),
+            sa.Column('APELLIDOS', sa.String(length=50), nullable=False),
+            sa.Column('FECHA_NAC', sa.Date(), nullable=False, comment='Vital para perfilamiento por edad'),
+            sa.Column('EMAIL', sa.String(length=60), nullable=True),
+            sa.Column('TELEFONO', sa.String(length=15), nullable=True),
+            sa.Column('INGRESOS_MES', sa.Numeric(precision=15, scale=2), nullable=True, comment='Base para calcular capacidad de deuda'),
+            sa.Column('SCORE_CREDITICIO', sa.Integer(), nullable=True, comment='Score Sentinel/Infocorp'),
+            sa.Column('FECHA_ALTA', sa.Date(), nullable=True),
+            sa.PrimaryKeyConstraint('COD_CLIENTE'),
+        )),
+        ('CORE_CATEGORIA', (
+            sa.Column('ID_CATEGORIA', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('NOMBRE_CATEGORIA', sa.String(length=40), nullable=False),
+            sa.PrimaryKeyConstraint('ID_CATEGORIA'),
+        )),
+        ('CORE_TARJETAS', (
+            sa.Column('NUM_TARJETA', sa.String(length=16), nullable=False, comment='PAN enmascarado o token'),
+            sa.Column('TIPO_TARJETA', sa.String(length=10), nullable=False, comment='DEBITO, CREDITO'),
+            sa.Column('MARCA', sa.String(length=10), nullable=True, comment='VISA, MC, AMEX'),
+            sa.Column('FECHA_VENC', sa.Date(), nullable=False),
+            sa.Column('ESTADO', sa.String(length=1), nullable=True),
+            sa.PrimaryKeyConstraint('NUM_TARJETA'),
+        )),
+        ('CORE_MCC', (
+            sa.Column('COD_MCC', sa.String(length=15), nullable=False, comment='Código estándar de comercio o rubro'),
+            sa.Column('DESCRIPCION', sa.String(length=100), nullable=True),
+            sa.Column('ID_CATEGORIA', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['ID_CATEGORIA'], ['CORE_CATEGORIA.ID_CATEGORIA']),
+            sa.PrimaryKeyConstraint('COD_MCC'),
+        )),
+        ('CORE_CUENTAS', (
+            sa.Column('NUM_CUENTA', sa.String(length=20), nullable=False, comment='CCI o interna'),
+            sa.Column('COD_CLIENTE', sa.Integer(), nullable=False),
+            sa.Column('TIPO_CUENTA', sa.String(length=3), nullable=False, comment='AHO=Ahorro, CTE=Corriente, CTS'),
+            sa.Column('MONEDA', sa.String(length=3), nullable=True),
+            sa.Column('SALDO_CONTABLE', sa.Numeric(precision=15, scale=2), nullable=False),
+            sa.Column('SALDO_DISPONIBLE', sa.Numeric(precision=15, scale=2), nullable=False),
+            sa.Column('ESTADO', sa.String(length=1), nullable=True, comment='A=Activa, B=Bloqueada, C=Cancelada'),
+            sa.Column('NUM_TARJETA', sa.String(length=16), nullable=True, comment='Tarjeta asociada (Debito)'),
+            sa.ForeignKeyConstraint(['COD_CLIENTE'], ['CORE_CLIENTES.COD_CLIENTE']),
+            sa.ForeignKeyConstraint(['NUM_TARJETA'], ['CORE_TARJETAS.NUM_TARJETA']),
+            sa.PrimaryKeyConstraint('NUM_CUENTA'),
+        )),
+        ('CORE_MOVIMIENTOS', (
+            sa.Column('ID_TRX', sa.String(length=26), nullable=False, comment='Timestamp + Secuencia única'),
+            sa.Column('NUM_CUENTA', sa.String(length=20), nullable=False),
+            sa.Column('CUENTA_DESTINO_ORIGEN', sa.String(length=20), nullable=True, comment='Contraparte de la trx'),
+            sa.Column('FECHA_PROCESO', sa.DateTime(), nullable=False),
+            sa.Column('TIPO_MOV', sa.String(length=1), nullable=False, comment='D=Debito, C=Credito'),
+            sa.Column('MONTO', sa.Numeric(precision=15, scale=2), nullable=False),
+            sa.Column('MONEDA', sa.String(length=3), nullable=True),
+            sa.Column('GLOSA_TRX', sa.String(length=100), nullable=False, comment='Texto crudo para NLP'),
+            sa.Column('COD_CANAL', sa.String(length=4), nullable=True, comment='ATM, POS, APP, WEB'),
+            sa.Column('COD_COMERCIO', sa.String(length=15), nullable=True),
+            sa.Column('UBICACION_TRX', sa.String(length=50), nullable=True),
+            sa.Column('SALDO_POST_TRX', sa.Numeric(precision=15, scale=2), nullable=True, comment='Saldo remanente'),
+            sa.ForeignKeyConstraint(['COD_COMERCIO'], ['CORE_MCC.COD_MCC']),
+            sa.ForeignKeyConstraint(['NUM_CUENTA'], ['CORE_CUENTAS.NUM_CUENTA']),
+            sa.PrimaryKeyConstraint('ID_TRX'),
+        )),
+        ('TOKEN_BLOCKLIST', (
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('jti', sa.String(length=36), nullable=False, comment='ID único del token (JWT ID)'),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )),
+        ('GAMIFICACION_ANIMALES', (
+            sa.Column('NIVEL_ID', sa.Integer(), nullable=False, comment='Ej: 1, 2, 3...'),
+            sa.Column('NOMBRE_ANIMAL', sa.String(length=20), nullable=True, comment='Ej: Perezoso, Hormiga, Águila'),
+            sa.Column('DESCRIPCION_PERFIL', sa.String(length=255), nullable=True, comment="Ej: 'Aún te cuesta mover tus ahorros...'"),
+            sa.Column('URL_ICONO', sa.String(length=255), nullable=True),
+            sa.Column('RANGO_GASTO_MIN', sa.Numeric(precision=15, scale=2), nullable=True, comment='Lógica para asignar este animal'),
+            sa.Column('RANGO_GASTO_MAX', sa.Numeric(precision=15, scale=2), nullable=True),
+            sa.PrimaryKeyConstraint('NIVEL_ID'),
+        )),
+        ('USUARIOS', (
+            sa.Column('USER_UUID', sa.String(length=50), nullable=False, comment='ID único del sistema de Auth (Firebase/Cognito)'),
+            sa.Column('DNI_VINCULADO', sa.String(length=11), nullable=False, comment='Llave para buscar datos en Mainframe'),
+            sa.Column('PASSWORD_HASH', sa.String(length=255), nullable=True, comment='Hash de la contraseña para auth local'),
+            sa.Column('NICKNAME', sa.String(length=30), nullable=True),
+            sa.Column('FOTO_PERFIL_URL', sa.String(length=255), nullable=True),
+            sa.Column('NIVEL_FINANCIERO', sa.Integer(), nullable=True, comment='Nivel actual del usuario'),
+            sa.Column('ANIMAL_ACTUAL', sa.String(length=20), nullable=True, comment='Nombre del arquetipo actual'),
+            sa.Column('CREATED_AT', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['NIVEL_FINANCIERO'], ['GAMIFICACION_ANIMALES.NIVEL_ID']),
+            sa.PrimaryKeyConstraint('USER_UUID'),
+            sa.UniqueConstraint('DNI_VINCULADO'),
+        )),
+        ('CATEGORIAS_CONFIG', (
+            sa.Column('NOMBRE_CATEGORIA', sa.String(length=40), nullable=False, comment="ID textual: 'Alimentación', 'Transporte'"),
+            sa.Column('ICONO_APP', sa.String(length=50), nullable=True, comment='Nombre del asset local o URL'),
+            sa.Column('COLOR_HEX', sa.String(length=7), nullable=True, comment='Para pintar el gráfico'),
+            sa.Column('MENSAJE_GASTO_ALTO', sa.String(length=150), nullable=True, comment="Ej: '¡Cuidado! Estás comiendo mucho fuera.'"),
+            sa.Column('MENSAJE_AHORRO', sa.String(length=150), nullable=True, comment="Ej: '¡Bien! Has reducido gastos aquí.'"),
+            sa.PrimaryKeyConstraint('NOMBRE_CATEGORIA'),
+        )),
+        ('METAS', (
+            sa.Column('META_ID', sa.Integer(), nullable=False),
+            sa.Column('USER_UUID', sa.String(length=50), nullable=False),
+            sa.Column('TITULO', sa.String(length=100), nullable=False),
+            sa.Column('MONTO_OBJETIVO', sa.Numeric(precision=15, scale=2), nullable=False),
+            sa.Column('MONTO_AHORRADO', sa.Numeric(precision=15, scale=2), nullable=True),
+            sa.Column('FECHA_LIMITE', sa.Date(), nullable=True),
+            sa.Column('ICONO_URL', sa.String(length=255), nullable=True),
+            sa.Column('ESTADO', sa.String(length=20), nullable=True),
+            sa.ForeignKeyConstraint(['USER_UUID'], ['USUARIOS.USER_UUID']),
+            sa.PrimaryKeyConstraint('META_ID'),
+        )),
+        ('GASTOS_MANUALES', (
+            sa.Column('ID_GASTO', sa.Integer(), nullable=False),
+            sa.Column('USER_UUID', sa.String(length=50), nullable=False),
+            sa.Column('MONTO', sa.Numeric(precision=15, scale=2), nullable=False),
+            sa.Column('FECHA_GASTO', sa.DateTime(), nullable=True),
+            sa.Column('CATEGORIA', sa.String(length=40), nullable=False),
+            sa.Column('DESCRIPCION', sa.String(length=100), nullable=True),
+            sa.Column('ES_GASTO_HORMIGA', sa.Boolean(), nullable=True),
+            sa.ForeignKeyConstraint(['CATEGORIA'], ['CATEGORIAS_CONFIG.NOMBRE_CATEGORIA']),
+            sa.ForeignKeyConstraint(['USER_UUID'], ['USUARIOS.USER_UUID']),
+            sa.PrimaryKeyConstraint('ID_GASTO'),
+        )),
+        ('PRESUPUESTOS', (
+            sa.Column('PRESUPUESTO_ID', sa.Integer(), nullable=False),
+            sa.Column('USER_UUID', sa.String(length=50), nullable=False),
+            sa.Column('CATEGORIA', sa.String(length=40), nullable=False),
+            sa.Column('LIMITE_MENSUAL', sa.Numeric(precision=15, scale=2), nullable=False),
+            sa.Column('ALERTA_PORCENTAJE', sa.Integer(), nullable=True, comment='Avisar al llegar al 80%'),
+            sa.ForeignKeyConstraint(['CATEGORIA'], ['CATEGORIAS_CONFIG.NOMBRE_CATEGORIA']),
+            sa.ForeignKeyConstraint(['USER_UUID'], ['USUARIOS.USER_UUID']),
+            sa.PrimaryKeyConstraint('PRESUPUESTO_ID'),
+        )),
+        ('DESGLOSE_MOVIMIENTOS', (
+            sa.Column('ID_DESGLOSE', sa.Integer(), nullable=False),
+            sa.Column('USER_UUID', sa.String(length=50), nullable=False),
+            sa.Column('ID_TRX_MAINFRAME', sa.String(length=26), nullable=False, comment='ID original del retiro en Mainframe'),
+            sa.Column('MONTO_PARCIAL', sa.Numeric(precision=15, scale=2), nullable=False),
+            sa.Column('NUEVA_CATEGORIA', sa.String(length=40), nullable=False, comment='La categoría real del gasto efectivo'),
+            sa.Column('DESCRIPCION_NOTA', sa.String(length=100), nullable=True),
+            sa.Column('FECHA_REGISTRO', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['NUEVA_CATEGORIA'], ['CATEGORIAS_CONFIG.NOMBRE_CATEGORIA']),
+            sa.ForeignKeyConstraint(['USER_UUID'], ['USUARIOS.USER_UUID']),
+            sa.PrimaryKeyConstraint('ID_DESGLOSE'),
+        )),
+    )
+
+
+def upgrade():
+    # BDs creadas antes con db.create_all(): las tablas existentes se dejan como están
+    existentes = set(sa.inspect(op.get_bind()).get_table_names())
+    for nombre, definicion in _tablas():
+        if nombre not in existentes:
+            op.create_table(nombre, *definicion)
+    if 'TOKEN_BLOCKLIST' not in existentes:
+        op.create_index('ix_TOKEN_BLOCKLIST_jti', 'TOKEN_BLOCKLIST', ['jti'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_TOKEN_BLOCKLIST_jti', table_name='TOKEN_BLOCKLIST')
+    for nombre, _ in reversed(_tablas()):
+        op.drop_table(nombre)
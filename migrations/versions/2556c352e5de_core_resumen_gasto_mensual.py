@@ -0,0 +1,45 @@
+"""CORE_RESUMEN_GASTO_MENSUAL: rollup mensual de gastos por cuenta y categoría
+
+Revision ID: 2556c352e5de
+Revises: 5c1d7e9a2f40
+Create Date: 2026-10-17 03:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2556c352e5de'
+down_revision = '5c1d7e9a2f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'CORE_RESUMEN_GASTO_MENSUAL' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'CORE_RESUMEN_GASTO_MENSUAL',
+        sa.Column('NUM_CUENTA', sa.String(length=20), nullable=False),
+        sa.Column('PERIODO', sa.Date(), nullable=False, comment='Primer día del mes'),
+        sa.Column('ID_CATEGORIA', sa.Integer(), autoincrement=False, nullable=False, comment='0 = Sin categoría (movimiento sin MCC)'),
+        sa.Column('COD_CLIENTE', sa.Integer(), nullable=False),
+        sa.Column('TOTAL_DEBITO', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('QTY_PEQUENO', sa.Integer(), nullable=False, comment='Débitos < 50'),
+        sa.Column('QTY_MEDIANO', sa.Integer(), nullable=False, comment='Débitos entre 50 y 200'),
+        sa.Column('QTY_GRANDE', sa.Integer(), nullable=False, comment='Débitos > 200'),
+        sa.Column('QTY_MOVIMIENTOS', sa.Integer(), nullable=False, comment='Débitos y créditos del mes'),
+        sa.Column('UPDATED_AT', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('NUM_CUENTA', 'PERIODO', 'ID_CATEGORIA')
+    )
+    op.create_index('ix_CORE_RESUMEN_GASTO_MENSUAL_COD_CLIENTE_PERIODO', 'CORE_RESUMEN_GASTO_MENSUAL',
+                    ['COD_CLIENTE', 'PERIODO'], unique=False)
+    # El backfill (y la marca de construcción) lo hace 7d2e4b8a6c31_core_rollup_estado
+
+
+def downgrade():
+    op.drop_index('ix_CORE_RESUMEN_GASTO_MENSUAL_COD_CLIENTE_PERIODO', table_name='CORE_RESUMEN_GASTO_MENSUAL')
+    op.drop_table('CORE_RESUMEN_GASTO_MENSUAL')
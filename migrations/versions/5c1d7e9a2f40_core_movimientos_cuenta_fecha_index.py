@@ -0,0 +1,29 @@
+"""CORE_MOVIMIENTOS: índice compuesto (NUM_CUENTA, FECHA_PROCESO)
+
+Revision ID: 5c1d7e9a2f40
+Revises: b3e487e0af6b
+Create Date: 2026-10-17 03:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1d7e9a2f40'
+down_revision = 'b3e487e0af6b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Sirve los filtros por rango de mes de TRX004 y el ORDER BY FECHA_PROCESO de TRX002
+    inspector = sa.inspect(op.get_bind())
+    indices = {i['name'] for i in inspector.get_indexes('CORE_MOVIMIENTOS')}
+    if 'ix_CORE_MOVIMIENTOS_NUM_CUENTA_FECHA_PROCESO' not in indices:
+        op.create_index('ix_CORE_MOVIMIENTOS_NUM_CUENTA_FECHA_PROCESO', 'CORE_MOVIMIENTOS',
+                        ['NUM_CUENTA', 'FECHA_PROCESO'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_CORE_MOVIMIENTOS_NUM_CUENTA_FECHA_PROCESO', table_name='CORE_MOVIMIENTOS')
@@ -0,0 +1,42 @@
+"""USUARIOS: vínculo persistido con el Core (COD_CLIENTE_CORE, VINCULO_VALIDADO_AT)
+
+Revision ID: 6e3b9f18c7d4
+Revises: d41c7b0e9a52
+Create Date: 2026-10-17 05:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e3b9f18c7d4'
+down_revision = 'd41c7b0e9a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Las filas existentes quedan con VINCULO_VALIDADO_AT nulo: se validan en su próximo login
+    # (con el COD_CLIENTE_CORE ya cargado, si el Core no está disponible se usa el vínculo guardado)
+    inspector = sa.inspect(op.get_bind())
+    columnas = {c['name'] for c in inspector.get_columns('USUARIOS')}
+    with op.batch_alter_table('USUARIOS') as batch_op:
+        if 'COD_CLIENTE_CORE' not in columnas:
+            batch_op.add_column(sa.Column('COD_CLIENTE_CORE', sa.String(length=20), nullable=True,
+                                          comment='COD_CLIENTE vinculado en el Core Bancario'))
+        if 'VINCULO_VALIDADO_AT' not in columnas:
+            batch_op.add_column(sa.Column('VINCULO_VALIDADO_AT', sa.DateTime(), nullable=True,
+                                          comment='Última validación del vínculo contra el Core Bancario'))
+
+    # El registro guarda str(cod_cliente) del Core como USER_UUID: es el vínculo de los usuarios existentes
+    op.execute(
+        'UPDATE "USUARIOS" SET "COD_CLIENTE_CORE" = "USER_UUID" '
+        'WHERE "COD_CLIENTE_CORE" IS NULL AND LENGTH("USER_UUID") <= 20'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('USUARIOS') as batch_op:
+        batch_op.drop_column('VINCULO_VALIDADO_AT')
+        batch_op.drop_column('COD_CLIENTE_CORE')
@@ -0,0 +1,70 @@
+"""CORE_ROLLUP_ESTADO: marca de construcción del rollup y backfill de CORE_RESUMEN_GASTO_MENSUAL
+
+Revision ID: 7d2e4b8a6c31
+Revises: 9c4e2a7d1f06
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2e4b8a6c31'
+down_revision = '9c4e2a7d1f06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'CORE_ROLLUP_ESTADO' not in inspector.get_table_names():
+        op.create_table(
+            'CORE_ROLLUP_ESTADO',
+            sa.Column('TABLA', sa.String(length=60), nullable=False),
+            sa.Column('CONSTRUIDO_AT', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('TABLA')
+        )
+
+    # Sin marca, el rollup puede estar vacío (BD creada con create_all) o tener solo las filas que
+    # agregó el listener desde su creación: se reconstruye completo desde CORE_MOVIMIENTOS
+    construido = op.get_bind().execute(sa.text(
+        'SELECT 1 FROM "CORE_ROLLUP_ESTADO" WHERE "TABLA" = \'CORE_RESUMEN_GASTO_MENSUAL\''
+    )).first()
+    if construido is None:
+        op.execute('DELETE FROM "CORE_RESUMEN_GASTO_MENSUAL"')
+        _poblar_desde_movimientos()
+        op.execute(
+            'INSERT INTO "CORE_ROLLUP_ESTADO" ("TABLA", "CONSTRUIDO_AT") '
+            'VALUES (\'CORE_RESUMEN_GASTO_MENSUAL\', CURRENT_TIMESTAMP)'
+        )
+
+
+def _poblar_desde_movimientos():
+    """
+    Backfill del rollup con los movimientos existentes (mismo cálculo que
+    ResumenGastoService.reconstruir, equivalente a `flask analytics rebuild-rollup`).
+    Umbrales por tamaño: Pequeño (< 50), Mediano (50-200), Grande (> 200); 0 = sin categoría.
+    """
+    if op.get_bind().dialect.name == 'postgresql':
+        periodo = 'CAST(DATE_TRUNC(\'month\', m."FECHA_PROCESO") AS DATE)'
+    else:
+        periodo = 'DATE(m."FECHA_PROCESO", \'start of month\')'
+    op.execute(f"""
+        INSERT INTO "CORE_RESUMEN_GASTO_MENSUAL" ("NUM_CUENTA", "PERIODO", "ID_CATEGORIA", "COD_CLIENTE",
+            "TOTAL_DEBITO", "QTY_PEQUENO", "QTY_MEDIANO", "QTY_GRANDE", "QTY_MOVIMIENTOS", "UPDATED_AT")
+        SELECT m."NUM_CUENTA", {periodo}, COALESCE(mcc."ID_CATEGORIA", 0), c."COD_CLIENTE",
+            SUM(CASE WHEN m."TIPO_MOV" = 'D' THEN m."MONTO" ELSE 0 END),
+            SUM(CASE WHEN m."TIPO_MOV" = 'D' AND m."MONTO" < 50 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN m."TIPO_MOV" = 'D' AND m."MONTO" BETWEEN 50 AND 200 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN m."TIPO_MOV" = 'D' AND m."MONTO" > 200 THEN 1 ELSE 0 END),
+            COUNT(*), CURRENT_TIMESTAMP
+        FROM "CORE_MOVIMIENTOS" m
+        JOIN "CORE_CUENTAS" c ON c."NUM_CUENTA" = m."NUM_CUENTA"
+        LEFT JOIN "CORE_MCC" mcc ON mcc."COD_MCC" = m."COD_COMERCIO"
+        GROUP BY m."NUM_CUENTA", {periodo}, COALESCE(mcc."ID_CATEGORIA", 0), c."COD_CLIENTE"
+    """)
+
+
+def downgrade():
+    op.drop_table('CORE_ROLLUP_ESTADO')
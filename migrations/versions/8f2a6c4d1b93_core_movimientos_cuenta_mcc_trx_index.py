@@ -0,0 +1,29 @@
+"""CORE_MOVIMIENTOS: índice compuesto (NUM_CUENTA, COD_COMERCIO, ID_TRX)
+
+Revision ID: 8f2a6c4d1b93
+Revises: 2556c352e5de
+Create Date: 2026-10-17 04:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2a6c4d1b93'
+down_revision = '2556c352e5de'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Paginación keyset de TRX003: cada página es una búsqueda acotada por (cuenta, MCC, ID_TRX < cursor)
+    inspector = sa.inspect(op.get_bind())
+    indices = {i['name'] for i in inspector.get_indexes('CORE_MOVIMIENTOS')}
+    if 'ix_CORE_MOVIMIENTOS_NUM_CUENTA_COD_COMERCIO_ID_TRX' not in indices:
+        op.create_index('ix_CORE_MOVIMIENTOS_NUM_CUENTA_COD_COMERCIO_ID_TRX', 'CORE_MOVIMIENTOS',
+                        ['NUM_CUENTA', 'COD_COMERCIO', 'ID_TRX'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_CORE_MOVIMIENTOS_NUM_CUENTA_COD_COMERCIO_ID_TRX', table_name='CORE_MOVIMIENTOS')
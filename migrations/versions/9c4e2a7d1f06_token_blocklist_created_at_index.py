@@ -0,0 +1,29 @@
+"""TOKEN_BLOCKLIST: índice en created_at (sincronización incremental del filtro de revocados)
+
+Revision ID: 9c4e2a7d1f06
+Revises: 6e3b9f18c7d4
+Create Date: 2026-10-17 06:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e2a7d1f06'
+down_revision = '6e3b9f18c7d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Cada worker consulta `created_at >= <watermark>` cada JWT_BLOCKLIST_SYNC_SECONDS:
+    # sin índice es un recorrido completo de la tabla
+    inspector = sa.inspect(op.get_bind())
+    indices = {i['name'] for i in inspector.get_indexes('TOKEN_BLOCKLIST')}
+    if 'ix_TOKEN_BLOCKLIST_created_at' not in indices:
+        op.create_index('ix_TOKEN_BLOCKLIST_created_at', 'TOKEN_BLOCKLIST', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_TOKEN_BLOCKLIST_created_at', table_name='TOKEN_BLOCKLIST')
@@ -0,0 +1,36 @@
+"""TOKEN_BLOCKLIST: columna expires_at para compactar tokens expirados
+
+Revision ID: b3e487e0af6b
+Revises: 0a1f3c5e7b29
+Create Date: 2026-10-17 02:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e487e0af6b'
+down_revision = '0a1f3c5e7b29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # En una BD creada con db.create_all() la columna ya puede existir.
+    inspector = sa.inspect(op.get_bind())
+    columnas = {c['name'] for c in inspector.get_columns('TOKEN_BLOCKLIST')}
+    if 'expires_at' not in columnas:
+        with op.batch_alter_table('TOKEN_BLOCKLIST') as batch_op:
+            batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True,
+                                          comment='Expiración del token (claim exp). Pasada esta fecha la fila se puede eliminar'))
+
+    indices = {i['name'] for i in inspector.get_indexes('TOKEN_BLOCKLIST')}
+    if 'ix_TOKEN_BLOCKLIST_expires_at' not in indices:
+        op.create_index('ix_TOKEN_BLOCKLIST_expires_at', 'TOKEN_BLOCKLIST', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_TOKEN_BLOCKLIST_expires_at', table_name='TOKEN_BLOCKLIST')
+    with op.batch_alter_table('TOKEN_BLOCKLIST') as batch_op:
+        batch_op.drop_column('expires_at')
@@ -0,0 +1,38 @@
+"""Índices de búsqueda del esquema core: CLIENTES.DNI_RUC, CUENTAS.COD_CLIENTE, MCC.ID_CATEGORIA
+
+Revision ID: d41c7b0e9a52
+Revises: 8f2a6c4d1b93
+Create Date: 2026-10-17 04:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c7b0e9a52'
+down_revision = '8f2a6c4d1b93'
+branch_labels = None
+depends_on = None
+
+INDICES = (
+    # (tabla, índice, columnas)
+    ('CORE_CLIENTES', 'ix_CORE_CLIENTES_DNI_RUC', ['DNI_RUC']),
+    ('CORE_CUENTAS', 'ix_CORE_CUENTAS_COD_CLIENTE_NUM_CUENTA', ['COD_CLIENTE', 'NUM_CUENTA']),
+    ('CORE_MCC', 'ix_CORE_MCC_ID_CATEGORIA', ['ID_CATEGORIA']),
+)
+
+
+def upgrade():
+    # CORE_MOVIMIENTOS.NUM_CUENTA ya queda cubierto por el prefijo de
+    # ix_CORE_MOVIMIENTOS_NUM_CUENTA_FECHA_PROCESO (revisión 5c1d7e9a2f40)
+    inspector = sa.inspect(op.get_bind())
+    for tabla, indice, columnas in INDICES:
+        existentes = {i['name'] for i in inspector.get_indexes(tabla)}
+        if indice not in existentes:
+            op.create_index(indice, tabla, columnas, unique=False)
+
+
+def downgrade():
+    for tabla, indice, _ in reversed(INDICES):
+        op.drop_index(indice, table_name=tabla)
@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.services.bulk_load_service import BulkLoadService, TABLAS_CORE
+from app.services.generador_datos import GeneradorDatosCore
+
+
+@pytest.fixture
+def app(request):
+    """
+    App de pruebas (TestingConfig): SQLite en memoria con el esquema de los modelos.
+    `@pytest.mark.config(CLAVE=valor)` sobrescribe valores de configuración.
+    """
+    marca = request.node.get_closest_marker('config')
+    config = type('ConfigPrueba', (TestingConfig,), marca.kwargs) if marca else TestingConfig
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def generador():
+    return GeneradorDatosCore(clientes=12, movimientos_por_cuenta=40, semilla=7)
+
+
+def cargar_core(generador):
+    """Carga masiva de las tablas CORE_* sintéticas (sin reconstruir el rollup)."""
+    for tabla in TABLAS_CORE:
+        BulkLoadService.cargar(tabla, generador.filas(tabla))
+
+
+@pytest.fixture
+def datos_core(app, generador):
+    """Tablas CORE_* sembradas como tras `flask core generate` (rollup reconstruido)."""
+    cargar_core(generador)
+    BulkLoadService.despues_de_cargar(TABLAS_CORE)
+    return generador
+
+
+def dni_de(cod_cliente):
+    """DNI sintético del cliente (GeneradorDatosCore)."""
+    return f"{40000000 + cod_cliente:08d}"
+
+
+def iniciar_sesion(client, cod_cliente, password='clave-de-prueba'):
+    """Registra (si hace falta) y hace login del cliente; retorna las cabeceras con el token."""
+    dni = dni_de(cod_cliente)
+    client.post('/auth/register', json={'dni': dni, 'password': password})
+    respuesta = client.post('/auth/login', json={'dni': dni, 'password': password})
+    assert respuesta.status_code == 200, respuesta.get_data(as_text=True)
+    return {'Authorization': f"Bearer {respuesta.get_json()['access_token']}"}
+
+
+@pytest.fixture
+def contar_sql(app):
+    """Lista de sentencias SQL ejecutadas mientras el test la observa."""
+    sentencias = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield sentencias
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,44 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import inspect
+
+from app.extensions import db
+from app.services.bulk_load_service import BulkLoadService, IndicesNoReconstruidosError
+
+
+def _indices(tabla):
+    return {i['name'] for i in inspect(db.engine).get_indexes(tabla)}
+
+
+def _cliente(cod_cliente, dni):
+    return {'COD_CLIENTE': cod_cliente, 'DNI_RUC': dni, 'NOMBRES': 'Ana', 'APELLIDOS': 'Quispe',
+            'FECHA_NAC': date(1990, 1, 1)}
+
+
+def test_carga_fallida_reconstruye_indices_y_propaga_el_error(app):
+    esperados = _indices('CORE_CLIENTES')
+
+    def filas():
+        yield _cliente(1, '40000001')
+        raise RuntimeError('archivo truncado')
+
+    with pytest.raises(RuntimeError, match='archivo truncado'):
+        BulkLoadService.cargar('CORE_CLIENTES', filas())
+    assert _indices('CORE_CLIENTES') == esperados
+
+
+def test_indice_unico_que_no_se_puede_reconstruir(app, monkeypatch):
+    tabla = BulkLoadService.tabla('CORE_CLIENTES')
+    indice = next(i for i in tabla.indexes if i.name == 'ix_CORE_CLIENTES_DNI_RUC')
+    monkeypatch.setattr(indice, 'unique', True)
+
+    with pytest.raises(IndicesNoReconstruidosError) as error:
+        BulkLoadService.cargar('CORE_CLIENTES', [_cliente(1, '40000001'), _cliente(2, '40000001')])
+    assert [nombre for nombre, _ in error.value.indices] == ['ix_CORE_CLIENTES_DNI_RUC']
+    assert 'ix_CORE_CLIENTES_DNI_RUC' not in _indices('CORE_CLIENTES')
+
+
+def test_csv_del_copy_distingue_vacio_de_null():
+    campos = [BulkLoadService._campo_csv(v) for v in (None, '', 'a"b', 12)]
+    assert campos == ['', '""', '"a""b"', '"12"']
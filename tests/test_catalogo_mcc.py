@@ -0,0 +1,76 @@
+import threading
+import time
+
+from sqlalchemy import event
+
+from app.extensions import catalogo_mcc, db
+from app.models.core_banking import CategoriaCore, MccCore
+
+
+def _nuevo_mcc(cod_mcc='9999'):
+    categoria = CategoriaCore.query.first()
+    db.session.add(MccCore(cod_mcc=cod_mcc, descripcion='Prueba', id_categoria=categoria.id_categoria))
+
+
+def test_se_invalida_al_confirmar_no_en_el_flush(app, datos_core):
+    version = catalogo_mcc.version
+    _nuevo_mcc()
+    db.session.flush()
+    assert not catalogo_mcc._vencido()
+
+    db.session.commit()
+    assert catalogo_mcc._vencido()
+    assert catalogo_mcc.version == version + 1
+    assert catalogo_mcc.id_categoria_de('9999') is not None
+
+
+def test_rollback_no_invalida(app, datos_core):
+    catalogo_mcc.version
+    _nuevo_mcc()
+    db.session.flush()
+    db.session.rollback()
+    assert not catalogo_mcc._vencido()
+    db.session.commit()
+    assert not catalogo_mcc._vencido()
+
+
+def test_recarga_que_leyo_antes_del_commit_no_queda_vigente(app, datos_core):
+    invalidado = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Otro request confirma un cambio mientras esta recarga lee CORE_MCC
+        if 'CORE_MCC' in statement and not invalidado:
+            invalidado.append(True)
+            catalogo_mcc.invalidar()
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        catalogo_mcc.refrescar()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert invalidado and catalogo_mcc._vencido()
+
+
+def test_una_sola_recarga_concurrente(app, datos_core, monkeypatch):
+    catalogo_mcc.version
+    catalogo_mcc.invalidar()
+    recargas = []
+    refrescar = catalogo_mcc.refrescar
+
+    def refrescar_lento():
+        recargas.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return refrescar()
+
+    monkeypatch.setattr(catalogo_mcc, 'refrescar', refrescar_lento)
+
+    def usar_catalogo():
+        with app.app_context():
+            catalogo_mcc.categoria_de('5411')
+
+    hilos = [threading.Thread(target=usar_catalogo) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert len(recargas) == 1
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def _breaker_half_open(**kwargs):
+    """Breaker que se abre con una sola falla y pasa a HALF_OPEN de inmediato."""
+    breaker = CircuitBreaker('TRX_TEST', window_size=1, min_calls=1, open_seconds=0, **kwargs)
+
+    def falla():
+        raise RuntimeError('Mainframe caído')
+
+    with pytest.raises(RuntimeError):
+        breaker.llamar(falla)
+    assert breaker.estado == CircuitBreaker.HALF_OPEN
+    return breaker
+
+
+def test_cancelar_llamada_de_prueba_no_bloquea_el_breaker():
+    breaker = _breaker_half_open()
+
+    async def lenta():
+        await asyncio.sleep(1)
+
+    async def escenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(breaker.llamar_async(lenta), 0.05)
+
+    asyncio.run(escenario())
+
+    snapshot = breaker.snapshot()
+    assert snapshot["estado"] == CircuitBreaker.HALF_OPEN
+    assert snapshot["en_vuelo"] == 0
+    assert snapshot["totales"]["canceladas"] == 1
+    # La siguiente llamada (síncrona o async) vuelve a ser la de prueba y cierra el breaker
+    assert breaker.llamar(lambda: 'ok') == 'ok'
+    assert breaker.estado == CircuitBreaker.CLOSED
+
+
+def test_cancelar_espera_del_bulkhead_libera_la_prueba():
+    breaker = _breaker_half_open(max_concurrent=1, bulkhead_timeout=1)
+    breaker._semaforo.acquire()  # cupo ocupado por otra llamada en vuelo
+
+    async def rapida():
+        return 'ok'
+
+    async def escenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(breaker.llamar_async(rapida), 0.05)
+
+    asyncio.run(escenario())
+    breaker._semaforo.release()
+
+    assert breaker.snapshot()["totales"]["canceladas"] == 1
+    assert asyncio.run(breaker.llamar_async(rapida)) == 'ok'
+    assert breaker.estado == CircuitBreaker.CLOSED
+
+
+def test_llamada_de_prueba_en_curso_rechaza_las_demas():
+    breaker = _breaker_half_open()
+    assert breaker._permitir()  # toma la llamada de prueba
+    with pytest.raises(CircuitOpenError):
+        breaker.llamar(lambda: 'ok')
@@ -0,0 +1,101 @@
+"""TRX003: paginación keyset con cursor firmado (meta.next_cursor)."""
+from itsdangerous import URLSafeSerializer
+from sqlalchemy import func
+
+from app.extensions import catalogo_mcc, db
+from app.models.core_banking import Cuenta, Movimiento, MccCore
+
+from conftest import iniciar_sesion
+
+COD_CLIENTE = 1  # cliente con dos cuentas en GeneradorDatosCore(semilla=7)
+
+
+def _cuentas(cod_cliente):
+    return [c.num_cuenta for c in Cuenta.query.filter_by(cod_cliente=cod_cliente).order_by(Cuenta.num_cuenta)]
+
+
+def _categorias_por_uso(num_cuenta):
+    """IDs de categoría de la cuenta, de la más usada a la menos usada."""
+    filas = db.session.query(MccCore.id_categoria).join(
+        Movimiento, Movimiento.cod_comercio == MccCore.cod_mcc
+    ).filter(Movimiento.num_cuenta == num_cuenta).group_by(
+        MccCore.id_categoria
+    ).order_by(func.count().desc(), MccCore.id_categoria).all()
+    return [fila.id_categoria for fila in filas]
+
+
+def _detalle(num_cuenta, id_categoria, page_size=2):
+    return f'/api/v1/accounts/{num_cuenta}/details?category_id={id_categoria}&page_size={page_size}'
+
+
+def _recorrer(client, cabeceras, url, parametro):
+    """Todas las páginas siguiendo `cursor` (next_cursor) o `last_id` (último id recibido)."""
+    paginas = []
+    siguiente = None
+    while True:
+        respuesta = client.get(f'{url}&{parametro}={siguiente}' if siguiente else url, headers=cabeceras)
+        assert respuesta.status_code == 200, respuesta.get_data(as_text=True)
+        cuerpo = respuesta.get_json()
+        paginas.append([mov['id_transaccion'] for mov in cuerpo['data']])
+        if not cuerpo['meta']['has_more']:
+            assert cuerpo['meta']['next_cursor'] is None
+            return paginas
+        siguiente = cuerpo['meta']['next_cursor'] if parametro == 'cursor' else cuerpo['data'][-1]['id_transaccion']
+
+
+def test_keyset_con_cursor_igual_a_last_id(app, client, datos_core):
+    cabeceras = iniciar_sesion(client, COD_CLIENTE)
+    num_cuenta = _cuentas(COD_CLIENTE)[0]
+    id_categoria = _categorias_por_uso(num_cuenta)[0]
+    url = _detalle(num_cuenta, id_categoria)
+
+    con_cursor = _recorrer(client, cabeceras, url, 'cursor')
+    con_last_id = _recorrer(client, cabeceras, url, 'last_id')
+    assert len(con_cursor) > 1
+    assert con_cursor == con_last_id
+
+    esperados = [fila.id_trx for fila in db.session.query(Movimiento.id_trx).join(
+        MccCore, Movimiento.cod_comercio == MccCore.cod_mcc
+    ).filter(
+        Movimiento.num_cuenta == num_cuenta, MccCore.id_categoria == id_categoria
+    ).order_by(Movimiento.id_trx.desc())]
+    assert [id_trx for pagina in con_cursor for id_trx in pagina] == esperados
+
+
+def test_cursor_alterado_responde_400(app, client, datos_core):
+    cabeceras = iniciar_sesion(client, COD_CLIENTE)
+    num_cuenta = _cuentas(COD_CLIENTE)[0]
+    id_categoria = _categorias_por_uso(num_cuenta)[0]
+    url = _detalle(num_cuenta, id_categoria)
+    cursor = client.get(url, headers=cabeceras).get_json()['meta']['next_cursor']
+    payload, firma = cursor.rsplit('.', 1)
+
+    # Otro last_id con la firma original
+    otro_payload = URLSafeSerializer('otra-clave', salt='trx003-cursor').dumps(
+        [num_cuenta, f'id:{id_categoria}', 'ZZZZZZZZZZ']
+    ).rsplit('.', 1)[0]
+    # Un carácter de la firma cambiado (no el último: sus bits de relleno en base64 pueden no alterarla)
+    otra_firma = firma[:5] + ('A' if firma[5] != 'A' else 'B') + firma[6:]
+
+    for valor in (f'{otro_payload}.{firma}', f'{payload}.{otra_firma}', 'no-es-un-cursor'):
+        respuesta = client.get(f'{url}&cursor={valor}', headers=cabeceras)
+        assert respuesta.status_code == 400
+        assert 'data' not in respuesta.get_json()
+
+
+def test_cursor_de_otra_cuenta_o_categoria_se_rechaza(app, client, datos_core):
+    cabeceras = iniciar_sesion(client, COD_CLIENTE)
+    cuenta, otra_cuenta = _cuentas(COD_CLIENTE)
+    categoria, otra_categoria = _categorias_por_uso(cuenta)[:2]
+    cursor = client.get(_detalle(cuenta, categoria), headers=cabeceras).get_json()['meta']['next_cursor']
+    assert client.get(f'{_detalle(cuenta, categoria)}&cursor={cursor}', headers=cabeceras).status_code == 200
+
+    for url in (
+        _detalle(otra_cuenta, categoria),
+        _detalle(cuenta, otra_categoria),
+        # La misma categoría filtrada por nombre en lugar de id
+        f'/api/v1/accounts/{cuenta}/details?category={catalogo_mcc.nombre_categoria(categoria)}&page_size=2',
+    ):
+        respuesta = client.get(f'{url}&cursor={cursor}', headers=cabeceras)
+        assert respuesta.status_code == 400
+        assert 'no corresponde' in respuesta.get_json()['msg']
@@ -0,0 +1,40 @@
+from app.extensions import core_cache
+from app.models.core_banking import Cuenta
+
+from conftest import iniciar_sesion
+
+
+def _num_cuenta(cod_cliente):
+    return Cuenta.query.filter_by(cod_cliente=cod_cliente).order_by(Cuenta.num_cuenta).first().num_cuenta
+
+
+def test_con_cache_trx001_y_trx002_no_consultan_el_core(app, client, datos_core, contar_sql):
+    core_cache.enabled = True
+    cabeceras = iniciar_sesion(client, 1)
+    rutas = ('/api/v1/products', f'/api/v1/accounts/{_num_cuenta(1)}/summary')
+
+    etags = {}
+    for ruta in rutas:
+        respuesta = client.get(ruta, headers=cabeceras)
+        assert respuesta.status_code == 200
+        etags[ruta] = respuesta.headers['ETag']
+
+    contar_sql.clear()
+    for ruta in rutas:
+        repetida = client.get(ruta, headers=cabeceras)
+        assert repetida.status_code == 200
+        assert repetida.headers['ETag'] == etags[ruta]
+        no_modificada = client.get(ruta, headers={**cabeceras, 'If-None-Match': etags[ruta]})
+        assert no_modificada.status_code == 304
+    assert not [s for s in contar_sql if 'CORE_CUENTAS' in s or 'CORE_MOVIMIENTOS' in s]
+
+
+def test_sin_cache_etag_por_marcador_de_version(app, client, datos_core, contar_sql):
+    cabeceras = iniciar_sesion(client, 2)
+    ruta = f'/api/v1/accounts/{_num_cuenta(2)}/summary'
+    etag = client.get(ruta, headers=cabeceras).headers['ETag']
+
+    contar_sql.clear()
+    assert client.get(ruta, headers={**cabeceras, 'If-None-Match': etag}).status_code == 304
+    # Solo el marcador (saldo y último ID_TRX), sin los movimientos de TRX002
+    assert len([s for s in contar_sql if 'CORE_MOVIMIENTOS' in s]) == 1
@@ -0,0 +1,27 @@
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db, metricas
+from app.services.metricas_rendimiento import _acumulador
+
+
+def test_sentencia_fallida_no_desfasa_el_tiempo_de_bd(app):
+    metricas._antes_del_request()
+    try:
+        acumulador = _acumulador.get()
+        conexion = db.session.connection()
+
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conexion.execute(text('SELECT * FROM TABLA_INEXISTENTE'))
+        time.sleep(0.2)
+        conexion.execute(text('SELECT 1'))
+
+        assert acumulador.sentencias == 1
+        assert acumulador.segundos_db < 0.2
+        assert 'metricas_inicio' not in conexion.info
+    finally:
+        metricas._al_terminar_request()
@@ -0,0 +1,26 @@
+from app.models.core_banking import Cliente, Movimiento
+from app.services.plan_check_service import PlanCheckService, TABLAS_GRANDES
+
+
+def test_consultas_del_core_sin_recorridos_secuenciales(app):
+    resultados = PlanCheckService.verificar()
+
+    casos = {r["caso"] for r in resultados}
+    assert any(c.startswith("TRX003") for c in casos)
+    assert any(c.startswith("TRX004") for c in casos)
+    con_recorrido = [f"{r['caso']}: {', '.join(r['recorridos'])}\n{r['plan']}" for r in resultados if r["recorridos"]]
+    assert not con_recorrido, "\n\n".join(con_recorrido)
+
+
+def test_verificar_no_deja_datos(app):
+    PlanCheckService.verificar()
+    assert Cliente.query.count() == 0
+    assert Movimiento.query.count() == 0
+
+
+def test_detecta_recorrido_secuencial(app):
+    # Sin filtro por columna indexada la consulta recorre la tabla completa: el chequeo debe reportarlo
+    plan, recorridos = PlanCheckService._explicar(
+        'SELECT * FROM "CORE_MOVIMIENTOS" WHERE glosa_trx = ?', ('x',), TABLAS_GRANDES
+    )
+    assert recorridos == ['CORE_MOVIMIENTOS'], plan
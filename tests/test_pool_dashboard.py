@@ -0,0 +1,36 @@
+import threading
+
+import pytest
+
+from app.extensions import dashboard_pool
+from app.services.core_banking_service import CoreBankingService
+
+from conftest import iniciar_sesion
+
+
+@pytest.fixture
+def hilos_core(monkeypatch):
+    """Nombres de los hilos donde corren las transacciones del Core simulado."""
+    hilos = []
+    original = CoreBankingService.en_contexto
+
+    def en_contexto(app, func, *args):
+        hilos.append(threading.current_thread().name)
+        return original(app, func, *args)
+
+    monkeypatch.setattr(CoreBankingService, 'en_contexto', staticmethod(en_contexto))
+    return hilos
+
+
+def test_dashboard_usa_el_pool_compartido(app, client, datos_core, hilos_core):
+    cabeceras = iniciar_sesion(client, 1)
+    assert client.get('/api/v1/dashboard', headers=cabeceras).status_code == 200
+    assert hilos_core and all(nombre.startswith('dashboard') for nombre in hilos_core)
+
+
+@pytest.mark.config(PRODUCTS_VIEWS_MODE='async', DASHBOARD_MAX_WORKERS=2)
+def test_dashboard_async_usa_el_pool_compartido(app, client, datos_core, hilos_core):
+    cabeceras = iniciar_sesion(client, 1)
+    assert client.get('/api/v1/dashboard', headers=cabeceras).status_code == 200
+    assert hilos_core and all(nombre.startswith('dashboard') for nombre in hilos_core)
+    assert len(set(hilos_core)) <= dashboard_pool.max_workers == 2
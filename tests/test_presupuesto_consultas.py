@@ -0,0 +1,87 @@
+"""
+Endpoints bajo la guardia de consultas (TestingConfig: QUERY_GUARD_MODE='raise').
+Un endpoint que excede su presupuesto de QUERY_BUDGETS o repite una sentencia (N+1)
+lanza QueryBudgetError y la prueba falla.
+"""
+import pytest
+
+from app.extensions import db, guardia_consultas
+from sqlalchemy import func
+
+from app.models.core_banking import Cliente, Cuenta, Movimiento, MccCore
+from app.services.guardia_consultas import QueryBudgetError
+
+from conftest import dni_de, iniciar_sesion
+
+
+def _num_cuenta(cod_cliente):
+    return Cuenta.query.filter_by(cod_cliente=cod_cliente).order_by(Cuenta.num_cuenta).first().num_cuenta
+
+
+def _categoria_con_movimientos(num_cuenta):
+    """Categoría con más movimientos de la cuenta (para recorrer al menos dos páginas)."""
+    return db.session.query(MccCore.id_categoria).join(
+        Movimiento, Movimiento.cod_comercio == MccCore.cod_mcc
+    ).filter(Movimiento.num_cuenta == num_cuenta).group_by(
+        MccCore.id_categoria
+    ).order_by(func.count().desc()).limit(1).scalar()
+
+
+def _recorrer_endpoints(client, cod_cliente):
+    """Registro, login, productos (TRX001-TRX004, dashboard, exportación) y logout del cliente."""
+    dni = dni_de(cod_cliente)
+    assert client.post('/auth/register', json={'dni': dni, 'password': 'clave-de-prueba'}).status_code == 201
+    cabeceras = iniciar_sesion(client, cod_cliente)
+    num_cuenta = _num_cuenta(cod_cliente)
+    detalle = f'/api/v1/accounts/{num_cuenta}/details?category_id={_categoria_con_movimientos(num_cuenta)}&page_size=2'
+
+    assert client.get('/api/v1/products', headers=cabeceras).status_code == 200
+    assert client.get(f'/api/v1/accounts/{num_cuenta}/summary', headers=cabeceras).status_code == 200
+
+    pagina = client.get(detalle, headers=cabeceras)
+    assert pagina.status_code == 200
+    cursor = pagina.get_json()['meta']['next_cursor']
+    assert cursor
+    assert client.get(f'{detalle}&cursor={cursor}', headers=cabeceras).status_code == 200
+
+    assert client.get('/api/v1/financial-personality', headers=cabeceras).status_code == 200
+    assert client.get('/api/v1/dashboard', headers=cabeceras).status_code == 200
+    exportacion = client.get(f'/api/v1/accounts/{num_cuenta}/export?format=csv', headers=cabeceras)
+    assert exportacion.status_code == 200
+    exportacion.get_data()
+
+    assert client.post('/auth/logout', headers=cabeceras).status_code == 200
+
+
+def test_endpoints_dentro_del_presupuesto(app, client, datos_core):
+    _recorrer_endpoints(client, 1)
+    stats = guardia_consultas.stats()
+    assert stats["modo"] == 'raise'
+    assert stats["requests_revisados"] >= 11
+    assert stats["violaciones"] == 0
+
+
+@pytest.mark.config(PRODUCTS_VIEWS_MODE='async')
+def test_endpoints_async_dentro_del_presupuesto(app, client, datos_core):
+    _recorrer_endpoints(client, 2)
+    assert guardia_consultas.stats()["violaciones"] == 0
+
+
+@pytest.mark.config(QUERY_BUDGETS={'products.get_global_position': 1})
+def test_endpoint_que_excede_su_presupuesto_falla(app, client, datos_core):
+    cabeceras = iniciar_sesion(client, 1)
+    with pytest.raises(QueryBudgetError, match='products.get_global_position'):
+        client.get('/api/v1/products', headers=cabeceras)
+
+
+def test_bloque_detecta_n_mas_1(app, datos_core):
+    with pytest.raises(QueryBudgetError, match='posible N\\+1'):
+        with guardia_consultas.bloque('cuentas por cliente'):
+            for cliente in Cliente.query.all():
+                db.session.query(Cuenta).filter(Cuenta.cod_cliente == cliente.cod_cliente).all()
+
+
+def test_bloque_dentro_del_presupuesto(app, datos_core):
+    with guardia_consultas.bloque('cuentas con join', presupuesto=1) as conteo:
+        db.session.query(Cuenta).join(Cliente, Cliente.cod_cliente == Cuenta.cod_cliente).all()
+    assert conteo.total == 1
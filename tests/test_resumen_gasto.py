@@ -0,0 +1,52 @@
+from datetime import datetime
+from decimal import Decimal
+
+from app.extensions import db
+from app.models.core_banking import Cuenta, Movimiento, ResumenGastoMensual
+from app.services.core_banking_service import CoreBankingService
+from app.services.resumen_gasto_service import ResumenGastoService
+
+from conftest import cargar_core
+
+
+def _metricas(cod_cliente):
+    return CoreBankingService.obtener_metricas_financieras(cod_cliente)["METRICAS-GASTO"]
+
+
+def _esperadas(cod_cliente):
+    return CoreBankingService._metricas_desde_movimientos(cod_cliente, datetime.now())["METRICAS-GASTO"]
+
+
+def _insertar_movimiento(cod_cliente, id_trx):
+    cuenta = Cuenta.query.filter_by(cod_cliente=cod_cliente).order_by(Cuenta.num_cuenta).first()
+    db.session.add(Movimiento(id_trx=id_trx, num_cuenta=cuenta.num_cuenta, fecha_proceso=datetime.now(),
+                              tipo_mov='D', monto=Decimal('75'), glosa_trx='Prueba', cod_comercio='5411'))
+    db.session.commit()
+
+
+def test_rollup_sin_construir_no_se_mantiene_ni_se_lee(app, generador):
+    cargar_core(generador)  # carga masiva sin reconstruir el rollup (BD creada con create_all)
+    assert not ResumenGastoService.construido()
+
+    _insertar_movimiento(1, 'TEST0000000000000000001')
+
+    assert ResumenGastoMensual.query.count() == 0
+    assert _metricas(1) == _esperadas(1)
+
+
+def test_rollup_construido_coincide_con_movimientos(app, generador):
+    cargar_core(generador)
+    ResumenGastoService.reconstruir()
+    assert ResumenGastoService.construido()
+
+    _insertar_movimiento(1, 'TEST0000000000000000002')
+
+    for cod_cliente in (1, 2, 3):
+        assert _metricas(cod_cliente) == _esperadas(cod_cliente)
+    assert CoreBankingService.version_metricas(1) != CoreBankingService.version_metricas(2)
+
+
+def test_reconstruir_un_cliente_no_marca_el_rollup(app, generador):
+    cargar_core(generador)
+    ResumenGastoService.reconstruir(1)
+    assert not ResumenGastoService.construido()
@@ -0,0 +1,56 @@
+"""Filtro en memoria de tokens revocados (RevokedTokenFilter) sincronizado desde TOKEN_BLOCKLIST."""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import decode_token
+
+from app.extensions import db, revoked_tokens
+from app.models.mobile_app import TokenBlocklist
+
+from conftest import iniciar_sesion
+
+
+def _revocar_en_otro_worker(jti, created_at):
+    """Fila insertada por el logout de otro proceso (sin pasar por el filtro de este)."""
+    db.session.add(TokenBlocklist(jti=jti, created_at=created_at, expires_at=datetime.utcnow() + timedelta(hours=1)))
+    db.session.commit()
+
+
+@pytest.mark.config(JWT_BLOCKLIST_SYNC_SECONDS=0, JWT_BLOCKLIST_SYNC_OVERLAP_SECONDS=30)
+def test_revocacion_de_otro_worker_se_ve_tras_sincronizar(app, client, datos_core):
+    cabeceras = iniciar_sesion(client, 1)
+    assert client.get('/api/v1/products', headers=cabeceras).status_code == 200
+    watermark = revoked_tokens._watermark
+    assert watermark is not None
+
+    # Confirmada con retraso: created_at anterior al watermark, pero dentro del margen
+    jti = decode_token(cabeceras['Authorization'].split()[1])['jti']
+    _revocar_en_otro_worker(jti, watermark - timedelta(seconds=10))
+    assert client.get('/api/v1/products', headers=cabeceras).status_code == 401
+    assert revoked_tokens.esta_revocado(jti)
+
+
+@pytest.mark.config(JWT_BLOCKLIST_SYNC_SECONDS=0, JWT_BLOCKLIST_SYNC_OVERLAP_SECONDS=30)
+def test_sincronizacion_lee_desde_el_watermark_menos_el_margen(app, datos_core):
+    revoked_tokens.sincronizar()
+    watermark = revoked_tokens._watermark
+    dentro, fuera = str(uuid.uuid4()), str(uuid.uuid4())
+    _revocar_en_otro_worker(dentro, watermark - timedelta(seconds=29))
+    _revocar_en_otro_worker(fuera, watermark - timedelta(seconds=31))
+
+    revoked_tokens.sincronizar()
+    assert revoked_tokens.esta_revocado(dentro)
+    assert not revoked_tokens.esta_revocado(fuera)
+    assert revoked_tokens._watermark > watermark
+
+
+@pytest.mark.config(JWT_BLOCKLIST_SYNC_SECONDS=3600)
+def test_logout_revoca_en_el_mismo_proceso_sin_esperar_la_sincronizacion(app, client, datos_core):
+    cabeceras = iniciar_sesion(client, 1)
+    assert client.get('/api/v1/products', headers=cabeceras).status_code == 200
+    syncs = revoked_tokens.syncs
+
+    assert client.post('/auth/logout', headers=cabeceras).status_code == 200
+    assert client.get('/api/v1/products', headers=cabeceras).status_code == 401
+    assert revoked_tokens.syncs == syncs
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.mobile_app import Usuario
+from app.services.core_banking_service import CoreBankingService
+from app.services.vinculo_cliente_service import VinculoClienteService
+
+
+@pytest.fixture
+def mainframe_real(monkeypatch):
+    monkeypatch.setattr(CoreBankingService, '_modo_simulacion', staticmethod(lambda: False))
+
+
+def _usuario_vinculado(cod_cliente_core):
+    return Usuario(user_uuid=cod_cliente_core, dni_vinculado='40000001',
+                   cod_cliente_core=cod_cliente_core, vinculo_validado_at=datetime.utcnow())
+
+
+def test_claim_del_core_simulado_es_entero(app):
+    assert VinculoClienteService.obtener_cod_cliente(_usuario_vinculado('12345')) == 12345
+
+
+def test_claim_del_mainframe_real_se_conserva(app, mainframe_real):
+    assert VinculoClienteService.obtener_cod_cliente(_usuario_vinculado('00012345')) == '00012345'
+    assert VinculoClienteService.obtener_cod_cliente(_usuario_vinculado('12345')) == '12345'
+
+
+def test_registro_negativo_independiente_de_la_cache_del_core(app, client, monkeypatch):
+    from app.extensions import core_cache
+
+    consultas = []
+    monkeypatch.setattr(CoreBankingService, 'obtener_cliente', staticmethod(lambda dni: consultas.append(dni)))
+    core_cache.enabled = False
+
+    for _ in range(2):
+        respuesta = client.post('/auth/register', json={'dni': '99999999', 'password': 'Clave-Prueba-1'})
+        assert respuesta.status_code == 400
+        core_cache.limpiar()
+
+    assert consultas == ['99999999']
+    assert core_cache.stats()["misses"] == 0